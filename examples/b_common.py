@@ -1,5 +1,4 @@
 from typing import Collection
-from uuid import uuid4
 
 from magicnet.batteries.encoders import MsgpackEncoder
 from magicnet.batteries.middlewares.message_validation import MessageValidatorMiddleware
@@ -18,7 +17,7 @@ class MsgSetName(MessageProcessor):
     def invoke(self, message: NetMessage):
         message.sent_from.context["username"] = message.parameters[0]
         print(
-            f"Client {message.sent_from.uuid} set their username:",
+            f"Client {message.sent_from.handle_id} set their username:",
             message.parameters[0],
         )
 
@@ -78,12 +77,12 @@ extra_message_types = {
 
 
 class EverywhereExceptBack(BaseHandleFilter):
-    def resolve_destination(self, message: NetMessage) -> Collection[uuid4]:
+    def resolve_destination(self, message: NetMessage) -> Collection[int]:
         if message.message_type == MSG_BROADCAST:
             return [
                 k
                 for k in self.transport.connections.keys()
-                if k != message.routing_data.uuid
+                if k != message.routing_data.handle_id
             ]
         return super().resolve_destination(message)
 
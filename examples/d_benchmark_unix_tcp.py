@@ -0,0 +1,121 @@
+"""
+Compares the round-trip latency and the CPU time of the TCP loopback
+and the Unix socket transports. Both sides run in the same process
+on the same event loop, so the numbers include the work of both of them.
+"""
+
+import asyncio
+import dataclasses
+import os
+import tempfile
+import time
+
+from magicnet.batteries.asyncio_network_manager import AsyncIONetworkManager
+from magicnet.batteries.encoders import MsgpackEncoder
+from magicnet.batteries.middlewares.message_validation import MessageValidatorMiddleware
+from magicnet.batteries.transport_managers import EverywhereTransportManager
+from magicnet.batteries.transports.socket_asyncio import (
+    AsyncIOSocketTransport,
+    AsyncIOUnixSocketTransport,
+)
+from magicnet.core.net_message import NetMessage
+from magicnet.core.network_manager import NetworkManager
+from magicnet.core.transport_manager import TransportParameters
+from magicnet.protocol import network_types
+from magicnet.protocol.processor_base import MessageProcessor
+
+MSG_PING = 64
+MSG_PONG = 65
+ROUND_TRIPS = 10000
+
+
+class MsgPing(MessageProcessor):
+    arg_type = tuple[network_types.uint32]
+
+    def invoke(self, message: NetMessage):
+        reply = NetMessage(MSG_PONG, message.parameters, destination=message.sent_from)
+        self.manager.send_message(reply)
+
+
+class MsgPong(MessageProcessor):
+    arg_type = tuple[network_types.uint32]
+
+    def invoke(self, message: NetMessage):
+        self.manager.root.pong.set_result(message.parameters[0])
+
+
+@dataclasses.dataclass(kw_only=True)
+class BenchmarkNetworkManager(AsyncIONetworkManager):
+    pong: asyncio.Future[int] | None = None
+
+
+async def wait_for(predicate):
+    while not predicate():
+        await asyncio.sleep(0.001)
+
+
+def run_benchmark(name, transport_cls, server_args, client_args):
+    loop = asyncio.new_event_loop()
+    params = TransportParameters(
+        MsgpackEncoder(), transport_cls, None, [MessageValidatorMiddleware]
+    )
+    common = dict(
+        transport_type=EverywhereTransportManager,
+        extras={MSG_PING: MsgPing, MSG_PONG: MsgPong},
+        loop=loop,
+        add_signal_handlers=False,
+    )
+    server = BenchmarkNetworkManager.create_root(
+        transport_params=("server", {"client": {"server": params}}), **common
+    )
+    client = BenchmarkNetworkManager.create_root(
+        transport_params=("client", {"client": {"server": params}}), **common
+    )
+
+    async def scenario():
+        # The blocking wrappers of AsyncIONetworkManager would run the loop forever
+        NetworkManager.open_server(server, client=server_args)
+        transport = server.transport.transports["client"]
+        await wait_for(lambda: transport.servers)
+        NetworkManager.open_connection(client, server=client_args(transport))
+        await wait_for(
+            lambda: server.get_handle("client")
+            and server.get_handle("client").activated
+        )
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        for i in range(ROUND_TRIPS):
+            client.pong = loop.create_future()
+            client.send_message(NetMessage(MSG_PING, (i,)))
+            await client.pong
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+        server.transport.shutdown_connections()
+        client.transport.shutdown_connections()
+        for item in transport.servers:
+            item.close()
+        await asyncio.sleep(0.01)
+        print(
+            f"{name}: {wall / ROUND_TRIPS * 1e6:.1f} us per round trip, {cpu / ROUND_TRIPS * 1e6:.1f} us CPU"
+        )
+
+    try:
+        loop.run_until_complete(scenario())
+    finally:
+        loop.close()
+
+
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, "magicnet.sock")
+    run_benchmark(
+        "TCP loopback",
+        AsyncIOSocketTransport,
+        ("127.0.0.1", 0),
+        lambda transport: (
+            "127.0.0.1",
+            transport.servers[0].sockets[0].getsockname()[1],
+        ),
+    )
+    run_benchmark(
+        "Unix socket", AsyncIOUnixSocketTransport, (path,), lambda transport: (path,)
+    )
@@ -3,7 +3,7 @@ __all__ = ["AsyncIONetworkManager"]
 import asyncio
 import dataclasses
 import signal
-from collections.abc import Coroutine, Iterable
+from collections.abc import Callable, Coroutine, Iterable
 from typing import Any
 
 from magicnet.core.connection import ConnectionHandle
@@ -59,7 +59,7 @@ class AsyncIONetworkManager(NetworkManager):
         if exc:
             self.emit(StandardEvents.EXCEPTION, "Error in asynchronous code", exc)
 
-    def spawn_task(self, coro: Coroutine[Any, Any, Any]):
+    def spawn_task(self, coro: Coroutine[Any, Any, Any]) -> asyncio.Task[Any]:
         """
         Schedules an asynchronous task, prevents its garbage collection,
         and emits any exceptions created by the task.
@@ -70,6 +70,11 @@ class AsyncIONetworkManager(NetworkManager):
         task = self.loop.create_task(coro)
         self.spawned_tasks.add(task)
         task.add_done_callback(self.despawn_task)
+        return task
+
+    def call_later(self, delay: float, callback: Callable[[], object]) -> bool:
+        self.loop.call_later(delay, callback)
+        return True
 
     def open_server(self, **kwargs: Iterable[Any]):
         """
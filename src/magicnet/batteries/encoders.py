@@ -2,7 +2,6 @@ __all__ = ["MsgpackEncoder"]
 
 import json
 from collections.abc import Iterable
-from io import BytesIO
 from typing import Any
 
 from magicnet.core import errors
@@ -33,12 +32,10 @@ class MsgpackEncoder(ProtocolEncoder):
         assert msgpack is not None
         return b"".join(msgpack.packb(msg.value) for msg in messages)
 
-    def unpack(self, datagram: bytes) -> Iterable[NetMessage[Any]]:
+    def unpack(self, datagram: bytes | memoryview) -> Iterable[NetMessage[Any]]:
         assert msgpack is not None
-        io = BytesIO()
-        io.write(datagram)
-        io.seek(0)
-        unpacker = msgpack.Unpacker(io)  # pyright: ignore[reportArgumentType]
+        unpacker = msgpack.Unpacker()
+        unpacker.feed(datagram)
         return map(NetMessage.from_value, unpacker)  # pyright: ignore
 
 
@@ -55,5 +52,6 @@ class JsonEncoder(ProtocolEncoder):
     def pack(self, messages: Iterable[NetMessage[Any]]) -> bytes:
         return json.dumps([msg.value for msg in messages]).encode("utf-8")
 
-    def unpack(self, datagram: bytes) -> Iterable[NetMessage[Any]]:
-        return map(NetMessage.from_value, json.loads(datagram))  # pyright: ignore
+    def unpack(self, datagram: bytes | memoryview) -> Iterable[NetMessage[Any]]:
+        # json does not accept memoryviews, and bytes() of a bytes object is a no-op
+        return map(NetMessage.from_value, json.loads(bytes(datagram)))  # pyright: ignore
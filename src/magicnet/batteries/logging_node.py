@@ -33,11 +33,11 @@ class LoggerNode(MessengerNode[Any, Any]):
         return self.snake_case_regex.sub(r"_\1", s).lower()
 
     def __post_init__(self):
-        self.listen(StandardEvents.ERROR, functools.partial(self.log, logging.ERROR))
-        self.listen(StandardEvents.WARNING, functools.partial(self.log, logging.WARNING))
-        self.listen(StandardEvents.INFO, functools.partial(self.log, logging.INFO))
-        self.listen(StandardEvents.DEBUG, functools.partial(self.log, logging.DEBUG))
-        self.listen(StandardEvents.EXCEPTION, self.log_exc)
+        self.listen(StandardEvents.ERROR, functools.partial(self.log, logging.ERROR), wants_context=True)
+        self.listen(StandardEvents.WARNING, functools.partial(self.log, logging.WARNING), wants_context=True)
+        self.listen(StandardEvents.INFO, functools.partial(self.log, logging.INFO), wants_context=True)
+        self.listen(StandardEvents.DEBUG, functools.partial(self.log, logging.DEBUG), wants_context=True)
+        self.listen(StandardEvents.EXCEPTION, self.log_exc, wants_context=True)
 
         if self.initlogger:
             console = logging.StreamHandler()
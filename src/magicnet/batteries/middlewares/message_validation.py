@@ -45,6 +45,9 @@ class MessageValidatorMiddleware(TransportMiddleware):
         all_methods = self.transport.manager.dg_processor.children.items()
         for ident, method in all_methods:
             assert isinstance(method, MessageProcessor)
+            if method.name is None:
+                # Bound by its node ID, which is not a message type
+                continue
             if method.arg_type is not None:
                 self.validators[int(ident)] = method.arg_type
         self.add_message_operator(self.validate_message_send, self.validate_message_recv)
@@ -0,0 +1,186 @@
+__all__ = ["RateLimitMiddleware", "RateLimit", "RateLimitAction"]
+
+import dataclasses
+import time
+from array import array
+from collections import deque
+from enum import IntEnum, auto
+from typing import Any, ClassVar
+
+from typing_extensions import Unpack
+
+from magicnet.core.connection import ConnectionHandle
+from magicnet.core.net_globals import MNEvents
+from magicnet.core.net_message import NetMessage
+from magicnet.core.transport_handler import TransportMiddleware
+from magicnet.protocol.protocol_globals import StandardDCReasons, StandardMessageTypes
+from magicnet.util.messenger import StandardEvents
+
+
+class RateLimitAction(IntEnum):
+    DROP = auto()
+    """The message is ignored and a warning is raised"""
+    DEFER = auto()
+    """The message is processed later, when the bucket is refilled"""
+    DISCONNECT = auto()
+    """The handle is disconnected with the RATE_LIMITED reason"""
+
+
+@dataclasses.dataclass(frozen=True)
+class RateLimit:
+    """
+    A token bucket: every message takes one token, the bucket holds at most
+    burst tokens and is refilled by rate tokens per second.
+    """
+
+    rate: float
+    burst: int
+    action: RateLimitAction = RateLimitAction.DROP
+
+
+@dataclasses.dataclass
+class RateLimitMiddleware(TransportMiddleware):
+    """
+    Limits how many messages of every type each handle can send per second.
+    The limits are set by overriding the limits (and possibly default_limit)
+    on a subclass. Message types that have no limit are never limited.
+
+    Each handle gets a slot number, and the buckets of each message type
+    are stored in flat arrays indexed by it, so a handle costs 16 bytes
+    per message type, which allows for tens of thousands of handles.
+
+    Deferred messages skip the receive middlewares that would run after
+    this one, so this middleware should be put first in the list.
+    Once a message of a handle is deferred, all its further messages are deferred
+    as well, so they are processed in the order they were sent.
+    """
+
+    limits: ClassVar[dict[int, RateLimit]] = {}
+    default_limit: ClassVar[RateLimit | None] = None
+    """Used for the message types that are not in limits"""
+    exempt_message_types: ClassVar[frozenset[int]] = frozenset(
+        {StandardMessageTypes.DISCONNECT, StandardMessageTypes.SHUTDOWN}
+    )
+    max_deferred: ClassVar[int] = 256
+    """The most deferred messages per handle, the ones over it are dropped"""
+
+    def __post_init__(self):
+        self.slots: dict[int, int] = {}
+        self.free_slots: list[int] = []
+        self.tokens: dict[int, array[float]] = {}
+        self.refilled: dict[int, array[float]] = {}
+        self.deferred: dict[int, deque[NetMessage[Unpack[tuple[Any, ...]]]]] = {}
+        self.listen(MNEvents.BEFORE_LAUNCH, self.do_before_launch)
+        self.listen(MNEvents.HANDLE_DESTROYED, self.release_slot)
+
+    def do_before_launch(self):
+        self.add_message_operator(None, self.limit_message_recv)
+
+    def get_limit(self, message_type: int) -> RateLimit | None:
+        if message_type in self.exempt_message_types:
+            return None
+        return self.limits.get(message_type, self.default_limit)
+
+    def get_slot(self, handle: ConnectionHandle) -> int:
+        slot = self.slots.get(handle.handle_id)
+        if slot is not None:
+            return slot
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            slot = len(self.slots)
+            for buckets in (self.tokens, self.refilled):
+                for values in buckets.values():
+                    values.append(0.0)
+        self.slots[handle.handle_id] = slot
+        now = time.monotonic()
+        for message_type, values in self.tokens.items():
+            values[slot] = self.get_burst(message_type)
+            self.refilled[message_type][slot] = now
+        return slot
+
+    def get_burst(self, message_type: int) -> float:
+        limit = self.get_limit(message_type)
+        return 0.0 if limit is None else float(limit.burst)
+
+    def release_slot(self, handle: ConnectionHandle):
+        self.deferred.pop(handle.handle_id, None)
+        slot = self.slots.pop(handle.handle_id, None)
+        if slot is not None:
+            self.free_slots.append(slot)
+
+    def take_token(self, slot: int, message_type: int, limit: RateLimit) -> float:
+        """Takes a token from the bucket, returns how long to wait for one if it is empty"""
+        tokens = self.tokens.get(message_type)
+        if tokens is None:
+            # The first message of this type from any handle
+            size = len(self.slots) + len(self.free_slots)
+            tokens = self.tokens[message_type] = array("d", [float(limit.burst)]) * size
+            self.refilled[message_type] = array("d", [time.monotonic()]) * size
+        refilled = self.refilled[message_type]
+
+        now = time.monotonic()
+        available = min(float(limit.burst), tokens[slot] + (now - refilled[slot]) * limit.rate)
+        refilled[slot] = now
+        if available >= 1:
+            tokens[slot] = available - 1
+            return 0.0
+        tokens[slot] = available
+        return (1 - available) / limit.rate if limit.rate > 0 else float("inf")
+
+    def limit_message_recv(self, message: NetMessage[Unpack[tuple[Any, ...]]], handle: ConnectionHandle):
+        if handle.destroyed:
+            # The handle was disconnected by an earlier message of the same datagram
+            return None
+        pending = self.deferred.get(handle.handle_id)
+        if pending is not None and message.message_type not in self.exempt_message_types:
+            self.defer_message(pending, message)
+            return None
+        limit = self.get_limit(message.message_type)
+        if limit is None:
+            return message
+
+        wait = self.take_token(self.get_slot(handle), message.message_type, limit)
+        if not wait:
+            return message
+        if limit.action == RateLimitAction.DISCONNECT:
+            handle.send_disconnect(StandardDCReasons.RATE_LIMITED, f"Too many messages: {message.message_type}")
+        elif limit.action == RateLimitAction.DEFER and wait != float("inf"):
+            self.deferred[handle.handle_id] = deque([message])
+            if not self.transport.manager.schedule_timer(wait, self.release_deferred(handle)):
+                self.deferred.pop(handle.handle_id)
+                self.emit(StandardEvents.WARNING, f"Unable to defer a message from {handle.handle_id}, dropping")
+        else:
+            self.emit(StandardEvents.WARNING, f"Message dropped due to the rate limit: {message}")
+        return None
+
+    def defer_message(
+        self, pending: deque[NetMessage[Unpack[tuple[Any, ...]]]], message: NetMessage[Unpack[tuple[Any, ...]]]
+    ):
+        if len(pending) >= self.max_deferred:
+            self.emit(StandardEvents.WARNING, f"Too many deferred messages, dropping: {message}")
+        else:
+            pending.append(message)
+
+    def release_deferred(self, handle: ConnectionHandle):
+        def callback():
+            pending = self.deferred.get(handle.handle_id)
+            if pending is None or handle.destroyed:
+                return
+            slot = self.get_slot(handle)
+            released: list[NetMessage[Unpack[tuple[Any, ...]]]] = []
+            wait = 0.0
+            while pending:
+                message = pending[0]
+                limit = self.get_limit(message.message_type)
+                if limit is not None and (wait := self.take_token(slot, message.message_type, limit)):
+                    break
+                released.append(pending.popleft())
+            if not pending:
+                del self.deferred[handle.handle_id]
+            elif not self.transport.manager.schedule_timer(wait, callback):
+                del self.deferred[handle.handle_id]
+            if released:
+                self.transport.emit(MNEvents.DATAGRAM_RECEIVED, released)
+
+        return callback
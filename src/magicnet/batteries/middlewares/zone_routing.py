@@ -25,42 +25,94 @@ class ZoneBasedRouter(TransportMiddleware):
         StandardMessageTypes.OBJECT_GENERATE_DONE,
         StandardMessageTypes.DESTROY_OBJECT,
     }
+    BULK_MESSAGE_TYPES = {
+        StandardMessageTypes.GENERATE_OBJECTS,
+        StandardMessageTypes.DESTROY_OBJECTS,
+    }
+    """Those carry a list of objects, only the visible ones are kept"""
+    DESTROY_MESSAGE_TYPES = {
+        StandardMessageTypes.DESTROY_OBJECT,
+        StandardMessageTypes.DESTROY_OBJECTS,
+    }
+    """
+    The objects may be gone by the time those are routed,
+    so their routing_data holds the zones of the objects, one per object
+    """
 
     def __post_init__(self):
         self.listen(MNEvents.BEFORE_LAUNCH, self.do_before_launch)
 
     def do_before_launch(self):
-        self.add_message_operator(self.validate_message_zone, None)
+        self.add_batch_message_operator(self.validate_message_zones, None)
         self.add_math_target(MNMathTargets.VISIBLE_OBJECTS, self.only_visibles)
 
     def only_visibles(self, objects: list[NetworkObject], handle: ConnectionHandle) -> list[NetworkObject]:
         success, viszones = handle.get_shared_parameter("vz", list[int])
         if not success or viszones is None:
-            self.emit(StandardEvents.WARNING, f"{handle.uuid}: incorrectly set viszones!")
+            self.emit(StandardEvents.WARNING, f"{handle.handle_id}: incorrectly set viszones!")
             return []
 
         vz_set = set(viszones)
         return [obj for obj in objects if obj.zone in vz_set]
 
-    def validate_message_zone(self, message: NetMessage[Unpack[tuple[Any, ...]]], handle: ConnectionHandle):
-        if message.message_type not in self.PROCESSED_MESSAGE_TYPES:
-            return message
+    def get_visible_zones(self, handle: ConnectionHandle) -> set[int]:
+        success, viszones = handle.get_shared_parameter("vz", list[int])
+        if not success or viszones is None:
+            self.emit(StandardEvents.WARNING, f"{handle.handle_id}: incorrectly set viszones!")
+            return set()
+        return set(viszones)
 
-        oid = message.parameters[0]
+    def is_visible(self, oid: int, vz_set: set[int], zone: int | None = None) -> bool:
+        if zone is not None:
+            # The message destroys the object, so it may be gone already
+            return zone in vz_set
         obj = self.transport.manager.net_objects.get(oid)
         if obj is None:
             # Strange but ok
             # Note that we still have to do this even if obj is falsey because
             # we might be generating it still
             self.emit(StandardEvents.WARNING, f"Message sent but the object is missing: {oid}")
-            return None
+            return False
+        return obj.zone in vz_set
 
-        zone = obj.zone
-        success, viszones = handle.get_shared_parameter("vz", list[int])
-        if not success or viszones is None:
-            self.emit(StandardEvents.WARNING, f"{handle.uuid}: incorrectly set viszones!")
-            return None
-
-        if zone in viszones:
-            return message
+    def get_destroyed_zones(self, message: NetMessage[Unpack[tuple[Any, ...]]]) -> tuple[int, ...] | None:
+        if message.message_type in self.DESTROY_MESSAGE_TYPES and isinstance(message.routing_data, tuple):
+            return message.routing_data
         return None
+
+    def validate_message_zones(
+        self, messages: list[NetMessage[Unpack[tuple[Any, ...]]]], handle: ConnectionHandle
+    ) -> list[NetMessage[Unpack[tuple[Any, ...]]]]:
+        # The visible zones are only looked up once per batch, and only if needed
+        vz_set: set[int] | None = None
+        output: list[NetMessage[Unpack[tuple[Any, ...]]]] = []
+        for message in messages:
+            if message.message_type in self.PROCESSED_MESSAGE_TYPES:
+                if vz_set is None:
+                    vz_set = self.get_visible_zones(handle)
+                zones = self.get_destroyed_zones(message)
+                zone = zones[0] if zones else None
+                if self.is_visible(message.parameters[0], vz_set, zone):
+                    output.append(message)
+            elif message.message_type in self.BULK_MESSAGE_TYPES:
+                if vz_set is None:
+                    vz_set = self.get_visible_zones(handle)
+                entries: list[Any] = message.parameters[0]
+                if message.message_type == StandardMessageTypes.GENERATE_OBJECTS:
+                    visible = [entry for entry in entries if self.is_visible(entry[0], vz_set)]
+                elif zones := self.get_destroyed_zones(message):
+                    visible = [
+                        oid
+                        for oid, zone in zip(entries, zones, strict=True)
+                        if self.is_visible(oid, vz_set, zone)
+                    ]
+                else:
+                    visible = [oid for oid in entries if self.is_visible(oid, vz_set)]
+                if len(visible) == len(entries):
+                    output.append(message)
+                elif visible:
+                    # The message is shared by all the handles, so it is copied
+                    output.append(dataclasses.replace(message, parameters=(visible,)))
+            else:
+                output.append(message)
+        return output
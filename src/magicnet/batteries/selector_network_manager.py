@@ -0,0 +1,76 @@
+__all__ = ["SelectorNetworkManager"]
+
+import dataclasses
+import heapq
+import itertools
+import selectors
+import time
+from collections.abc import Callable, Iterator
+from typing import Protocol
+
+from magicnet.core.network_manager import NetworkManager
+
+
+class PendingWriter(Protocol):
+    def flush(self) -> None: ...
+
+
+@dataclasses.dataclass(kw_only=True)
+class SelectorNetworkManager(NetworkManager):
+    """
+    SelectorNetworkManager is used by applications that run their own
+    main loop (i.e. a game client rendering frames), and never owns
+    an event loop. Instead, the application calls poll() regularly,
+    which processes the network events that happened since the previous call.
+    This should be used with SelectorSocketTransport.
+    After shutdown() the selector is closed, so poll() cannot be called anymore.
+    """
+
+    selector: selectors.BaseSelector = dataclasses.field(default_factory=selectors.DefaultSelector, repr=False)
+    pending_writes: set[PendingWriter] = dataclasses.field(default_factory=set, repr=False)
+    """Connections that have frames waiting to be written to their sockets"""
+    timers: list[tuple[float, int, Callable[[], object]]] = dataclasses.field(default_factory=list, repr=False)
+    timer_counter: Iterator[int] = dataclasses.field(default_factory=itertools.count, repr=False)
+
+    def poll(self, timeout: float | None = 0) -> int:
+        """
+        Waits up to timeout seconds for socket events (by default does not wait),
+        reads all available frames and dispatches them in one batch,
+        then runs the due timers and flushes the pending writes.
+        Returns the number of socket events processed.
+        """
+        if self.timers:
+            until_timer = max(self.timers[0][0] - time.monotonic(), 0)
+            timeout = until_timer if timeout is None else min(timeout, until_timer)
+        events = self.selector.select(timeout)
+        with self.transport.message_queue:
+            for key, mask in events:
+                key.data(mask)
+        self.run_timers()
+        self.flush_writes()
+        return len(events)
+
+    def call_later(self, delay: float, callback: Callable[[], object]) -> bool:
+        heapq.heappush(self.timers, (time.monotonic() + delay, next(self.timer_counter), callback))
+        return True
+
+    def run_timers(self):
+        now = time.monotonic()
+        # Timers scheduled by the callbacks wait for the next poll, even with a zero delay
+        due = []
+        while self.timers and self.timers[0][0] <= now:
+            due.append(heapq.heappop(self.timers)[2])
+        for callback in due:
+            callback()
+
+    def flush_writes(self):
+        writers = self.pending_writes
+        self.pending_writes = set()
+        for writer in writers:
+            writer.flush()
+
+    def shutdown(self):
+        super().shutdown()
+        self.flush_writes()
+        # The transports have closed their sockets by now, the manager cannot poll() anymore
+        self.selector.close()
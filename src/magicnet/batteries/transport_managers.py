@@ -1,13 +1,16 @@
-__all__ = ["EverywhereTransportManager"]
+__all__ = ["EverywhereTransportManager", "RoutingTableTransportManager", "Route"]
 
-from collections.abc import Collection
-from typing import Any
+import dataclasses
+from collections import defaultdict
+from collections.abc import Callable, Collection
+from typing import Any, ClassVar
 
 from typing_extensions import Unpack
 
+from magicnet.core import errors
 from magicnet.core.net_message import NetMessage
 from magicnet.core.transport_handler import ManagerT
-from magicnet.core.transport_manager import TransportManager
+from magicnet.core.transport_manager import TransportAnyType, TransportManager
 
 
 class EverywhereTransportManager(TransportManager[ManagerT]):
@@ -21,3 +24,98 @@ class EverywhereTransportManager(TransportManager[ManagerT]):
 
     def resolve_destination(self, msg: NetMessage[Unpack[tuple[Any, ...]]]) -> Collection[str]:
         return self.transports.keys()
+
+
+@dataclasses.dataclass(frozen=True)
+class Route:
+    """
+    Route is a row of the routing table of RoutingTableTransportManager.
+    Messages of any of the message types are sent to all of the roles.
+    If the predicate is provided, the route only applies to the messages
+    for which predicate(message.routing_data) is true.
+    """
+
+    message_types: Collection[int]
+    roles: Collection[str]
+    predicate: Callable[[Any], bool] | None = None
+
+
+PredicateRoutes = tuple[tuple[Callable[[Any], bool], frozenset[str]], ...]
+
+
+@dataclasses.dataclass
+class RoutingTableTransportManager(TransportManager[ManagerT]):
+    """
+    RoutingTableTransportManager sends each message to the roles
+    its message type is routed to, which is useful for the "choke points"
+    connected to many roles that only need a part of the traffic.
+    The routing table is defined on the class, and is compiled
+    into a dictionary lookup when the manager is created. Example::
+
+        class ZoneServerTransportManager(RoutingTableTransportManager):
+            routing_table = [
+                Route([MSG_CHAT], ["client"]),
+                Route([MSG_PERSIST], ["database"]),
+                Route([MSG_AUDIT], ["database"], predicate=lambda data: data == "audit"),
+            ]
+
+    The message types missing from the table are sent to default_roles.
+    Messages with an explicit destination are always sent
+    to the role of the destination handle.
+    """
+
+    routing_table: ClassVar[Collection[Route]] = ()
+    default_roles: ClassVar[Collection[str] | None] = None
+    """Roles for the message types missing from the table, None means all roles"""
+
+    static_routes: dict[int, frozenset[str]] = dataclasses.field(default_factory=dict)
+    predicate_routes: dict[int, PredicateRoutes] = dataclasses.field(default_factory=dict)
+    default_route: frozenset[str] = frozenset()
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.transports:
+            # from_map() creates the manager without the transports, and compiles the routes after adding them
+            self.compile_routes()
+
+    @classmethod
+    def from_map(cls, parent: ManagerT, role: str, transport_map: TransportAnyType[ManagerT]):
+        obj = super().from_map(parent, role, transport_map)
+        obj.compile_routes()
+        return obj
+
+    def compile_routes(self):
+        static: dict[int, set[str]] = defaultdict(set)
+        predicated: dict[int, list[tuple[Callable[[Any], bool], frozenset[str]]]] = defaultdict(list)
+        for route in self.routing_table:
+            roles = self.check_roles(route.roles)
+            for message_type in route.message_types:
+                # Every type in the table is routed only by its routes, even if none of them match
+                static[message_type].update(() if route.predicate else roles)
+                if route.predicate:
+                    predicated[message_type].append((route.predicate, roles))
+
+        self.static_routes = {message_type: frozenset(roles) for message_type, roles in static.items()}
+        self.predicate_routes = {message_type: tuple(routes) for message_type, routes in predicated.items()}
+        if self.default_roles is None:
+            self.default_route = frozenset(self.transports)
+        else:
+            self.default_route = self.check_roles(self.default_roles)
+
+    def check_roles(self, roles: Collection[str]) -> frozenset[str]:
+        for role in roles:
+            if role not in self.transports:
+                raise errors.UnknownRole(role)
+        return frozenset(roles)
+
+    def resolve_destination(self, msg: NetMessage[Unpack[tuple[Any, ...]]]) -> Collection[str]:
+        if msg.destination is not None:
+            return (msg.destination.transport.role,)
+        roles = self.static_routes.get(msg.message_type, self.default_route)
+        predicated = self.predicate_routes.get(msg.message_type)
+        if predicated is None:
+            return roles
+        for predicate, extra_roles in predicated:
+            if predicate(msg.routing_data):
+                roles = roles | extra_roles
+        return roles
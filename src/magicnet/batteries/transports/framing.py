@@ -0,0 +1,63 @@
+__all__ = ["FrameBuffer", "FRAME_HEADER_SIZE", "MAX_BUFFER_SIZE", "MAX_FRAME_SIZE"]
+
+FRAME_HEADER_SIZE = 2
+MAX_FRAME_SIZE = (1 << (8 * FRAME_HEADER_SIZE)) - 1
+MAX_BUFFER_SIZE = 2 * (FRAME_HEADER_SIZE + MAX_FRAME_SIZE)
+
+
+class FrameBuffer:
+    """
+    FrameBuffer splits a byte stream into length-prefixed frames.
+    The stream is read directly into a receive buffer,
+    and the frames are returned as memoryviews into it,
+    so a frame is only valid until compact() is called.
+    When the incomplete frame at the tail does not fit in the rest of the buffer,
+    it is moved to the start, which keeps every frame contiguous.
+    The buffer starts small and is replaced with a larger one when a frame
+    does not fit in it at all, up to MAX_BUFFER_SIZE.
+    """
+
+    buffer: bytearray
+    view: memoryview
+    read_pos: int
+    write_pos: int
+
+    def init_buffer(self, size: int) -> None:
+        self.buffer = bytearray(max(size, FRAME_HEADER_SIZE))
+        self.view = memoryview(self.buffer)
+        self.read_pos = 0
+        self.write_pos = 0
+
+    def split_frames(self) -> list[memoryview]:
+        view, position, end = self.view, self.read_pos, self.write_pos
+        frames: list[memoryview] = []
+        while end - position >= FRAME_HEADER_SIZE:
+            length = int.from_bytes(view[position : position + FRAME_HEADER_SIZE], "big")
+            if end - position - FRAME_HEADER_SIZE < length:
+                break
+            position += FRAME_HEADER_SIZE
+            frames.append(view[position : position + length])
+            position += length
+        self.read_pos = position
+        return frames
+
+    def compact(self) -> None:
+        remaining = self.write_pos - self.read_pos
+        if not remaining:
+            self.read_pos = self.write_pos = 0
+            return
+        # Room needed for the incomplete frame at the tail, its header is not known yet if it is too short
+        needed = FRAME_HEADER_SIZE
+        if remaining >= FRAME_HEADER_SIZE:
+            needed += int.from_bytes(self.view[self.read_pos : self.read_pos + FRAME_HEADER_SIZE], "big")
+        if len(self.buffer) - self.read_pos >= needed:
+            return
+        if len(self.buffer) >= needed:
+            self.buffer[:remaining] = self.buffer[self.read_pos : self.write_pos]
+        else:
+            # A new buffer is allocated instead of resizing, since the old one may still be exported
+            buffer = bytearray(max(needed, min(2 * len(self.buffer), MAX_BUFFER_SIZE)))
+            buffer[:remaining] = self.view[self.read_pos : self.write_pos]
+            self.buffer = buffer
+            self.view = memoryview(buffer)
+        self.read_pos, self.write_pos = 0, remaining
@@ -0,0 +1,325 @@
+__all__ = ["SharedMemoryTransport", "SharedMemoryChannel", "SharedRing"]
+
+import asyncio
+import dataclasses
+import functools
+import os
+import struct
+from collections import deque
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, ClassVar, cast
+
+from magicnet.batteries.transports.socket_asyncio import remove_socket_file
+from magicnet.core.connection import ConnectionHandle
+from magicnet.core.transport_handler import TransportHandler
+from magicnet.util.messenger import StandardEvents
+
+if TYPE_CHECKING:
+    from magicnet.batteries.asyncio_network_manager import AsyncIONetworkManager
+
+# The counters live on separate cache lines, so the two processes do not fight over them
+HEAD_OFFSET = 0
+TAIL_OFFSET = 64
+BLOCKED_OFFSET = 128
+CAPACITY_OFFSET = 136
+RING_HEADER_SIZE = 192
+COUNTER = struct.Struct("=Q")
+RECORD_HEADER = struct.Struct("=I")
+WRAP_MARKER = 0xFFFFFFFF
+
+
+class SharedRing:
+    """
+    SharedRing is a single-producer single-consumer ring buffer
+    in a shared memory segment. Head and tail are ever-growing byte counters,
+    only the producer writes the head and only the consumer writes the tail.
+    A record is never split by the end of the buffer, if it does not fit
+    the producer writes a wrap marker and continues from the start.
+
+    The counters are plain memory stores with no barrier between them and the records,
+    so the consumer only sees complete records on CPUs that keep the order of stores
+    (x86 and other TSO architectures). On weakly-ordered CPUs (i.e. ARM)
+    use AsyncIOUnixSocketTransport instead.
+    """
+
+    def __init__(self, memory: SharedMemory, *, owner: bool):
+        self.memory = memory
+        self.owner = owner
+        self.capacity = COUNTER.unpack_from(memory.buf, CAPACITY_OFFSET)[0]
+        self.data = memory.buf[RING_HEADER_SIZE : RING_HEADER_SIZE + self.capacity]
+
+    @classmethod
+    def create(cls, capacity: int) -> "SharedRing":
+        memory = SharedMemory(create=True, size=RING_HEADER_SIZE + capacity)
+        memory.buf[:RING_HEADER_SIZE] = bytes(RING_HEADER_SIZE)
+        COUNTER.pack_into(memory.buf, CAPACITY_OFFSET, capacity)
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, *, untrack: bool = False) -> "SharedRing":
+        memory = SharedMemory(name)
+        if untrack:
+            # Otherwise the resource tracker of this process unlinks the segment on exit,
+            # while it belongs to the process that created it. The tracker knows it
+            # by its POSIX name, which is the public one with a leading slash
+            resource_tracker.unregister(f"/{memory.name}", "shared_memory")
+        return cls(memory, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def get_counter(self, offset: int) -> int:
+        return COUNTER.unpack_from(self.memory.buf, offset)[0]
+
+    def set_counter(self, offset: int, value: int) -> None:
+        COUNTER.pack_into(self.memory.buf, offset, value)
+
+    @property
+    def producer_blocked(self) -> bool:
+        return bool(self.get_counter(BLOCKED_OFFSET))
+
+    @producer_blocked.setter
+    def producer_blocked(self, value: bool) -> None:
+        self.set_counter(BLOCKED_OFFSET, int(value))
+
+    def write(self, payload: bytes) -> bool:
+        """Appends a record, returns False if there is not enough free space"""
+        size = RECORD_HEADER.size + len(payload)
+        head, tail = self.get_counter(HEAD_OFFSET), self.get_counter(TAIL_OFFSET)
+        position = head % self.capacity
+        skip = self.capacity - position if self.capacity - position < size else 0
+        if skip + size > self.capacity - (head - tail):
+            return False
+        if skip:
+            if skip >= RECORD_HEADER.size:
+                RECORD_HEADER.pack_into(self.data, position, WRAP_MARKER)
+            position = 0
+        RECORD_HEADER.pack_into(self.data, position, len(payload))
+        self.data[position + RECORD_HEADER.size : position + size] = payload
+        # The head is stored last, so the consumer never sees a partial record (on TSO CPUs, see above)
+        self.set_counter(HEAD_OFFSET, head + skip + size)
+        return True
+
+    def read(self) -> tuple[list[memoryview], int]:
+        """
+        Returns the views of all available records, and the tail after them.
+        The records stay valid until the tail is passed into consume().
+        """
+        head, tail = self.get_counter(HEAD_OFFSET), self.get_counter(TAIL_OFFSET)
+        records: list[memoryview] = []
+        while tail != head:
+            position = tail % self.capacity
+            remaining = self.capacity - position
+            if remaining < RECORD_HEADER.size:
+                tail += remaining
+                continue
+            length = RECORD_HEADER.unpack_from(self.data, position)[0]
+            if length == WRAP_MARKER:
+                tail += remaining
+                continue
+            start = position + RECORD_HEADER.size
+            records.append(self.data[start : start + length])
+            tail += RECORD_HEADER.size + length
+        return records, tail
+
+    def consume(self, tail: int) -> None:
+        self.set_counter(TAIL_OFFSET, tail)
+
+    def close(self) -> None:
+        self.data.release()
+        try:
+            self.memory.close()
+        except BufferError:
+            # A datagram view is still referenced somewhere, the mapping is freed along with it
+            pass
+        if self.owner:
+            self.memory.unlink()
+
+
+class SharedMemoryChannel(asyncio.Protocol):
+    """
+    SharedMemoryChannel is a pair of SharedRings, one in each direction,
+    with a Unix socket used for the rendezvous and for the wakeups.
+    The server creates both rings and sends their names to the client.
+    After that, any byte received on the socket means that the other side
+    wrote new records or freed space in a full ring. Wakeups are coalesced,
+    so there is at most one write() syscall per event loop iteration.
+    """
+
+    def __init__(self, owner: "SharedMemoryTransport", *, from_client: bool = False):
+        self.owner = owner
+        self.from_client = from_client
+        self.transport: asyncio.Transport | None = None
+        self.handle: ConnectionHandle | None = None
+        self.inbound: SharedRing | None = None
+        self.outbound: SharedRing | None = None
+        self.pending: deque[bytes] = deque()
+        self.pending_size = 0
+        self.rendezvous = bytearray()
+        self.wake_scheduled = False
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = cast(asyncio.Transport, transport)
+        if self.from_client:
+            return
+        inbound = SharedRing.create(self.owner.ring_size)
+        outbound = SharedRing.create(self.owner.ring_size)
+        # The names are swapped, as our inbound ring is the outbound ring of the client
+        self.transport.write(f"{os.getpid()} {outbound.name} {inbound.name}\n".encode())
+        self.attach_rings(inbound, outbound)
+
+    def data_received(self, data: bytes) -> None:
+        if self.inbound is None:
+            self.rendezvous += data
+            if b"\n" not in self.rendezvous:
+                return
+            line = bytes(self.rendezvous).split(b"\n", 1)[0]
+            pid, inbound, outbound = line.decode().split()
+            untrack = int(pid) != os.getpid()
+            self.attach_rings(SharedRing.attach(inbound, untrack=untrack), SharedRing.attach(outbound, untrack=untrack))
+        self.receive()
+        self.flush_pending()
+
+    def attach_rings(self, inbound: SharedRing, outbound: SharedRing) -> None:
+        self.inbound, self.outbound = inbound, outbound
+        self.handle = self.owner.handle_new_connection(self)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self.owner.emit(StandardEvents.INFO, "Shared memory connection closed!")
+        if self.handle is not None:
+            self.owner.handle_lost(self.handle)
+        self.close_rings()
+
+    def receive(self) -> None:
+        if self.inbound is None or self.handle is None or self.handle.destroyed:
+            return
+        records, tail = self.inbound.read()
+        if not records:
+            return
+        self.owner.datagrams_received(self.handle, records)
+        for record in records:
+            record.release()
+        if self.handle.destroyed:
+            return
+        self.inbound.consume(tail)
+        if self.inbound.producer_blocked:
+            self.inbound.producer_blocked = False
+            self.wake()
+
+    def write_datagram(self, datagram: bytes) -> None:
+        if self.outbound is None:
+            # The connection is lost, and the handle is about to be destroyed
+            return
+        if self.pending or not self.outbound.write(datagram):
+            self.pending.append(datagram)
+            self.pending_size += len(datagram)
+            self.flush_pending()
+        self.wake()
+
+    def flush_pending(self) -> None:
+        if self.outbound is None:
+            return
+        while self.pending:
+            if self.outbound.write(self.pending[0]):
+                self.pending_size -= len(self.pending.popleft())
+                self.wake()
+                continue
+            if self.outbound.producer_blocked:
+                return
+            # The consumer might have drained the ring before seeing the flag, so retry once after setting it
+            self.outbound.producer_blocked = True
+
+    def wake(self) -> None:
+        if not self.wake_scheduled:
+            self.wake_scheduled = True
+            self.owner.manager.loop.call_soon(self.send_wake)
+
+    def send_wake(self) -> None:
+        self.wake_scheduled = False
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.write(b"\x00")
+
+    def close_rings(self) -> None:
+        for ring in (self.inbound, self.outbound):
+            if ring is not None:
+                ring.close()
+        self.inbound = self.outbound = None
+
+    def close(self) -> None:
+        # Whatever was written last (i.e. a DISCONNECT message) still has to be read by the other side
+        if self.wake_scheduled:
+            self.send_wake()
+        if self.transport is not None:
+            self.transport.close()
+
+
+@dataclasses.dataclass
+class SharedMemoryTransport(TransportHandler["AsyncIONetworkManager"]):
+    """
+    SharedMemoryTransport is used to communicate between two applications
+    on the same host through shared memory ring buffers, which saves
+    a syscall and a copy per datagram compared to the sockets.
+    The received datagrams are read directly from the shared memory.
+    The connection parameters are the path of the Unix socket
+    used to exchange the names of the rings and to wake the other side up.
+    Like in AsyncIOUnixSocketTransport, a socket left at the path is replaced,
+    and shutdown() closes the servers and removes their sockets.
+    Only works on the CPUs that keep the order of stores, see SharedRing.
+
+    Note: this transport type will only work properly with AsyncIONetworkManager.
+    """
+
+    max_datagram_size: ClassVar[int | None] = 1 << 16
+    ring_size: ClassVar[int] = 1 << 22
+    """Size of the ring buffer in each direction, must fit at least one max_datagram_size datagram"""
+
+    servers: list[asyncio.AbstractServer] = dataclasses.field(default_factory=list, repr=False)
+    socket_paths: list[str] = dataclasses.field(default_factory=list, repr=False)
+
+    def send(self, connection: ConnectionHandle, dg: bytes) -> None:
+        channel = cast(SharedMemoryChannel, connection.connection_data)
+        channel.write_datagram(dg)
+
+    def get_queued_bytes(self, handle: ConnectionHandle) -> int:
+        # The records written into the ring are not counted, as its size is fixed
+        return cast(SharedMemoryChannel, handle.connection_data).pending_size
+
+    def connect(self, path: str | None = None, *more: object) -> None:
+        assert path is not None
+        self.manager.spawn_task(self.client_connection(path))
+
+    async def client_connection(self, path: str):
+        factory = functools.partial(SharedMemoryChannel, self, from_client=True)
+        await self.manager.loop.create_unix_connection(factory, path)
+
+    def open_server(self, path: str | None = None, *more: object) -> None:
+        assert path is not None
+        self.manager.spawn_task(self.open_server_async(path))
+
+    async def open_server_async(self, path: str):
+        self.emit(StandardEvents.INFO, f"Server opened! Path: {path}")
+        factory = functools.partial(SharedMemoryChannel, self)
+        remove_socket_file(path)
+        self.servers.append(await self.manager.loop.create_unix_server(factory, path))
+        self.socket_paths.append(path)
+
+    def handle_new_connection(self, channel: SharedMemoryChannel) -> ConnectionHandle:
+        self.emit(StandardEvents.INFO, "Client connection opened!")
+        conn = ConnectionHandle(self, channel)
+        if not channel.from_client:
+            self.send_motd(conn)
+        return conn
+
+    def before_disconnect(self, handle: ConnectionHandle) -> None:
+        handle.connection_data.close()
+
+    def shutdown(self):
+        super().shutdown()
+        for server in self.servers:
+            server.close()
+        self.servers.clear()
+        for path in self.socket_paths:
+            remove_socket_file(path)
+        self.socket_paths.clear()
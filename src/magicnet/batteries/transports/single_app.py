@@ -2,7 +2,6 @@ __all__ = ["SingleAppTransport"]
 
 import dataclasses
 from typing import cast
-from uuid import UUID, uuid4
 
 from magicnet.core.connection import ConnectionHandle
 from magicnet.core.network_manager import NetworkManager
@@ -18,7 +17,7 @@ class SingleAppTransport(TransportHandler):
     """
 
     remote_nodes: list["SingleAppTransport"] = dataclasses.field(default_factory=list)
-    handle_map: dict[UUID, ConnectionHandle] = dataclasses.field(default_factory=dict)
+    handle_map: dict[int, ConnectionHandle] = dataclasses.field(default_factory=dict)
 
     def send(self, connection: ConnectionHandle, dg: bytes) -> None:
         for node in self.remote_nodes:
@@ -35,7 +34,9 @@ class SingleAppTransport(TransportHandler):
         transport = cast(SingleAppTransport, connection_data.transport.transports[self.manager.role])
         self.remote_nodes.append(transport)
         transport.remote_nodes.append(self)
-        handle = ConnectionHandle(self, uuid4())
+        handle = ConnectionHandle(self, None)
+        # Both sides are in the same process, so the handle ID is unique enough to pair them
+        handle.connection_data = handle.handle_id
         self.handle_map[handle.connection_data] = handle
         transport.handle_new_connection(handle)
 
@@ -1,8 +1,14 @@
-__all__ = ["AsyncIOSocketTransport"]
+__all__ = ["AsyncIOSocketTransport", "AsyncIOUnixSocketTransport", "FramedStreamProtocol"]
 
 import asyncio
-from typing import TYPE_CHECKING, cast
+import contextlib
+import dataclasses
+import functools
+import stat
+from pathlib import Path
+from typing import TYPE_CHECKING, ClassVar, cast
 
+from magicnet.batteries.transports.framing import FRAME_HEADER_SIZE, MAX_FRAME_SIZE, FrameBuffer
 from magicnet.core.connection import ConnectionHandle
 from magicnet.core.transport_handler import TransportHandler
 from magicnet.util.messenger import StandardEvents
@@ -11,27 +17,138 @@ if TYPE_CHECKING:
     from magicnet.batteries.asyncio_network_manager import AsyncIONetworkManager
 
 
+class FramedStreamProtocol(FrameBuffer, asyncio.BufferedProtocol):
+    """
+    FramedStreamProtocol reads and writes length-prefixed frames on a stream socket.
+    The socket is read directly into the FrameBuffer, and the frames are handed
+    to the transport as memoryviews into it, so a frame is only valid
+    until the transport returns from processing it.
+
+    Outgoing frames are appended to an outbound buffer, which a single
+    long-lived drain task joins and writes to the socket with one write() call
+    per event loop iteration. The drain task stops writing while the socket
+    is above its high water mark, which is reported to the ConnectionHandle.
+    (writelines() is not used: on some Python versions it never pauses the protocol)
+    """
+
+    def __init__(self, owner: "AsyncIOSocketTransport", *, from_client: bool = False):
+        self.owner = owner
+        self.from_client = from_client
+        self.transport: asyncio.Transport | None = None
+        self.handle: ConnectionHandle | None = None
+        self.init_buffer(owner.receive_buffer_size)
+        self.outbound: list[bytes] = []
+        self.outbound_size = 0
+        self.pending = asyncio.Event()
+        self.writable = asyncio.Event()
+        self.writable.set()
+        self.drain_task: asyncio.Task[None] | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = cast(asyncio.Transport, transport)
+        self.transport.set_write_buffer_limits(self.owner.write_high_water, self.owner.write_low_water)
+        self.drain_task = self.owner.manager.spawn_task(self.drain_loop())
+        self.handle = self.owner.handle_new_connection(self)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self.owner.emit(StandardEvents.INFO, "AsyncIO connection closed!")
+        if self.drain_task is not None:
+            self.drain_task.cancel()
+        if self.handle is not None:
+            self.owner.handle_lost(self.handle)
+
+    def pause_writing(self) -> None:
+        self.writable.clear()
+        if self.handle is not None:
+            self.handle.pause_writing()
+
+    def resume_writing(self) -> None:
+        self.writable.set()
+        if self.handle is not None:
+            self.handle.resume_writing()
+
+    def write_frame(self, frame: bytes) -> None:
+        self.outbound.append(len(frame).to_bytes(FRAME_HEADER_SIZE, "big"))
+        self.outbound.append(frame)
+        self.outbound_size += FRAME_HEADER_SIZE + len(frame)
+        self.pending.set()
+
+    async def drain_loop(self) -> None:
+        while True:
+            await self.pending.wait()
+            await self.writable.wait()
+            self.flush()
+
+    def flush(self) -> None:
+        self.pending.clear()
+        if not self.outbound or self.transport is None or self.transport.is_closing():
+            return
+        frames = self.outbound
+        self.outbound = []
+        self.outbound_size = 0
+        self.transport.write(b"".join(frames))
+
+    @property
+    def queued_bytes(self) -> int:
+        buffered = self.transport.get_write_buffer_size() if self.transport is not None else 0
+        return self.outbound_size + buffered
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self.view[self.write_pos :]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self.write_pos += nbytes
+        frames = self.split_frames()
+        if frames and self.handle is not None:
+            self.owner.datagrams_received(self.handle, frames)
+        self.compact()
+
+    def close(self) -> None:
+        # Whatever is still queued (i.e. a DISCONNECT message) is sent before closing
+        self.flush()
+        if self.drain_task is not None:
+            self.drain_task.cancel()
+        if self.transport is not None:
+            self.transport.close()
+
+
+@dataclasses.dataclass
 class AsyncIOSocketTransport(TransportHandler["AsyncIONetworkManager"]):
     """
     AsyncIOSocketTransport is used to communicate between two applications
-    using the AsyncIO TCP sockets. Support for UDP and Unix sockets is planned.
+    using the AsyncIO TCP sockets. For Unix sockets see AsyncIOUnixSocketTransport,
+    UDP is supported by AsyncIOUDPTransport.
+
+    All frames that arrive in one socket read are processed together,
+    so the replies to them are sent together as well.
 
     Note: this transport type will only work properly with AsyncIONetworkManager.
     """
 
+    max_datagram_size: ClassVar[int | None] = MAX_FRAME_SIZE
+    receive_buffer_size: ClassVar[int] = 1 << 12
+    """Initial size of the per-connection receive buffer, it grows on demand to fit the largest frame"""
+    write_high_water: ClassVar[int] = 1 << 18
+    """The handle is paused when the socket's write buffer grows above this many bytes"""
+    write_low_water: ClassVar[int] = 1 << 16
+    """The handle is resumed when the socket's write buffer drops below this many bytes"""
+
+    servers: list[asyncio.AbstractServer] = dataclasses.field(default_factory=list, repr=False)
+
     def send(self, connection: ConnectionHandle, dg: bytes) -> None:
-        writer = cast(asyncio.StreamWriter, connection.connection_data)
-        writer.write(len(dg).to_bytes(2, "big"))
-        writer.write(dg)
-        self.manager.spawn_task(writer.drain())
+        protocol = cast(FramedStreamProtocol, connection.connection_data)
+        protocol.write_frame(dg)
+
+    def get_queued_bytes(self, handle: ConnectionHandle) -> int:
+        return cast(FramedStreamProtocol, handle.connection_data).queued_bytes
 
     def connect(self, host: str | None = None, port: int | None = None, *more: object) -> None:
         assert host is not None and port is not None
         self.manager.spawn_task(self.client_connection(host, port))
 
     async def client_connection(self, host: str, port: int):
-        reader, writer = await asyncio.open_connection(host, port)
-        await self.srv_callback(reader, writer, from_client=True)
+        factory = functools.partial(FramedStreamProtocol, self, from_client=True)
+        await self.manager.loop.create_connection(factory, host, port)
 
     def open_server(self, host: str | None = None, port: int | None = None, *more: object) -> None:
         assert host is not None and port is not None
@@ -39,29 +156,67 @@ class AsyncIOSocketTransport(TransportHandler["AsyncIONetworkManager"]):
 
     async def open_server_async(self, host: str, port: int):
         self.emit(StandardEvents.INFO, f"Server opened! Port: {port}")
-        await asyncio.start_server(self.srv_callback, host, port)
-
-    async def srv_callback(
-        self,
-        reader: asyncio.StreamReader,
-        writer: asyncio.StreamWriter,
-        *,
-        from_client: bool = False,
-    ):
+        factory = functools.partial(FramedStreamProtocol, self)
+        self.servers.append(await self.manager.loop.create_server(factory, host, port))
+
+    def handle_new_connection(self, protocol: FramedStreamProtocol) -> ConnectionHandle:
         self.emit(StandardEvents.INFO, "Client connection opened!")
-        conn = ConnectionHandle(self, writer)
-        if not from_client:
+        conn = ConnectionHandle(self, protocol)
+        if not protocol.from_client:
             self.send_motd(conn)
-        while not reader.at_eof():
-            try:
-                bytelen = int.from_bytes(await reader.readexactly(2), byteorder="big")
-                msg = await reader.readexactly(bytelen)
-            except (asyncio.IncompleteReadError, ConnectionError):
-                self.emit(StandardEvents.INFO, "AsyncIO connection closed!")
-                break
-            self.datagram_received(conn, msg)
-        writer.close()
-        conn.destroy()
+        return conn
 
     def before_disconnect(self, handle: ConnectionHandle) -> None:
         handle.connection_data.close()
+
+
+def remove_socket_file(path: str) -> None:
+    """Removes the Unix socket at the path, if there is one, other files are left alone"""
+    socket_path = Path(path)
+    with contextlib.suppress(FileNotFoundError):
+        if stat.S_ISSOCK(socket_path.stat().st_mode):
+            socket_path.unlink()
+
+
+@dataclasses.dataclass
+class AsyncIOUnixSocketTransport(AsyncIOSocketTransport):
+    """
+    AsyncIOUnixSocketTransport is the same as AsyncIOSocketTransport,
+    but uses Unix domain sockets, which skip the TCP stack entirely.
+    This is the preferred transport between the processes on the same host.
+    The connection parameters are the path of the socket instead of host and port.
+    A socket left at the path by a server that did not shut down cleanly is replaced,
+    and shutdown() closes the servers and removes their sockets.
+
+    Note: this transport type will only work properly with AsyncIONetworkManager.
+    """
+
+    socket_paths: list[str] = dataclasses.field(default_factory=list, repr=False)
+
+    def connect(self, path: str | None = None, *more: object) -> None:
+        assert path is not None
+        self.manager.spawn_task(self.client_connection_unix(path))
+
+    async def client_connection_unix(self, path: str):
+        factory = functools.partial(FramedStreamProtocol, self, from_client=True)
+        await self.manager.loop.create_unix_connection(factory, path)
+
+    def open_server(self, path: str | None = None, *more: object) -> None:
+        assert path is not None
+        self.manager.spawn_task(self.open_server_unix(path))
+
+    async def open_server_unix(self, path: str):
+        self.emit(StandardEvents.INFO, f"Server opened! Path: {path}")
+        factory = functools.partial(FramedStreamProtocol, self)
+        remove_socket_file(path)
+        self.servers.append(await self.manager.loop.create_unix_server(factory, path))
+        self.socket_paths.append(path)
+
+    def shutdown(self):
+        super().shutdown()
+        for server in self.servers:
+            server.close()
+        self.servers.clear()
+        for path in self.socket_paths:
+            remove_socket_file(path)
+        self.socket_paths.clear()
@@ -0,0 +1,174 @@
+__all__ = ["SelectorSocketTransport", "SelectorConnection"]
+
+import dataclasses
+import selectors
+import socket
+from typing import TYPE_CHECKING, ClassVar, cast
+
+from magicnet.batteries.transports.framing import FRAME_HEADER_SIZE, MAX_FRAME_SIZE, FrameBuffer
+from magicnet.core.connection import ConnectionHandle
+from magicnet.core.transport_handler import TransportHandler
+from magicnet.util.messenger import StandardEvents
+
+if TYPE_CHECKING:
+    from magicnet.batteries.selector_network_manager import SelectorNetworkManager
+
+
+class SelectorConnection(FrameBuffer):
+    """
+    SelectorConnection reads and writes length-prefixed frames on a non-blocking socket.
+    Incoming frames are read into the FrameBuffer whenever the socket is readable.
+    Outgoing frames are appended to the outbound buffer and written
+    at the end of SelectorNetworkManager.poll(), whatever the socket
+    did not accept is written once it becomes writable again.
+    """
+
+    def __init__(self, owner: "SelectorSocketTransport", sock: socket.socket, *, from_client: bool = False):
+        self.owner = owner
+        self.sock = sock
+        self.from_client = from_client
+        self.outbound = bytearray()
+        self.init_buffer(owner.receive_buffer_size)
+        self.closed = False
+        self.waiting_writable = False
+        sock.setblocking(False)  # noqa: FBT003
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        owner.manager.selector.register(sock, selectors.EVENT_READ, self.on_event)
+        self.handle = owner.handle_new_connection(self)
+
+    def on_event(self, mask: int) -> None:
+        if mask & selectors.EVENT_READ:
+            self.on_readable()
+        if mask & selectors.EVENT_WRITE and not self.closed:
+            self.flush()
+
+    def on_readable(self) -> None:
+        while not self.closed:
+            try:
+                nbytes = self.sock.recv_into(self.view[self.write_pos :])
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                self.owner.emit(StandardEvents.INFO, f"Socket error: {e!r}")
+                self.owner.handle_lost(self.handle)
+                return
+            if not nbytes:
+                self.owner.emit(StandardEvents.INFO, "Selector connection closed!")
+                self.owner.handle_lost(self.handle)
+                return
+            self.write_pos += nbytes
+            frames = self.split_frames()
+            if frames:
+                self.owner.datagrams_received(self.handle, frames)
+            self.compact()
+
+    def write_frame(self, frame: bytes) -> None:
+        if not self.outbound:
+            self.owner.manager.pending_writes.add(self)
+        self.outbound += len(frame).to_bytes(FRAME_HEADER_SIZE, "big")
+        self.outbound += frame
+        if len(self.outbound) > self.owner.write_high_water:
+            self.handle.pause_writing()
+
+    def flush(self) -> None:
+        if self.closed or not self.outbound:
+            return
+        try:
+            sent = self.sock.send(self.outbound)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError as e:
+            self.owner.emit(StandardEvents.INFO, f"Socket error: {e!r}")
+            self.owner.handle_lost(self.handle)
+            return
+        del self.outbound[:sent]
+        # Only wait for the socket to become writable while there is something left to write
+        if self.waiting_writable != bool(self.outbound):
+            self.waiting_writable = bool(self.outbound)
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if self.outbound else 0)
+            self.owner.manager.selector.modify(self.sock, events, self.on_event)
+        if len(self.outbound) < self.owner.write_low_water:
+            self.handle.resume_writing()
+
+    def close(self) -> None:
+        # Whatever is still queued (i.e. a DISCONNECT message) is sent before closing
+        self.flush()
+        self.closed = True
+        self.owner.manager.pending_writes.discard(self)
+        self.owner.manager.selector.unregister(self.sock)
+        self.sock.close()
+
+
+@dataclasses.dataclass
+class SelectorSocketTransport(TransportHandler["SelectorNetworkManager"]):
+    """
+    SelectorSocketTransport is used to communicate between two applications
+    using the non-blocking TCP sockets, without any event loop.
+    All frames that are available when SelectorNetworkManager.poll() is called
+    are processed together, so the replies to them are sent together as well.
+
+    Note: this transport type will only work properly with SelectorNetworkManager.
+    Also, connect() blocks until the connection is made (or connect_timeout passes).
+    shutdown() closes the connections and the listening sockets.
+    """
+
+    max_datagram_size: ClassVar[int | None] = MAX_FRAME_SIZE
+    receive_buffer_size: ClassVar[int] = 1 << 12
+    """Initial size of the per-connection receive buffer, it grows on demand to fit the largest frame"""
+    write_high_water: ClassVar[int] = 1 << 18
+    """The handle is paused when the outbound buffer grows above this many bytes"""
+    write_low_water: ClassVar[int] = 1 << 16
+    """The handle is resumed when the outbound buffer drops below this many bytes"""
+    connect_timeout: ClassVar[float] = 10.0
+    listen_backlog: ClassVar[int] = 100
+
+    servers: list[socket.socket] = dataclasses.field(default_factory=list, repr=False)
+
+    def send(self, connection: ConnectionHandle, dg: bytes) -> None:
+        conn = cast(SelectorConnection, connection.connection_data)
+        conn.write_frame(dg)
+
+    def get_queued_bytes(self, handle: ConnectionHandle) -> int:
+        return len(cast(SelectorConnection, handle.connection_data).outbound)
+
+    def connect(self, host: str | None = None, port: int | None = None, *more: object) -> None:
+        assert host is not None and port is not None
+        sock = socket.create_connection((host, port), timeout=self.connect_timeout)
+        SelectorConnection(self, sock, from_client=True)
+
+    def open_server(self, host: str | None = None, port: int | None = None, *more: object) -> None:
+        assert host is not None and port is not None
+        sock = socket.create_server((host, port), backlog=self.listen_backlog)
+        sock.setblocking(False)  # noqa: FBT003
+        self.manager.selector.register(sock, selectors.EVENT_READ, lambda _mask: self.accept_connections(sock))
+        self.servers.append(sock)
+        self.emit(StandardEvents.INFO, f"Server opened! Port: {sock.getsockname()[1]}")
+
+    def accept_connections(self, server: socket.socket) -> None:
+        while True:
+            try:
+                sock, _ = server.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            SelectorConnection(self, sock)
+
+    def close_servers(self) -> None:
+        for sock in self.servers:
+            self.manager.selector.unregister(sock)
+            sock.close()
+        self.servers.clear()
+
+    def shutdown(self):
+        super().shutdown()
+        self.close_servers()
+
+    def handle_new_connection(self, conn: SelectorConnection) -> ConnectionHandle:
+        self.emit(StandardEvents.INFO, "Client connection opened!")
+        handle = ConnectionHandle(self, conn)
+        if not conn.from_client:
+            self.send_motd(handle)
+        return handle
+
+    def before_disconnect(self, handle: ConnectionHandle) -> None:
+        handle.connection_data.close()
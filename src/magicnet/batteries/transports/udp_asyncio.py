@@ -0,0 +1,391 @@
+__all__ = ["AsyncIOUDPTransport", "UDPEndpoint", "UDPPeer", "PacketKind"]
+
+import asyncio
+import dataclasses
+import functools
+import struct
+import time
+from collections import defaultdict
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any, ClassVar, cast
+
+from typing_extensions import Unpack
+
+from magicnet.core.connection import ConnectionHandle
+from magicnet.core.net_globals import DeliveryMode
+from magicnet.core.net_message import NetMessage
+from magicnet.core.transport_handler import TransportHandler
+from magicnet.util.messenger import StandardEvents
+
+if TYPE_CHECKING:
+    from magicnet.batteries.asyncio_network_manager import AsyncIONetworkManager
+
+# kind, flags, delivery mode, channel, sequence number
+PACKET_HEADER = struct.Struct("!BBBBI")
+# channel, sequence number
+ACK_ENTRY = struct.Struct("!BI")
+MAX_UDP_PAYLOAD = 65507
+SEQUENCE_MODULO = 1 << 32
+FLAG_MORE_FRAGMENTS = 1
+
+
+class PacketKind(IntEnum):
+    CONNECT = 1
+    DATA = 2
+    ACK = 3
+    CLOSE = 4
+
+
+def sequence_newer(a: int, b: int) -> bool:
+    """Returns True if the sequence number a comes after b, accounting for the wraparound"""
+    return 0 < (a - b) % SEQUENCE_MODULO < SEQUENCE_MODULO // 2
+
+
+@dataclasses.dataclass
+class PendingPacket:
+    packet: bytes
+    deadline: float
+    retransmits: int = 0
+
+
+class UDPPeer:
+    """
+    UDPPeer keeps the reliability state of one remote address,
+    and is used as the connection_data of its ConnectionHandle.
+
+    Every (delivery mode, channel) pair has its own sequence numbers.
+    Reliable packets are retransmitted until acknowledged, and delivered
+    in order within the channel, reliable messages that do not fit
+    into one packet are fragmented. Sequenced packets older than
+    the last delivered one on the channel are dropped.
+    """
+
+    def __init__(self, endpoint: "UDPEndpoint", address: Any):
+        self.endpoint = endpoint
+        self.address = address
+        self.handle: ConnectionHandle | None = None
+        self.confirmed = False
+        self.connect_attempts = 0
+        self.next_sequence: dict[tuple[int, int], int] = defaultdict(int)
+        self.unacked: dict[tuple[int, int], PendingPacket] = {}
+        self.unacked_size = 0
+        self.expected: dict[int, int] = defaultdict(int)
+        self.out_of_order: dict[int, dict[int, tuple[int, bytes]]] = defaultdict(dict)
+        self.fragments: dict[int, list[bytes]] = defaultdict(list)
+        self.last_sequenced: dict[int, int] = {}
+        self.pending_acks: list[tuple[int, int]] = []
+
+    @property
+    def owner(self) -> "AsyncIOUDPTransport":
+        return self.endpoint.owner
+
+    def take_sequence(self, mode: int, channel: int) -> int:
+        sequence = self.next_sequence[mode, channel]
+        self.next_sequence[mode, channel] = (sequence + 1) % SEQUENCE_MODULO
+        return sequence
+
+    def send_data(self, mode: DeliveryMode, channel: int, payload: bytes) -> None:
+        if mode != DeliveryMode.RELIABLE_ORDERED:
+            sequence = self.take_sequence(mode, channel)
+            packet = PACKET_HEADER.pack(PacketKind.DATA, 0, mode, channel, sequence) + payload
+            if len(packet) > MAX_UDP_PAYLOAD:
+                self.owner.emit(StandardEvents.ERROR, f"Unreliable datagram is too large: {len(payload)} bytes")
+                return
+            self.endpoint.sendto(packet, self.address)
+            return
+
+        # An empty payload is still sent as a single empty chunk
+        limit = self.owner.max_datagram_size or max(len(payload), 1)
+        chunks = [payload[start : start + limit] for start in range(0, len(payload), limit)] or [payload]
+        deadline = time.monotonic() + self.owner.retransmit_timeout
+        for index, chunk in enumerate(chunks):
+            flags = FLAG_MORE_FRAGMENTS if index < len(chunks) - 1 else 0
+            sequence = self.take_sequence(mode, channel)
+            packet = PACKET_HEADER.pack(PacketKind.DATA, flags, mode, channel, sequence) + chunk
+            self.unacked[channel, sequence] = PendingPacket(packet, deadline)
+            self.unacked_size += len(packet)
+            self.endpoint.sendto(packet, self.address)
+        self.endpoint.schedule_retransmits()
+
+    def receive_data(self, flags: int, mode: int, channel: int, sequence: int, payload: bytes) -> list[bytes]:
+        """Returns the datagrams that can be delivered after receiving this packet"""
+        if mode == DeliveryMode.UNRELIABLE:
+            return [payload]
+        if mode == DeliveryMode.UNRELIABLE_SEQUENCED:
+            last = self.last_sequenced.get(channel)
+            if last is not None and not sequence_newer(sequence, last):
+                return []
+            self.last_sequenced[channel] = sequence
+            return [payload]
+
+        expected = self.expected[channel]
+        buffered = self.out_of_order[channel]
+        if sequence != expected:
+            if not sequence_newer(sequence, expected):
+                # A retransmission of something already delivered, the ack was lost
+                self.pending_acks.append((channel, sequence))
+            elif sequence in buffered or len(buffered) < self.owner.max_out_of_order:
+                # Only acknowledge what was stored, otherwise the sender would never resend it
+                buffered[sequence] = (flags, payload)
+                self.pending_acks.append((channel, sequence))
+            return []
+
+        self.pending_acks.append((channel, sequence))
+        ready: list[bytes] = []
+        while True:
+            self.collect_fragment(channel, flags, payload, ready)
+            expected = (expected + 1) % SEQUENCE_MODULO
+            if expected not in buffered:
+                break
+            flags, payload = buffered.pop(expected)
+        self.expected[channel] = expected
+        return ready
+
+    def collect_fragment(self, channel: int, flags: int, payload: bytes, ready: list[bytes]) -> None:
+        fragments = self.fragments[channel]
+        if flags & FLAG_MORE_FRAGMENTS:
+            fragments.append(payload)
+            return
+        if fragments:
+            fragments.append(payload)
+            payload = b"".join(fragments)
+            fragments.clear()
+        ready.append(payload)
+
+    def receive_acks(self, payload: bytes) -> None:
+        for offset in range(0, len(payload) - ACK_ENTRY.size + 1, ACK_ENTRY.size):
+            if pending := self.unacked.pop(ACK_ENTRY.unpack_from(payload, offset), None):
+                self.unacked_size -= len(pending.packet)
+
+    def pack_acks(self) -> list[bytes]:
+        header = PACKET_HEADER.pack(PacketKind.ACK, 0, 0, 0, 0)
+        per_packet = max(1, (self.owner.max_datagram_size or MAX_UDP_PAYLOAD) // ACK_ENTRY.size)
+        acks, self.pending_acks = self.pending_acks, []
+        packets: list[bytes] = []
+        for start in range(0, len(acks), per_packet):
+            entries = acks[start : start + per_packet]
+            packets.append(header + b"".join(ACK_ENTRY.pack(channel, seq) for channel, seq in entries))
+        return packets
+
+    def retransmit(self, now: float) -> bool:
+        """Resends the packets whose timers ran out, returns False if the peer is considered lost"""
+        owner = self.owner
+        if not self.confirmed:
+            if self.connect_attempts > owner.max_retransmits:
+                return False
+            self.endpoint.send_connect(self)
+        for pending in self.unacked.values():
+            if pending.deadline > now:
+                continue
+            if pending.retransmits >= owner.max_retransmits:
+                return False
+            pending.retransmits += 1
+            pending.deadline = now + owner.retransmit_timeout * (1 << min(pending.retransmits, 5))
+            self.endpoint.sendto(pending.packet, self.address)
+        return True
+
+
+class UDPEndpoint(asyncio.DatagramProtocol):
+    """
+    UDPEndpoint is a single UDP socket. A server endpoint serves every peer
+    that sent a CONNECT packet to it, a client endpoint talks to one peer.
+    Acks are batched and sent once per event loop iteration,
+    and one timer per endpoint retransmits the unacknowledged packets.
+    """
+
+    def __init__(self, owner: "AsyncIOUDPTransport", remote_address: Any = None):
+        self.owner = owner
+        self.remote_address = remote_address
+        self.transport: asyncio.DatagramTransport | None = None
+        self.peers: dict[Any, UDPPeer] = {}
+        self.ack_peers: set[UDPPeer] = set()
+        self.retransmit_timer: asyncio.TimerHandle | None = None
+        self.acks_scheduled = False
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self.owner.manager.loop
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = self.owner.wrap_endpoint_transport(cast(asyncio.DatagramTransport, transport))
+        if self.remote_address is not None:
+            peer = self.peers[self.remote_address] = UDPPeer(self, self.remote_address)
+            self.send_connect(peer)
+            self.schedule_retransmits()
+            peer.handle = self.owner.handle_new_connection(peer, from_client=True)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        if self.retransmit_timer is not None:
+            self.retransmit_timer.cancel()
+        for peer in list(self.peers.values()):
+            if peer.handle is not None:
+                self.owner.handle_lost(peer.handle)
+
+    def error_received(self, exc: Exception) -> None:
+        # i.e. ICMP port unreachable, the retransmit timer deals with the consequences
+        self.owner.emit(StandardEvents.DEBUG, f"UDP socket error: {exc!r}")
+
+    def find_peer(self, address: Any) -> UDPPeer | None:
+        if self.remote_address is not None:
+            return self.peers.get(self.remote_address)
+        return self.peers.get(address)
+
+    def sendto(self, packet: bytes, address: Any) -> None:
+        if self.transport is None or self.transport.is_closing():
+            return
+        # Client sockets are connected, and only accept the default address
+        self.transport.sendto(packet, None if self.remote_address is not None else address)
+
+    def send_connect(self, peer: UDPPeer) -> None:
+        peer.connect_attempts += 1
+        self.sendto(PACKET_HEADER.pack(PacketKind.CONNECT, 0, 0, 0, 0), peer.address)
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        if len(data) < PACKET_HEADER.size:
+            return
+        kind, flags, mode, channel, sequence = PACKET_HEADER.unpack_from(data)
+        peer = self.find_peer(addr)
+        if kind == PacketKind.CONNECT:
+            if peer is None and self.remote_address is None:
+                peer = self.peers[addr] = UDPPeer(self, addr)
+                peer.confirmed = True
+                peer.handle = self.owner.handle_new_connection(peer)
+            return
+        if peer is None or peer.handle is None:
+            return
+
+        peer.confirmed = True
+        payload = data[PACKET_HEADER.size :]
+        if kind == PacketKind.DATA:
+            datagrams = peer.receive_data(flags, mode, channel, sequence, payload)
+            if peer.pending_acks:
+                self.schedule_acks(peer)
+            if datagrams:
+                self.owner.datagrams_received(peer.handle, datagrams)
+        elif kind == PacketKind.ACK:
+            peer.receive_acks(payload)
+        elif kind == PacketKind.CLOSE:
+            self.owner.emit(StandardEvents.INFO, "UDP connection closed!")
+            self.owner.handle_lost(peer.handle)
+
+    def schedule_acks(self, peer: UDPPeer) -> None:
+        self.ack_peers.add(peer)
+        if not self.acks_scheduled:
+            self.acks_scheduled = True
+            self.loop.call_soon(self.flush_acks)
+
+    def flush_acks(self) -> None:
+        self.acks_scheduled = False
+        peers, self.ack_peers = self.ack_peers, set()
+        for peer in peers:
+            for packet in peer.pack_acks():
+                self.sendto(packet, peer.address)
+
+    def schedule_retransmits(self) -> None:
+        if self.retransmit_timer is None:
+            self.retransmit_timer = self.loop.call_later(self.owner.retransmit_timeout, self.retransmit)
+
+    def retransmit(self) -> None:
+        self.retransmit_timer = None
+        now = time.monotonic()
+        waiting = False
+        for peer in list(self.peers.values()):
+            if not peer.retransmit(now):
+                self.owner.emit(StandardEvents.WARNING, f"UDP peer {peer.address} stopped responding")
+                if peer.handle is not None:
+                    self.owner.handle_lost(peer.handle)
+                continue
+            waiting = waiting or bool(peer.unacked) or not peer.confirmed
+        if waiting:
+            self.schedule_retransmits()
+
+    def remove_peer(self, peer: UDPPeer) -> None:
+        # Best effort, if it is lost the other side will time out instead
+        self.sendto(PACKET_HEADER.pack(PacketKind.CLOSE, 0, 0, 0, 0), peer.address)
+        self.peers.pop(peer.address, None)
+        self.ack_peers.discard(peer)
+        if self.remote_address is not None and self.transport is not None:
+            self.transport.close()
+
+
+@dataclasses.dataclass
+class AsyncIOUDPTransport(TransportHandler["AsyncIONetworkManager"]):
+    """
+    AsyncIOUDPTransport is used to communicate between two applications
+    using the AsyncIO UDP sockets. Every message is delivered according to
+    its delivery mode and channel (see DeliveryMode), which can be set
+    on the NetMessage or on the NetworkField. Channels are ordered independently,
+    so a lost packet only holds back the messages of its own channel.
+
+    Messages sent together are packed into as few datagrams as possible
+    without going over max_datagram_size, which keeps packets below the MTU.
+
+    Note: this transport type will only work properly with AsyncIONetworkManager.
+    """
+
+    max_datagram_size: ClassVar[int | None] = 1200 - PACKET_HEADER.size
+    """Payload size of a packet, reliable messages above it are fragmented"""
+    retransmit_timeout: ClassVar[float] = 0.1
+    """Delay before the first retransmission, doubled on every further one"""
+    max_retransmits: ClassVar[int] = 10
+    """The peer is disconnected once a packet has been retransmitted this many times"""
+    max_out_of_order: ClassVar[int] = 1024
+    """How many reliable packets can be held per channel while waiting for a lost one"""
+
+    endpoints: list[UDPEndpoint] = dataclasses.field(default_factory=list, repr=False)
+
+    def send(self, connection: ConnectionHandle, dg: bytes) -> None:
+        peer = cast(UDPPeer, connection.connection_data)
+        peer.send_data(DeliveryMode.RELIABLE_ORDERED, 0, dg)
+
+    def get_queued_bytes(self, handle: ConnectionHandle) -> int:
+        # Reliable packets are kept until acknowledged, the unreliable ones are never queued
+        return cast(UDPPeer, handle.connection_data).unacked_size
+
+    def send_messages(self, handle: ConnectionHandle, messages: list[NetMessage[Unpack[tuple[Any, ...]]]]) -> None:
+        peer = cast(UDPPeer, handle.connection_data)
+        groups: dict[tuple[DeliveryMode, int], list[NetMessage[Unpack[tuple[Any, ...]]]]] = defaultdict(list)
+        for message in messages:
+            groups[message.delivery, message.channel].append(message)
+        for (mode, channel), group in groups.items():
+            for datagram in self.pack_datagrams(group):
+                if datagram := self.prepare_datagram(datagram):
+                    peer.send_data(mode, channel, datagram)
+
+    def pack_oversized(self, message: NetMessage[Unpack[tuple[Any, ...]]], datagram: bytes) -> list[bytes]:
+        # Reliable datagrams are fragmented, unreliable ones rely on IP fragmentation
+        return [datagram]
+
+    def wrap_endpoint_transport(self, transport: asyncio.DatagramTransport) -> asyncio.DatagramTransport:
+        """Can be overridden to wrap the socket, i.e. to simulate packet loss"""
+        return transport
+
+    def connect(self, host: str | None = None, port: int | None = None, *more: object) -> None:
+        assert host is not None and port is not None
+        self.manager.spawn_task(self.client_connection(host, port))
+
+    async def client_connection(self, host: str, port: int):
+        factory = functools.partial(UDPEndpoint, self, (host, port))
+        _, endpoint = await self.manager.loop.create_datagram_endpoint(factory, remote_addr=(host, port))
+        self.endpoints.append(endpoint)
+
+    def open_server(self, host: str | None = None, port: int | None = None, *more: object) -> None:
+        assert host is not None and port is not None
+        self.manager.spawn_task(self.open_server_async(host, port))
+
+    async def open_server_async(self, host: str, port: int):
+        self.emit(StandardEvents.INFO, f"Server opened! Port: {port}")
+        factory = functools.partial(UDPEndpoint, self)
+        _, endpoint = await self.manager.loop.create_datagram_endpoint(factory, local_addr=(host, port))
+        self.endpoints.append(endpoint)
+
+    def handle_new_connection(self, peer: UDPPeer, *, from_client: bool = False) -> ConnectionHandle:
+        self.emit(StandardEvents.INFO, "Client connection opened!")
+        conn = ConnectionHandle(self, peer)
+        if not from_client:
+            self.send_motd(conn)
+        return conn
+
+    def before_disconnect(self, handle: ConnectionHandle) -> None:
+        peer = cast(UDPPeer, handle.connection_data)
+        peer.endpoint.remove_peer(peer)
@@ -1,14 +1,17 @@
 __all__ = ["ConnectionHandle"]
 
 import dataclasses
+import itertools
+import time
 from typing import TYPE_CHECKING, Annotated, Any, TypeVar
-from uuid import UUID, uuid4
+from uuid import UUID
 
 from magicnet.core import errors
 from magicnet.core.net_globals import MNEvents
 from magicnet.core.net_message import NetMessage
 from magicnet.protocol.protocol_globals import StandardDCReasons, StandardMessageTypes
 from magicnet.util.messenger import StandardEvents
+from magicnet.util.slots import LazyUUID, WeakrefSlot
 from magicnet.util.typechecking.magicnet_typechecker import check_type
 
 if TYPE_CHECKING:
@@ -16,10 +19,11 @@ if TYPE_CHECKING:
 
 
 X = TypeVar("X")
+handle_ids = itertools.count(1)
 
 
-@dataclasses.dataclass
-class ConnectionHandle:
+@dataclasses.dataclass(slots=True)
+class ConnectionHandle(WeakrefSlot):
     """
     ConnectionHandle is an abstraction over a connection in the network.
     """
@@ -28,13 +32,26 @@ class ConnectionHandle:
     """The transport handler the connection belongs to"""
     connection_data: Any = dataclasses.field(repr=False)
     """Data used by the transport to identify the connection, i.e. socket handle"""
-    uuid: UUID = dataclasses.field(default_factory=uuid4)
+    handle_id: int = dataclasses.field(default_factory=handle_ids.__next__)
+    """Identifier of the connection, unique within the process"""
     activated: bool = False
     destroyed: bool = False
+    flow_paused: bool = False
+    """Set while the outbound buffer of the connection is above its high water mark"""
+    outbound_paused: bool = False
+    """Set while the transport holds the messages for this connection, see SlowConsumerPolicy.PAUSE_PRODUCER"""
+    last_received: float = dataclasses.field(default_factory=time.monotonic)
+    """time.monotonic() of the last datagram received from this connection"""
+    rtt: float | None = None
+    """Smoothed round trip time in seconds, measured by the heartbeat"""
+    rtt_jitter: float = 0.0
+    """Mean deviation of the round trip time in seconds"""
     context: dict[str, Any] = dataclasses.field(default_factory=dict)
     """Data used by the application to store data persistent for this connection"""
     shared_parameters: dict[str, Any] = dataclasses.field(default_factory=dict)
     """Same as context, but will be more or less the same on both sides"""
+    uuid: UUID = dataclasses.field(default=None, kw_only=True, repr=False, compare=False)  # pyright: ignore[reportAssignmentType]
+    """A globally unique identifier of the connection, created on first access unless passed to the constructor"""
 
     def activate(self):
         if self.activated:
@@ -43,17 +60,59 @@ class ConnectionHandle:
         self.transport.manage_handle(self)
         self.transport.emit(MNEvents.HANDLE_ACTIVATED, self)
 
+    @property
+    def queued_bytes(self) -> int:
+        """How many bytes are queued to be sent to this connection"""
+        return self.transport.get_queued_bytes(self)
+
+    def add_rtt_sample(self, sample: float):
+        """Updates the smoothed round trip time like TCP does (RFC 6298)"""
+        if self.rtt is None:
+            self.rtt = sample
+            self.rtt_jitter = sample / 2
+            return
+        self.rtt_jitter = 0.75 * self.rtt_jitter + 0.25 * abs(self.rtt - sample)
+        self.rtt = 0.875 * self.rtt + 0.125 * sample
+
+    @property
+    def write_paused(self) -> bool:
+        """
+        Whether producers sending a lot of data to this handle
+        should hold off until HANDLE_WRITE_RESUMED is emitted.
+        """
+        return self.flow_paused or self.outbound_paused
+
+    def pause_writing(self):
+        """Called by the transport when the data queued for this connection goes above the high water mark."""
+        self.set_paused(flow_paused=True)
+
+    def resume_writing(self):
+        """Called by the transport when the queued data drops below the low water mark."""
+        self.set_paused(flow_paused=False)
+
+    def set_paused(self, *, flow_paused: bool | None = None, outbound_paused: bool | None = None):
+        """
+        Updates the reasons for the handle to be paused, and emits HANDLE_WRITE_PAUSED
+        or HANDLE_WRITE_RESUMED if write_paused has changed. The flow control
+        of the transport and PAUSE_PRODUCER are tracked separately, so one of them
+        does not resume the handle that is still paused by the other one.
+        """
+        was_paused = self.write_paused
+        if flow_paused is not None:
+            self.flow_paused = flow_paused
+        if outbound_paused is not None:
+            self.outbound_paused = outbound_paused
+        if self.write_paused != was_paused:
+            event = MNEvents.HANDLE_WRITE_PAUSED if self.write_paused else MNEvents.HANDLE_WRITE_RESUMED
+            self.transport.emit(event, self)
+
     def send_disconnect(self, reason: int, detail: str | None = None):
         msg = NetMessage(StandardMessageTypes.DISCONNECT, (reason, detail), destination=self)
         self.transport.manager.send_message(msg)
         self.destroy()
 
     def destroy(self):
-        if self.destroyed:
-            return
-        self.destroyed = True
-        self.transport.emit(MNEvents.HANDLE_DESTROYED, self)
-        self.transport.destroy_handle(self)
+        self.transport.destroy_handles([self])
 
     def set_shared_parameter(self, name: str, value: Any):
         self.shared_parameters[name] = value
@@ -79,9 +138,12 @@ class ConnectionHandle:
             else:
                 self.transport.emit(
                     StandardEvents.WARNING,
-                    f"Unable to read the shared parameter {name} from {self.uuid}",
+                    f"Unable to read the shared parameter {name} from {self.handle_id}",
                 )
 
             return False, None
 
         return True, value
+
+
+LazyUUID.install(ConnectionHandle)
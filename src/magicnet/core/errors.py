@@ -147,6 +147,11 @@ class InvalidClientRepository(ApplicationConfigurationError):
         super().__init__(f"Invalid client repository: {value}")
 
 
+class InvalidChannel(ApplicationConfigurationError):
+    def __init__(self, value: int):
+        super().__init__(f"Invalid message channel: {value}, must be from 0 to 255")
+
+
 class NoNetworkName(ApplicationConfigurationError):
     def __init__(self, class_name: str):
         super().__init__(f"Class {class_name} has no network name")
@@ -3,7 +3,6 @@ __all__ = ["HandleFilter", "BaseHandleFilter"]
 import abc
 from collections.abc import Collection
 from typing import TYPE_CHECKING, Any, Generic
-from uuid import UUID
 
 from typing_extensions import TypeVar, Unpack
 
@@ -30,7 +29,7 @@ class HandleFilter(MessengerNode["TransportHandler[ManagerT]", "ManagerT"], Gene
         return self.parent
 
     @abc.abstractmethod
-    def resolve_destination(self, message: NetMessage[Unpack[tuple[Any, ...]]]) -> Collection[UUID]:
+    def resolve_destination(self, message: NetMessage[Unpack[tuple[Any, ...]]]) -> Collection[int]:
         """
         Returns the set of handle IDs that a message should be delivered to.
         The message will be copied to each of the destinations here.
@@ -47,5 +46,5 @@ class BaseHandleFilter(HandleFilter[ManagerT], Generic[ManagerT]):
     or to everyone in the transport if the connection isn't set.
     """
 
-    def resolve_destination(self, message: NetMessage[Unpack[tuple[Any, ...]]]) -> Collection[UUID]:
+    def resolve_destination(self, message: NetMessage[Unpack[tuple[Any, ...]]]) -> Collection[int]:
         return self.transport.connections.keys()
@@ -0,0 +1,83 @@
+__all__ = ["HeartbeatManager", "timestamp_us"]
+
+import dataclasses
+import time
+from typing import TYPE_CHECKING
+
+from magicnet.core.connection import ConnectionHandle
+from magicnet.core.net_globals import MessagePriority, MNEvents
+from magicnet.core.net_message import NetMessage
+from magicnet.protocol.protocol_globals import StandardDCReasons, StandardMessageTypes
+from magicnet.util.messenger import MessengerNode, StandardEvents
+
+if TYPE_CHECKING:
+    from magicnet.core.network_manager import NetworkManager
+
+
+def timestamp_us() -> int:
+    """Monotonic timestamp in microseconds, as carried by PING and PONG"""
+    return time.monotonic_ns() // 1000
+
+
+@dataclasses.dataclass
+class HeartbeatManager(MessengerNode["NetworkManager", "NetworkManager"]):
+    """
+    HeartbeatManager is a helper class that is added as a child to the NetworkManager.
+    If the manager has a heartbeat_interval, every activated handle is sent a PING
+    once per interval, and the handles that did not send anything for longer
+    than idle_timeout are disconnected, even if they never finished the handshake.
+    A single timer serves all handles, so the pings to every handle go out in one batch.
+    """
+
+    started: bool = False
+
+    @property
+    def manager(self) -> "NetworkManager":
+        return self.parent
+
+    def __post_init__(self):
+        self.listen(MNEvents.BEFORE_LAUNCH, self.start)
+
+    def start(self):
+        interval = self.manager.heartbeat_interval
+        if self.started or interval is None:
+            return
+        self.started = self.manager.call_later(interval, self.tick)
+        if not self.started:
+            self.emit(StandardEvents.WARNING, "Heartbeat requires a network manager with an event loop")
+
+    def tick(self):
+        manager = self.manager
+        now = time.monotonic()
+        timestamp = timestamp_us()
+        with manager.transport.message_queue:
+            for transport in manager.transport.transports.values():
+                idle: list[ConnectionHandle] = []
+                for handle in transport.connections.values():
+                    if handle.destroyed:
+                        continue
+                    if manager.idle_timeout is not None and now - handle.last_received > manager.idle_timeout:
+                        idle.append(handle)
+                        continue
+                    if not handle.activated:
+                        # The other side is not ready to answer a PING before the handshake
+                        continue
+                    ping = NetMessage(
+                        StandardMessageTypes.PING, (timestamp,), destination=handle, priority=MessagePriority.HIGH
+                    )
+                    manager.send_message(ping)
+                if idle:
+                    self.reap_handles(idle)
+        if manager.heartbeat_interval is not None:
+            manager.call_later(manager.heartbeat_interval, self.tick)
+
+    def reap_handles(self, handles: list[ConnectionHandle]):
+        self.emit(StandardEvents.INFO, f"Disconnecting {len(handles)} idle handles")
+        for handle in handles:
+            message = NetMessage(
+                StandardMessageTypes.DISCONNECT,
+                (StandardDCReasons.IDLE_TIMEOUT, "No data received"),
+                destination=handle,
+            )
+            self.manager.send_message(message)
+        handles[0].transport.destroy_handles(handles)
@@ -1,6 +1,6 @@
-__all__ = ["MNEvents", "MNMathTargets"]
+__all__ = ["MNEvents", "MNMathTargets", "DeliveryMode", "MessagePriority", "SlowConsumerPolicy"]
 
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
 
 
 class MNEvents(Enum):
@@ -12,11 +12,17 @@ class MNEvents(Enum):
     DATAGRAM_RECEIVED = auto()
     HANDLE_ACTIVATED = auto()
     HANDLE_DESTROYED = auto()
+    HANDLES_DESTROYED = auto()
+    """Emitted once with the list of all handles destroyed together, after their HANDLE_DESTROYED"""
+    HANDLE_WRITE_PAUSED = auto()
+    HANDLE_WRITE_RESUMED = auto()
     MOTD_SET = auto()
     BEFORE_LAUNCH = auto()
     BEFORE_SHUTDOWN = auto()
     DISCONNECT = auto()
     BAD_NETWORK_OBJECT_CALL = auto()
+    BEFORE_FLUSH = auto()
+    """Emitted before the queued messages are delivered, the listeners may still send messages"""
 
 
 class MNMathTargets(Enum):
@@ -26,8 +32,61 @@ class MNMathTargets(Enum):
     """
 
     MSG_SEND = auto()
+    """Called with each message and its handle, kept for the operators registered directly"""
     MSG_RECV = auto()
+    MSG_SEND_BATCH = auto()
+    """Called with the list of messages for one handle and the handle, see add_batch_message_operator()"""
+    MSG_RECV_BATCH = auto()
     BYTE_SEND = auto()
     BYTE_RECV = auto()
     VISIBLE_OBJECTS = auto()
     FIELD_CALL_ALLOWED = auto()
+
+
+class DeliveryMode(IntEnum):
+    """
+    Delivery guarantees requested for a message. Stream-based transports
+    deliver every message reliably and in order regardless of this setting,
+    datagram-based transports (i.e. AsyncIOUDPTransport) honor it.
+    """
+
+    RELIABLE_ORDERED = 0
+    """The message is retransmitted until acknowledged, and delivered in order within its channel"""
+    UNRELIABLE_SEQUENCED = 1
+    """The message may be lost, and is dropped if a newer message on its channel was already delivered"""
+    UNRELIABLE = 2
+    """The message may be lost, duplicated or reordered"""
+
+
+class MessagePriority(IntEnum):
+    """
+    Priority class of a message. Messages sent to a handle together
+    are sent in the order of their priority, lower values first.
+    """
+
+    HIGH = 0
+    """Time-critical messages, i.e. input and movement updates"""
+    NORMAL = 1
+    BULK = 2
+    """Large bursts that can wait, i.e. generating all visible objects"""
+
+
+class SlowConsumerPolicy(IntEnum):
+    """
+    What a transport does when the data queued for a handle
+    goes above TransportHandler.max_outbound_bytes.
+    """
+
+    DROP_COALESCIBLE = 0
+    """
+    Messages that are not RELIABLE_ORDERED are dropped until the queue drains,
+    as a newer update supersedes them anyway
+    """
+    PAUSE_PRODUCER = 1
+    """
+    The messages sent to the handle are held, and the handle is paused
+    (see ConnectionHandle.write_paused) until the queue drains. If more than
+    TransportHandler.max_held_messages pile up, the handle is disconnected.
+    """
+    DISCONNECT = 2
+    """The handle is disconnected with the SLOW_CONSUMER reason"""
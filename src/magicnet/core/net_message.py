@@ -1,11 +1,13 @@
-__all__ = ["NetMessage", "standard_range", "client_repo_range"]
+__all__ = ["NetMessage", "standard_range", "client_repo_range", "channel_range"]
 
 import dataclasses
+from collections.abc import Hashable
 from typing import TYPE_CHECKING, Any, Generic
 
 from typing_extensions import TypeVarTuple, Unpack
 
 from magicnet.core import errors
+from magicnet.core.net_globals import DeliveryMode, MessagePriority
 from magicnet.util.messenger import StandardEvents
 
 if TYPE_CHECKING:
@@ -44,6 +46,29 @@ class NetMessage(Generic[Unpack[Ts]]):
     This is a field for the application logic to use, if a custom routing logic
     is required. It will not be delivered in the message itself.
     """
+    delivery: DeliveryMode = DeliveryMode.RELIABLE_ORDERED
+    """
+    Delivery guarantees for this message. Only honored by the transports
+    that can deliver messages unreliably, others always deliver reliably.
+    """
+    channel: int = 0
+    """
+    Ordering channel of the message (0-255). Messages are only ordered
+    relative to other messages on the same channel, so a lost message
+    does not hold back the other channels.
+    """
+    priority: MessagePriority = MessagePriority.NORMAL
+    """
+    Priority class of the message. Messages of higher classes can be sent
+    before the lower class messages that were sent earlier.
+    """
+    ordering_key: Hashable | None = None
+    """
+    Messages with the same ordering key are never reordered by their priority,
+    i.e. a field update is never sent before the generation of its object.
+    """
+    ordering_keys: tuple[Hashable, ...] = ()
+    """Additional ordering keys, for the messages concerning many objects at once"""
 
     @property
     def value(self):
@@ -58,10 +83,11 @@ class NetMessage(Generic[Unpack[Ts]]):
         if not self.sent_from:
             raise errors.SenderNotSet(self)
         self.sent_from.transport.emit(
-            StandardEvents.WARNING, f"Disconnecting sender {self.sent_from.uuid} for {reason=} {detail=}"
+            StandardEvents.WARNING, f"Disconnecting sender {self.sent_from.handle_id} for {reason=} {detail=}"
         )
         self.sent_from.send_disconnect(reason, detail)
 
 
 standard_range = range(64)
 client_repo_range = range(1, 128)
+channel_range = range(256)
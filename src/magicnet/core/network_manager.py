@@ -2,7 +2,8 @@ __all__ = ["NetworkManager"]
 
 import dataclasses
 import pathlib
-from collections.abc import Iterable
+import time
+from collections.abc import Callable, Iterable
 from typing import Any, TypeVar
 
 from typing_extensions import Self, Unpack
@@ -10,15 +11,17 @@ from typing_extensions import Self, Unpack
 from magicnet.core import errors
 from magicnet.core.connection import ConnectionHandle
 from magicnet.core.datagram_processor import DatagramProcessor
+from magicnet.core.heartbeat import HeartbeatManager
 from magicnet.core.net_globals import MNEvents
 from magicnet.core.net_message import NetMessage, client_repo_range, standard_range
-from magicnet.core.transport_manager import TransportManager
+from magicnet.core.transport_manager import FlushPolicy, TransportManager
 from magicnet.netobjects.network_object import NetworkObject
 from magicnet.netobjects.network_object_manager import NetworkObjectManager
 from magicnet.netobjects.network_object_registry import NetworkObjectRegistry
 from magicnet.protocol.processor_base import MessageProcessor
 from magicnet.protocol.protocol_globals import StandardMessageTypes
 from magicnet.util.messenger import MessengerNode, StandardEvents
+from magicnet.util.timer_wheel import TimerWheel, WheelTimer
 
 AnyNetObject = TypeVar("AnyNetObject", bound=NetworkObject)
 
@@ -44,6 +47,7 @@ class NetworkManager(MessengerNode["NetworkManager", "NetworkManager"]):
     """Usually this is autogenerated from transport_type and transport_params"""
     dg_processor: DatagramProcessor = dataclasses.field(init=False)
     object_manager: NetworkObjectManager = dataclasses.field(init=False)
+    heartbeat: HeartbeatManager = dataclasses.field(init=False)
     extras: dict[int, type[MessageProcessor[Unpack[tuple[Any, ...]]]]] = dataclasses.field(default_factory=dict)
     """Additional types of messages that should be processed."""
     network_hash: bytes = bytes.fromhex("12345678")
@@ -52,6 +56,34 @@ class NetworkManager(MessengerNode["NetworkManager", "NetworkManager"]):
     """This will be sent to the clients before CLIENT_HELLO is received."""
     transport_type: type[TransportManager[Self]] | None = None
     transport_params: tuple[Any, ...] | None = None
+    flush_policy: FlushPolicy | None = None
+    """
+    If set, messages sent outside of a datagram are batched according to this policy.
+    By default they are delivered right away.
+    """
+    heartbeat_interval: float | None = None
+    """
+    If set, every handle is sent a PING this often (in seconds), which measures
+    its round trip time. Requires a network manager with an event loop.
+    """
+    idle_timeout: float | None = None
+    """
+    If set together with heartbeat_interval, the handles that did not send
+    anything for this many seconds are disconnected.
+    """
+    max_throttled_values: int = 64
+    """
+    The most values kept waiting per rate limited field of an object (see NetworkField's max_rate),
+    the oldest ones are dropped when the field is called faster than its rate for long
+    """
+    object_batch_size: int = 128
+    """How many objects are generated or destroyed by a single GENERATE_OBJECTS or DESTROY_OBJECTS message"""
+    timer_resolution: float = 0.01
+    """Granularity of the timers scheduled with schedule_timer(), in seconds"""
+    timer_wheel: TimerWheel = dataclasses.field(init=False, repr=False)
+    timer_wheel_wakeup: float | None = dataclasses.field(init=False, default=None, repr=False)
+    """When run_timer_wheel() is scheduled to run, None if it is not"""
+    timer_wheel_generation: int = dataclasses.field(init=False, default=0, repr=False)
     shutdown_on_disconnect: bool = False
     """If true, the manager will be closed when any handle disconnects"""
     repository_allocator: int = dataclasses.field(init=False, default=max(client_repo_range))
@@ -109,12 +141,14 @@ class NetworkManager(MessengerNode["NetworkManager", "NetworkManager"]):
             if self.client_repository not in client_repo_range:
                 raise errors.InvalidClientRepository(self.client_repository)
 
+        self.timer_wheel = TimerWheel(time.monotonic(), self.timer_resolution)
         self.object_manager = NetworkObjectManager(_parent=self)
         self.object_registry = NetworkObjectRegistry(_parent=self)
         self.dg_processor = self.create_child(DatagramProcessor, extras=self.extras)
+        self.heartbeat = self.create_child(HeartbeatManager)
         self.listen(MNEvents.DATAGRAM_RECEIVED, self.process_datagram)
         if self.shutdown_on_disconnect:
-            self.listen(MNEvents.HANDLE_DESTROYED, self.shutdown_with_handle)
+            self.listen(MNEvents.HANDLES_DESTROYED, self.shutdown_with_handle)
 
     def shutdown_with_handle(self, _h: object):
         # I tried to make this into a lambda, but it did not work
@@ -124,6 +158,60 @@ class NetworkManager(MessengerNode["NetworkManager", "NetworkManager"]):
     def send_message(self, message: NetMessage[Unpack[tuple[Any, ...]]]):
         self.transport.send(message)
 
+    def call_later(self, delay: float, callback: Callable[[], object]) -> bool:
+        """
+        Schedules the callback to run after delay seconds on the event loop.
+        Returns False if the manager does not have an event loop,
+        in which case the caller has to run the callback itself.
+        """
+        return False
+
+    def schedule_timer(self, delay: float, callback: Callable[[], object]) -> WheelTimer | None:
+        """
+        Schedules the callback to run after delay seconds on a timer wheel,
+        which is driven by a single call_later() no matter how many timers there are.
+        This should be preferred over call_later() for the timers kept
+        per handle (or per anything else there are a lot of).
+        The returned timer can be cancelled, the timers may fire up to
+        timer_resolution seconds late. Returns None if the manager
+        does not have an event loop, like call_later() does.
+        """
+        now = time.monotonic()
+        if self.timer_wheel_wakeup is None:
+            # The wheel is empty, and might have not been advanced for a while
+            self.timer_wheel.advance(now)
+        timer = self.timer_wheel.schedule(delay, callback, now=now)
+        if not self.wake_timer_wheel(now):
+            timer.cancel()
+            return None
+        return timer
+
+    def wake_timer_wheel(self, now: float) -> bool:
+        """
+        Makes sure run_timer_wheel() runs when the nearest timer is due,
+        returns False if the manager does not have an event loop.
+        """
+        delay = self.timer_wheel.next_delay(now)
+        if self.timer_wheel_wakeup is not None and self.timer_wheel_wakeup <= now + delay:
+            return True
+        # The later wakeup, if any, is stale now
+        self.timer_wheel_generation += 1
+        generation = self.timer_wheel_generation
+        if not self.call_later(delay, lambda: self.run_timer_wheel(generation)):
+            return False
+        self.timer_wheel_wakeup = now + delay
+        return True
+
+    def run_timer_wheel(self, generation: int):
+        if generation != self.timer_wheel_generation:
+            # A nearer timer was scheduled, which has its own wakeup
+            return
+        self.timer_wheel.advance(time.monotonic())
+        # Cleared after advancing, so the timers scheduled by the callbacks are woken up for below
+        self.timer_wheel_wakeup = None
+        if self.timer_wheel:
+            self.wake_timer_wheel(time.monotonic())
+
     def process_datagram(self, messages: Iterable[NetMessage[Unpack[tuple[Any, ...]]]]):
         with self.transport.message_queue:
             for msg in messages:
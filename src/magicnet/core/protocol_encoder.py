@@ -37,10 +37,12 @@ class ProtocolEncoder(abc.ABC):
         """
 
     @abc.abstractmethod
-    def unpack(self, data: bytes, /) -> Iterable[NetMessage[Any]]:
+    def unpack(self, data: bytes | memoryview, /) -> Iterable[NetMessage[Any]]:
         """
         Unpacks a datagram received from the server
         into a sequence of individual messages.
+        The datagram may be a memoryview into the transport's receive buffer,
+        which is only valid until the messages are processed.
         """
 
     def symmetrize(self) -> "ProtocolEncoder":
@@ -3,19 +3,19 @@ __all__ = ["TransportHandler", "TransportMiddleware"]
 import abc
 import dataclasses
 import itertools
+import time
 from collections import defaultdict
-from collections.abc import Callable, Collection, Iterable
+from collections.abc import Callable, Collection, Hashable, Iterable
 from typing import TYPE_CHECKING, Any, ClassVar, Generic
-from uuid import UUID
 
 from typing_extensions import TypeVar, TypeVarTuple, Unpack
 
 from magicnet.core.connection import ConnectionHandle
 from magicnet.core.handle_filter import BaseHandleFilter, HandleFilter
-from magicnet.core.net_globals import MNEvents, MNMathTargets
+from magicnet.core.net_globals import DeliveryMode, MNEvents, MNMathTargets, SlowConsumerPolicy
 from magicnet.core.net_message import NetMessage
 from magicnet.core.protocol_encoder import ProtocolEncoder
-from magicnet.protocol.protocol_globals import StandardMessageTypes
+from magicnet.protocol.protocol_globals import StandardDCReasons, StandardMessageTypes
 from magicnet.util.messenger import MessengerNode, StandardEvents
 
 if TYPE_CHECKING:
@@ -25,7 +25,9 @@ if TYPE_CHECKING:
 Ts = TypeVarTuple("Ts")
 BytesOperator = Callable[[bytes, ConnectionHandle], bytes | None] | None
 AnyNetMessage = NetMessage[Unpack[tuple[Any, ...]]]
+ScheduledMessage = tuple[int, AnyNetMessage]
 MessageOperator = Callable[[AnyNetMessage, ConnectionHandle], AnyNetMessage | None] | None
+BatchMessageOperator = Callable[[list[AnyNetMessage], ConnectionHandle], list[AnyNetMessage]] | None
 ManagerT = TypeVar("ManagerT", bound="NetworkManager", default="NetworkManager")
 
 
@@ -52,10 +54,34 @@ class TransportMiddleware(MessengerNode["TransportHandler[ManagerT]", ManagerT],
             self.add_math_target(MNMathTargets.BYTE_RECV, on_recv, priority=-self.priority)
 
     def add_message_operator(self, on_send: MessageOperator, on_recv: MessageOperator):
+        """
+        Adds operators that are called with each message and its handle,
+        and return the message (possibly modified) or None to drop it.
+        They are wrapped into batch operators, so a middleware should use
+        either this or add_batch_message_operator(), but not both.
+        """
+        self.add_batch_message_operator(self.batch_operator(on_send), self.batch_operator(on_recv))
+
+    def add_batch_message_operator(self, on_send: BatchMessageOperator, on_recv: BatchMessageOperator):
+        """
+        Adds operators that are called with all messages sent to (or received from)
+        one handle together, and return the list of messages that should go on.
+        This allows to look up the state of the handle once per batch.
+        """
         if on_send:
-            self.add_math_target(MNMathTargets.MSG_SEND, on_send, priority=self.priority)
+            self.add_math_target(MNMathTargets.MSG_SEND_BATCH, on_send, priority=self.priority)
         if on_recv:
-            self.add_math_target(MNMathTargets.MSG_RECV, on_recv, priority=-self.priority)
+            self.add_math_target(MNMathTargets.MSG_RECV_BATCH, on_recv, priority=-self.priority)
+
+    @staticmethod
+    def batch_operator(operator: MessageOperator) -> BatchMessageOperator:
+        if operator is None:
+            return None
+
+        def process_batch(messages: list[AnyNetMessage], handle: ConnectionHandle) -> list[AnyNetMessage]:
+            return [converted for message in messages if (converted := operator(message, handle))]
+
+        return process_batch
 
 
 @dataclasses.dataclass
@@ -71,7 +97,7 @@ class TransportHandler(MessengerNode["TransportManager[ManagerT]", ManagerT], ab
     encoder: ProtocolEncoder
     role: str
     handle_filter: HandleFilter[ManagerT] = dataclasses.field(default_factory=BaseHandleFilter[ManagerT])
-    connections: dict[UUID, ConnectionHandle] = dataclasses.field(default_factory=dict)
+    connections: dict[int, ConnectionHandle] = dataclasses.field(default_factory=dict)
     middlewares: ClassVar[Collection[type[TransportMiddleware]]] = ()
     """
     Allows adding a list of middlewares to the transport protocol.
@@ -82,20 +108,82 @@ class TransportHandler(MessengerNode["TransportManager[ManagerT]", ManagerT], ab
     """
 
     extra_middlewares: Collection[type[TransportMiddleware]] = ()
+    lost_handles: dict[int, ConnectionHandle] = dataclasses.field(default_factory=dict, repr=False)
+    deferred_messages: dict[int, list["ScheduledMessage"]] = dataclasses.field(default_factory=dict, repr=False)
+    flush_budget: ClassVar[int | None] = None
+    """
+    The most messages sent to one handle at once, the rest is sent on the next
+    event loop iteration, highest priority first. None means no limit.
+    """
+    max_outbound_bytes: ClassVar[int | None] = None
+    """
+    The most bytes that can be queued for one handle before slow_consumer_policy
+    is applied, see get_queued_bytes(). None means no limit.
+    """
+    slow_consumer_policy: ClassVar[SlowConsumerPolicy] = SlowConsumerPolicy.DISCONNECT
+    outbound_check_interval: ClassVar[float] = 0.05
+    """How often a handle paused by PAUSE_PRODUCER is checked for being drained"""
+    max_held_messages: ClassVar[int] = 4096
+    """The most messages held for a handle paused by PAUSE_PRODUCER, it is disconnected above that"""
+    max_datagram_size: ClassVar[int | None] = None
+    """
+    The largest datagram the transport can send, before the BYTE_SEND middlewares.
+    Messages delivered together are split between several datagrams to fit it.
+    """
 
     @property
     def manager(self) -> ManagerT:
-        return self.parent.parent
+        return self.root
 
     def destroy_handle(self, handle: ConnectionHandle):
+        """Same as destroy_handles() for a single handle"""
+        self.destroy_handles([handle])
+
+    def destroy_handles(self, handles: Iterable[ConnectionHandle]):
+        """
+        Destroys several handles at once. HANDLE_DESTROYED is emitted for each one,
+        the messages queued for them are flushed once, and then HANDLES_DESTROYED
+        is emitted with all of them.
+        """
+        destroyed = [handle for handle in handles if not handle.destroyed]
+        if not destroyed:
+            return
+        for handle in destroyed:
+            handle.destroyed = True
+        with self.parent.message_queue:
+            for handle in destroyed:
+                self.emit(MNEvents.HANDLE_DESTROYED, handle)
+        # The queue might have been active already, and the handles should receive everything sent to them
         self.parent.empty_queue()
-        self.before_disconnect(handle)
-        self.connections.pop(handle.uuid, None)
+        for handle in destroyed:
+            self.before_disconnect(handle)
+            self.connections.pop(handle.handle_id, None)
+            self.deferred_messages.pop(handle.handle_id, None)
+        self.emit(MNEvents.HANDLES_DESTROYED, destroyed)
+
+    def handle_lost(self, handle: ConnectionHandle):
+        """
+        Should be called by the transport when a connection is lost.
+        The handles lost during the same event loop iteration are destroyed together.
+        """
+        if handle.destroyed or handle.handle_id in self.lost_handles:
+            return
+        self.lost_handles[handle.handle_id] = handle
+        if len(self.lost_handles) == 1 and not self.manager.call_later(0, self.destroy_lost_handles):
+            self.destroy_lost_handles()
+
+    def destroy_lost_handles(self):
+        handles = self.lost_handles
+        self.lost_handles = {}
+        self.destroy_handles(handles.values())
 
     def send_motd(self, handle: ConnectionHandle):
         self.manage_handle(handle)
         message = NetMessage(StandardMessageTypes.MOTD, (self.manager.motd,), destination=handle)
         self.manager.send_message(message)
+        # The handshake should not wait for the flush policy
+        if not self.parent.queue_active:
+            self.parent.flush()
 
     def __post_init__(self):
         self.handle_filter.parent = self
@@ -103,36 +191,48 @@ class TransportHandler(MessengerNode["TransportManager[ManagerT]", ManagerT], ab
         for index, middleware in enumerate(all_middlewares):
             self.create_child(middleware, priority=index)
 
-    def datagram_received(self, handle: ConnectionHandle, datagram: bytes):
+    def datagram_received(self, handle: ConnectionHandle, datagram: bytes | memoryview):
+        handle.last_received = time.monotonic()
         datagram = self.calculate(MNMathTargets.BYTE_RECV, datagram)
         if not datagram:
             return
-        unpacked = self.encoder.unpack(datagram)
-        unpacked = self.__set_connection(handle, unpacked)
-        converted = self.__convert_messages(handle, unpacked, MNMathTargets.MSG_RECV)
-        self.emit(MNEvents.DATAGRAM_RECEIVED, converted)
-
-    @staticmethod
-    def __set_connection(connection: ConnectionHandle, messages: Iterable[NetMessage[Unpack[tuple[Any, ...]]]]):
-        for message in messages:
-            message.sent_from = connection
-            yield message
+        unpacked = list(self.encoder.unpack(datagram))
+        for message in unpacked:
+            message.sent_from = handle
+        converted = self.__convert_messages(handle, unpacked, MNMathTargets.MSG_RECV_BATCH, MNMathTargets.MSG_RECV)
+        if converted:
+            self.emit(MNEvents.DATAGRAM_RECEIVED, converted)
+
+    def datagrams_received(self, handle: ConnectionHandle, datagrams: Iterable[bytes | memoryview]):
+        """
+        Processes several datagrams received from the same handle at once.
+        All messages sent while processing them are delivered together.
+        """
+        with self.parent.message_queue:
+            for datagram in datagrams:
+                if handle.destroyed:
+                    break
+                self.datagram_received(handle, datagram)
 
     def __convert_messages(
         self,
         handle: ConnectionHandle,
-        messages: Iterable[NetMessage[Unpack[tuple[Any, ...]]]],
+        messages: list[NetMessage[Unpack[tuple[Any, ...]]]],
+        batch_event: MNMathTargets,
         event: MNMathTargets,
-    ):
-        for message in messages:
-            if converted := self.calculate(event, message, handle):
-                yield converted
+    ) -> list[NetMessage[Unpack[tuple[Any, ...]]]]:
+        if not messages:
+            return messages
+        messages = self.calculate(batch_event, messages, handle)
+        if messages and event in self.listener.math_targets:
+            messages = [converted for message in messages if (converted := self.calculate(event, message, handle))]
+        return messages
 
     def deliver(self, messages: Iterable[NetMessage[Unpack[tuple[Any, ...]]]]) -> None:
-        destinations: dict[UUID, list[NetMessage[Unpack[tuple[Any, ...]]]]] = defaultdict(list)
+        destinations: dict[int, list[NetMessage[Unpack[tuple[Any, ...]]]]] = defaultdict(list)
         for message in messages:
             if message.destination is not None:
-                destinations[message.destination.uuid].append(message)
+                destinations[message.destination.handle_id].append(message)
             else:
                 for handle_id in self.handle_filter.resolve_destination(message):
                     destinations[handle_id].append(message)
@@ -144,17 +244,165 @@ class TransportHandler(MessengerNode["TransportManager[ManagerT]", ManagerT], ab
             self.__deliver_to_handle(self.connections[dest], message_group)
 
     def __deliver_to_handle(
-        self, handle: ConnectionHandle, messages: Iterable[NetMessage[Unpack[tuple[Any, ...]]]]
+        self, handle: ConnectionHandle, messages: list[NetMessage[Unpack[tuple[Any, ...]]]]
     ) -> None:
-        converted = self.__convert_messages(handle, messages, MNMathTargets.MSG_SEND)
-        datagram = self.encoder.pack(converted)
+        converted = self.__convert_messages(handle, messages, MNMathTargets.MSG_SEND_BATCH, MNMathTargets.MSG_SEND)
+        scheduled = [(message.priority, message) for message in converted]
+        if deferred := self.deferred_messages.pop(handle.handle_id, None):
+            # Those were sent earlier, so they go first within their priority class
+            scheduled = deferred + scheduled
+        if self.max_outbound_bytes is not None and (
+            handle.outbound_paused or self.get_queued_bytes(handle) > self.max_outbound_bytes
+        ):
+            scheduled = self.handle_slow_consumer(handle, scheduled)
+        if scheduled:
+            self.send_messages(handle, self.schedule_messages(handle, scheduled))
+
+    def schedule_messages(self, handle: ConnectionHandle, messages: list[ScheduledMessage]) -> list[AnyNetMessage]:
+        """
+        Orders the messages by priority, keeping the messages with the same ordering key
+        in the order they were sent. If there are more than flush_budget of them,
+        the lowest priority ones are deferred to the next event loop iteration,
+        and are promoted to the next priority class, so they do not starve.
+        """
+        ordered: list[tuple[int, int, AnyNetMessage]] = []
+        key_priorities: dict[Hashable, int] = {}
+        for index, (priority, message) in enumerate(messages):
+            if (key := message.ordering_key) is not None:
+                # A message cannot overtake an earlier one with the same key
+                priority = key_priorities[key] = max(priority, key_priorities.get(key, priority))
+            if message.ordering_keys:
+                priority = max(priority, *(key_priorities.get(key, priority) for key in message.ordering_keys))
+                for key in message.ordering_keys:
+                    key_priorities[key] = priority
+            ordered.append((priority, index, message))
+        ordered.sort(key=lambda item: item[:2])
+
+        budget = self.flush_budget
+        if budget is None or len(ordered) <= budget or not self.manager.call_later(0, self.flush_deferred(handle)):
+            return [message for _, _, message in ordered]
+        self.deferred_messages[handle.handle_id] = [
+            (max(priority - 1, 0), message) for priority, _, message in ordered[budget:]
+        ]
+        return [message for _, _, message in ordered[:budget]]
+
+    def get_queued_bytes(self, handle: ConnectionHandle) -> int:
+        """
+        Returns how many bytes are queued for the handle and not sent yet.
+        Transports that buffer outgoing data should override this.
+        """
+        return 0
+
+    def get_outbound_metrics(self) -> dict[int, int]:
+        """Returns the number of queued bytes for every handle"""
+        return {handle_id: self.get_queued_bytes(handle) for handle_id, handle in self.connections.items()}
+
+    def handle_slow_consumer(
+        self, handle: ConnectionHandle, messages: list[ScheduledMessage]
+    ) -> list[ScheduledMessage]:
+        """
+        Applies slow_consumer_policy to the messages sent to a handle
+        with more than max_outbound_bytes queued (or paused by PAUSE_PRODUCER),
+        returns the ones that should still be sent.
+        """
+        # The DISCONNECT message sent below has to get through
+        disconnects = [item for item in messages if item[1].message_type == StandardMessageTypes.DISCONNECT]
+        if disconnects:
+            return disconnects
+
+        policy = self.slow_consumer_policy
+        if policy == SlowConsumerPolicy.DROP_COALESCIBLE:
+            kept = [item for item in messages if item[1].delivery == DeliveryMode.RELIABLE_ORDERED]
+            if len(kept) < len(messages):
+                self.emit(
+                    StandardEvents.WARNING, f"{handle.handle_id} is slow, dropped {len(messages) - len(kept)} updates"
+                )
+            return kept
+        if policy == SlowConsumerPolicy.PAUSE_PRODUCER:
+            if not handle.outbound_paused:
+                if not self.manager.schedule_timer(self.outbound_check_interval, self.check_outbound(handle)):
+                    # Nothing would deliver the held messages later
+                    return messages
+                handle.set_paused(outbound_paused=True)
+            if len(messages) <= self.max_held_messages:
+                self.deferred_messages[handle.handle_id] = messages
+                return []
+
+        self.emit(StandardEvents.WARNING, f"{handle.handle_id} is slow, disconnecting")
+        handle.send_disconnect(StandardDCReasons.SLOW_CONSUMER, "Outbound queue is full")
+        return []
+
+    def check_outbound(self, handle: ConnectionHandle) -> Callable[[], None]:
+        def callback():
+            if handle.destroyed or not handle.outbound_paused:
+                return
+            assert self.max_outbound_bytes is not None
+            # Resuming at half of the limit, so the handle does not flap around it
+            if self.get_queued_bytes(handle) > self.max_outbound_bytes // 2 and self.manager.schedule_timer(
+                self.outbound_check_interval, callback
+            ):
+                return
+            handle.set_paused(outbound_paused=False)
+            if handle.handle_id in self.deferred_messages:
+                self.__deliver_to_handle(handle, [])
+
+        return callback
+
+    def flush_deferred(self, handle: ConnectionHandle) -> Callable[[], None]:
+        def callback():
+            if handle.handle_id in self.deferred_messages and not handle.destroyed:
+                self.__deliver_to_handle(handle, [])
+
+        return callback
+
+    def send_messages(self, handle: ConnectionHandle, messages: list[NetMessage[Unpack[tuple[Any, ...]]]]) -> None:
+        """
+        Sends the messages that passed the MSG_SEND middlewares to the handle.
+        Transports that send some messages differently (i.e. depending on
+        the delivery mode) can override this.
+        """
+        for datagram in self.pack_datagrams(messages):
+            if datagram := self.prepare_datagram(datagram):
+                self.send(handle, datagram)
+
+    def prepare_datagram(self, datagram: bytes) -> bytes | None:
+        """
+        Runs the BYTE_SEND middlewares on a packed datagram.
+        Returns None if the datagram should not be sent.
+        """
         if self.manager.debug_mode:
             self.emit(StandardEvents.DEBUG, f"Sending datagram: {datagram.hex()}")
-        if datagram := self.calculate(MNMathTargets.BYTE_SEND, datagram):
-            self.send(handle, datagram)
+        return self.calculate(MNMathTargets.BYTE_SEND, datagram)
+
+    def pack_datagrams(self, messages: list[NetMessage[Unpack[tuple[Any, ...]]]]) -> list[bytes]:
+        """
+        Packs the messages into one or more datagrams. If the transport limits
+        the datagram size, the messages are split between several datagrams.
+        """
+        datagram = self.encoder.pack(messages)
+        if self.max_datagram_size is None or len(datagram) <= self.max_datagram_size:
+            return [datagram]
+        if len(messages) == 1:
+            return self.pack_oversized(messages[0], datagram)
+
+        parts = -(-len(datagram) // self.max_datagram_size)
+        chunk = -(-len(messages) // parts)
+        datagrams: list[bytes] = []
+        for start in range(0, len(messages), chunk):
+            datagrams.extend(self.pack_datagrams(messages[start : start + chunk]))
+        return datagrams
+
+    def pack_oversized(self, message: NetMessage[Unpack[tuple[Any, ...]]], datagram: bytes) -> list[bytes]:
+        """
+        Handles a single message that does not fit into max_datagram_size.
+        By default it is dropped, transports that can fragment datagrams
+        can override this to send it anyway.
+        """
+        self.emit(StandardEvents.ERROR, f"Message is too large to be sent: {message.message_type}")
+        return []
 
     def manage_handle(self, connection: ConnectionHandle):
-        self.connections[connection.uuid] = connection
+        self.connections[connection.handle_id] = connection
 
     @abc.abstractmethod
     def send(self, connection: ConnectionHandle, dg: bytes) -> None:
@@ -185,8 +433,7 @@ class TransportHandler(MessengerNode["TransportManager[ManagerT]", ManagerT], ab
         """
 
     def shutdown(self):
-        for handle in list(self.connections.values()):
-            handle.destroy()
+        self.destroy_handles(list(self.connections.values()))
 
     def get_handle(self) -> ConnectionHandle | None:
         try:
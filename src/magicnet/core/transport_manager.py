@@ -1,4 +1,4 @@
-__all__ = ["TransportManager", "TransportParameters"]
+__all__ = ["TransportManager", "TransportParameters", "FlushPolicy"]
 
 import abc
 import contextlib
@@ -12,7 +12,8 @@ from typing_extensions import Unpack
 from magicnet.core import errors
 from magicnet.core.connection import ConnectionHandle
 from magicnet.core.handle_filter import HandleFilter
-from magicnet.core.net_message import NetMessage
+from magicnet.core.net_globals import MNEvents
+from magicnet.core.net_message import NetMessage, channel_range
 from magicnet.core.protocol_encoder import ProtocolEncoder
 from magicnet.core.transport_handler import TransportHandler, TransportMiddleware
 from magicnet.util.messenger import MessengerNode, StandardEvents
@@ -31,6 +32,23 @@ class TransportParameters(Generic[T]):
     middlewares: Collection[type[TransportMiddleware]] = ()
 
 
+@dataclasses.dataclass(frozen=True)
+class FlushPolicy:
+    """
+    FlushPolicy makes the messages sent outside of a datagram to be queued
+    instead of delivered right away, so they are sent together.
+    The queue is delivered when the first of these happens:
+    max_delay passes since the first message was queued,
+    max_batch messages are queued, or TransportManager.flush() is called.
+    The delay is driven by the event loop of the network manager,
+    if it does not have one, messages are delivered right away.
+    """
+
+    max_delay: float = 0.0
+    """In seconds, 0 means the queue is delivered on the next event loop iteration"""
+    max_batch: int = 256
+
+
 TransportActiveType = dict[str, TransportHandler[T]]
 TransportRowType = dict[str, TransportParameters[T]]
 TransportMatrixType = dict[str, TransportRowType[T]]
@@ -85,6 +103,10 @@ class TransportManager(MessengerNode[T, T], abc.ABC):
     role: str
     transports: dict[str, TransportHandler[T]]
     queue_active: bool = False
+    flush_scheduled: bool = False
+    flush_generation: int = 0
+    flush_requested: bool = False
+    """Whether the next empty_queue() has to emit BEFORE_FLUSH even if no message is queued"""
     _delivery_queue: list[NetMessage[Unpack[tuple[Any, ...]]]] = dataclasses.field(default_factory=list)
 
     @classmethod
@@ -107,10 +129,35 @@ class TransportManager(MessengerNode[T, T], abc.ABC):
         """
 
     def send(self, message: NetMessage[Unpack[tuple[Any, ...]]]):
+        if message.channel not in channel_range:
+            # Checked here rather than on construction, so creating a message stays cheap
+            raise errors.InvalidChannel(message.channel)
         if self.queue_active:
             self._delivery_queue.append(message)
-        else:
+            return
+
+        policy = self.parent.flush_policy
+        if policy is None:
             self.__deliver([message])
+            return
+
+        self._delivery_queue.append(message)
+        if len(self._delivery_queue) >= policy.max_batch:
+            self.flush()
+        elif not self.flush_scheduled:
+            generation = self.flush_generation
+            self.flush_scheduled = self.parent.call_later(policy.max_delay, lambda: self.flush_timer(generation))
+            if not self.flush_scheduled:
+                self.flush()
+
+    def flush_timer(self, generation: int):
+        # The queue may have been delivered before the timer ran out, then the timer belongs to no batch
+        if generation == self.flush_generation:
+            self.flush()
+
+    def flush(self):
+        """Delivers all queued messages right away."""
+        self.empty_queue()
 
     @property
     @contextlib.contextmanager
@@ -121,11 +168,28 @@ class TransportManager(MessengerNode[T, T], abc.ABC):
             return
 
         self.queue_active = True
-        yield
-        self.queue_active = False
-        self.empty_queue()
+        try:
+            yield
+        finally:
+            self.queue_active = False
+            self.empty_queue()
+
+    def request_flush(self):
+        """
+        Makes the next empty_queue() emit BEFORE_FLUSH, for the listeners
+        that add their messages to the queue at that point.
+        """
+        self.flush_requested = True
 
     def empty_queue(self):
+        if not self._delivery_queue and not self.flush_requested:
+            # Nothing to flush, so the pending flush timer (if any) stays valid
+            return
+        self.flush_requested = False
+        self.emit(MNEvents.BEFORE_FLUSH)
+        # The pending flush timer, if any, is stale now
+        self.flush_scheduled = False
+        self.flush_generation += 1
         if self._delivery_queue:
             queue = self._delivery_queue
             self._delivery_queue = []
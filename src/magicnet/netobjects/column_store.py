@@ -0,0 +1,160 @@
+__all__ = ["ColumnStore", "NumericColumn", "ObjectColumn"]
+
+from array import array
+from typing import Any
+
+from magicnet.protocol import network_types
+from magicnet.util.typechecking.field_signature import FieldSignature
+
+ParameterDefinition = list[tuple[int, int, list[Any]]]
+
+# (signed, size in bytes) of the integer types, used to pick the array type code
+INTEGER_TYPES: dict[Any, tuple[bool, int]] = {
+    network_types.uint8: (False, 1),
+    network_types.uint16: (False, 2),
+    network_types.uint32: (False, 4),
+    network_types.uint64: (False, 8),
+    network_types.int8: (True, 1),
+    network_types.int16: (True, 2),
+    network_types.int32: (True, 4),
+    network_types.int64: (True, 8),
+}
+
+
+def get_typecode(typehint: Any) -> str | None:
+    """Returns the array type code able to store all values of the typehint, if any"""
+    if typehint is float:
+        return "d"
+    try:
+        kind = INTEGER_TYPES.get(typehint)
+    except TypeError:
+        # Unhashable typehint
+        return None
+    if kind is None:
+        return None
+    signed, size = kind
+    for code in "bhilq" if signed else "BHILQ":
+        if array(code).itemsize >= size:
+            return code
+    return None
+
+
+class ObjectColumn:
+    """Stores the parameters of one field as is, for the fields that are not numeric"""
+
+    def __init__(self):
+        self.values: list[list[Any] | None] = []
+
+    def set(self, slot: int, params: list[Any]) -> None:
+        if slot >= len(self.values):
+            self.values.extend([None] * max(slot + 1 - len(self.values), len(self.values)))
+        self.values[slot] = params
+
+    def get(self, slot: int) -> list[Any] | None:
+        return self.values[slot] if slot < len(self.values) else None
+
+    def clear(self, slot: int) -> None:
+        if slot < len(self.values):
+            self.values[slot] = None
+
+
+class NumericColumn:
+    """
+    Stores the parameters of a field with a fixed number of numeric arguments,
+    one array per argument. Values that do not fit in the arrays
+    (i.e. when the field was called with bad arguments) are stored separately.
+    Only values of the exact type of the array are stored in it, so that
+    an int passed to a float field or a bool passed to an int field keeps its type.
+    """
+
+    def __init__(self, typecodes: list[str]):
+        self.arrays = [array(code) for code in typecodes]
+        self.types: list[type] = [float if code == "d" else int for code in typecodes]
+        self.present = bytearray()
+        self.fallback: dict[int, list[Any]] = {}
+
+    def grow(self, slot: int) -> None:
+        extra = max(slot + 1 - len(self.present), len(self.present))
+        self.present.extend(bytes(extra))
+        for values in self.arrays:
+            values.extend(array(values.typecode, bytes(extra * values.itemsize)))
+
+    def set(self, slot: int, params: list[Any]) -> None:
+        if slot >= len(self.present):
+            self.grow(slot)
+        self.fallback.pop(slot, None)
+        if len(params) == len(self.arrays) and all(
+            type(value) is kind for value, kind in zip(params, self.types, strict=True)
+        ):
+            try:
+                for values, value in zip(self.arrays, params, strict=True):
+                    values[slot] = value
+            except (TypeError, OverflowError):
+                pass
+            else:
+                self.present[slot] = 1
+                return
+        self.present[slot] = 0
+        self.fallback[slot] = params
+
+    def get(self, slot: int) -> list[Any] | None:
+        if slot < len(self.present) and self.present[slot]:
+            return [values[slot] for values in self.arrays]
+        return self.fallback.get(slot)
+
+    def clear(self, slot: int) -> None:
+        if slot < len(self.present):
+            self.present[slot] = 0
+        self.fallback.pop(slot, None)
+
+
+class ColumnStore:
+    """
+    ColumnStore holds the persisted fields of all objects of a class,
+    see NetworkObject.columnar_storage. Each object gets a slot number,
+    and each field is a column indexed by it, so an object costs a few bytes
+    per field instead of a dict entry with a tuple key and a list.
+    Fields with a fixed number of numeric arguments are stored in arrays.
+
+    The fields are returned in the order their columns were created,
+    not in the order they were set on the particular object.
+    """
+
+    def __init__(self):
+        self.columns: dict[tuple[int, int], NumericColumn | ObjectColumn] = {}
+        self.free_slots: list[int] = []
+        self.slot_count = 0
+
+    def allocate(self) -> int:
+        if self.free_slots:
+            return self.free_slots.pop()
+        self.slot_count += 1
+        return self.slot_count - 1
+
+    def release(self, slot: int) -> None:
+        for column in self.columns.values():
+            column.clear(slot)
+        self.free_slots.append(slot)
+
+    @staticmethod
+    def make_column(signature: FieldSignature) -> NumericColumn | ObjectColumn:
+        if not signature.signature or any(item.is_variadic for item in signature.signature):
+            return ObjectColumn()
+        typecodes = [get_typecode(item.typehint) for item in signature.signature]
+        if None in typecodes:
+            return ObjectColumn()
+        return NumericColumn(typecodes)  # pyright: ignore[reportArgumentType]
+
+    def set(self, slot: int, role: int, field: int, signature: FieldSignature, params: list[Any]) -> None:
+        column = self.columns.get((role, field))
+        if column is None:
+            column = self.columns[(role, field)] = self.make_column(signature)
+        column.set(slot, params)
+
+    def get_params(self, slot: int) -> ParameterDefinition:
+        output: ParameterDefinition = []
+        for (role, field), column in self.columns.items():
+            params = column.get(slot)
+            if params is not None:
+                output.append((role, field, params))
+        return output
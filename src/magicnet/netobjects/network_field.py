@@ -5,7 +5,7 @@ from typing import Any, final
 
 from magicnet.core import errors
 from magicnet.core.connection import ConnectionHandle
-from magicnet.core.net_globals import MNMathTargets
+from magicnet.core.net_globals import DeliveryMode, MessagePriority, MNMathTargets
 from magicnet.util.messenger import MessengerNode
 from magicnet.util.typechecking.field_signature import FieldSignature, SignatureFlags
 
@@ -19,9 +19,23 @@ class NetworkField(FieldSignature):
         callback: Callable[..., Any] | None = None,  # noqa: UP007
         *,
         ram_persist: bool = True,
+        delivery: DeliveryMode = DeliveryMode.RELIABLE_ORDERED,
+        channel: int = 0,
+        priority: MessagePriority = MessagePriority.NORMAL,
+        max_rate: float | None = None,
+        latest_only: bool = False,
         **kwargs: object,
     ):
+        """
+        If max_rate is set, the field is sent to everyone at most this many times
+        per second per object, the calls over it are delayed. If latest_only is set too,
+        only the last of the delayed values is sent, otherwise they are sent one by one,
+        up to NetworkManager.max_throttled_values latest ones. In both cases
+        the final value of a burst is always sent.
+        """
         self.ram_persist = ram_persist
+        self.set_delivery(delivery, channel, priority)
+        self.set_rate(max_rate, latest_only=latest_only)
         self.args = kwargs
         if callback is not None:
             self(callback)
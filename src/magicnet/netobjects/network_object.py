@@ -9,6 +9,7 @@ from typing import TYPE_CHECKING, Any, ClassVar
 from magicnet.core import errors
 from magicnet.core.connection import ConnectionHandle
 from magicnet.core.net_globals import MNEvents
+from magicnet.netobjects.column_store import ColumnStore
 from magicnet.netobjects.network_field import NetworkField
 from magicnet.netobjects.network_object_meta import NetworkObjectMeta
 from magicnet.protocol import network_types
@@ -41,13 +42,20 @@ class MarshalledSignature:
     signatures: list[network_types.hashable]
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class NetworkObject(MessengerNode["NetworkObjectManager", "NetworkManager"], abc.ABC, metaclass=NetworkObjectMeta):
     """
     NetworkObject is used to write messages in an OOP style.
     Each NetworkObject has a view on one or more servers,
     and allows sending messages to the other views.
     Some of the messages may be caught by middlewares to check auth/etc.
+
+    NetworkObject is a slots dataclass, as there can be a lot of objects
+    (the instances can still be weakly referenced). Subclasses may be declared
+    with dataclass(slots=True) as well, otherwise their instances get a __dict__ anyway.
+    Before Python 3.14, the zero-argument super() does not work in the methods
+    of such subclasses, as the dataclass replaces the class, so super(Class, self)
+    has to be used there instead.
     """
 
     controller: "NetworkManager" = dataclasses.field(repr=False)
@@ -76,7 +84,23 @@ class NetworkObject(MessengerNode["NetworkObjectManager", "NetworkManager"], abc
     must have the same network name.
     """
 
-    loaded_params: dict[tuple[int, int], list[Any]] = dataclasses.field(default_factory=dict)
+    loaded_params: dict[tuple[int, int], list[Any]] | None = None
+    """The persisted fields of the object, created on first use when columnar_storage is not set"""
+    columnar_storage: ClassVar[bool] = False
+    """
+    If set, the persisted fields of all objects of this class are stored
+    in the column_store of the class instead of loaded_params,
+    which takes several times less memory with a lot of objects.
+    """
+    column_store: ClassVar[ColumnStore | None]
+    """Set automatically by the metaclass if columnar_storage is set"""
+    column_slot: int = dataclasses.field(default=-1, kw_only=True, repr=False)
+    coalesce_updates: ClassVar[bool] = False
+    """
+    If set, the persisted fields sent to everyone are only marked as changed,
+    and their latest values are sent once per flush, see NetworkObjectManager.mark_field_dirty().
+    The other fields are still sent on every call, after the changed fields of the object.
+    """
     field_data: ClassVar[list[NetworkField]]
     """Contains the list of all fields, is set automatically by the metaclass."""
     foreign_field_data: ClassVar[dict[int, list[FieldSignature]]]
@@ -102,10 +126,25 @@ class NetworkObject(MessengerNode["NetworkObjectManager", "NetworkManager"], abc
         signature = self.get_field_signature(role, field)
         if not signature or not (signature.flags & SignatureFlags.PERSIST_IN_RAM):
             return
-        self.loaded_params[(role, field)] = params
+        if self.column_store is None:
+            if self.loaded_params is None:
+                self.loaded_params = {}
+            self.loaded_params[(role, field)] = params
+            return
+        if self.column_slot < 0:
+            self.column_slot = self.column_store.allocate()
+        self.column_store.set(self.column_slot, role, field, signature, params)
+
+    def release_field_data(self):
+        """Frees the slot of the object in the column store, called when the object is destroyed"""
+        if self.column_store is not None and self.column_slot >= 0:
+            self.column_store.release(self.column_slot)
+            self.column_slot = -1
 
     def __post_init__(self):
-        self.parent = self.controller.object_manager  # pyright: ignore[reportUnannotatedClassAttribute]
+        # The objects are tracked by the object manager in net_objects,
+        # registering them as its children would only slow down generating and destroying them
+        self.bind_parent(self.controller.object_manager)
 
     @classmethod
     def set_type(cls, otype: int) -> None:
@@ -163,13 +202,17 @@ class NetworkObject(MessengerNode["NetworkObjectManager", "NetworkManager"], abc
 
     @property
     def manager(self) -> "NetworkManager":
-        return self.parent.parent
+        return self.root
 
     def load_params(self, handle: ConnectionHandle, params: ParameterDefinition):
         for role_id, field_id, arguments in params:
             self.call_field(handle, role_id, field_id, arguments)
 
     def get_loaded_params(self) -> ParameterDefinition:
+        if self.column_store is not None:
+            return self.column_store.get_params(self.column_slot) if self.column_slot >= 0 else []
+        if self.loaded_params is None:
+            return []
         return [(role, field, params) for (role, field), params in self.loaded_params.items()]
 
     def resolve_callback_name(self, field_id: int) -> NetworkField | None:
@@ -257,7 +300,18 @@ class NetworkObject(MessengerNode["NetworkObjectManager", "NetworkManager"], abc
         role_id, field_id = self.resolve_field(message)
         self.persist_field_data(role_id, field_id, list(args1))
         if self.object_state == ObjectState.GENERATED:
-            self.manager.object_manager.request_call_field(receiver, self, role_id, field_id, args1)
+            signature = self.get_field_signature(role_id, field_id)
+            if self.coalesce_updates:
+                if receiver is None and signature is not None and signature.flags & SignatureFlags.PERSIST_IN_RAM:
+                    self.manager.object_manager.mark_field_dirty(self, role_id, field_id, args1, signature)
+                    return
+                self.manager.object_manager.flush_object_fields(self)
+            if receiver is None:
+                self.manager.object_manager.broadcast_field(self, role_id, field_id, args1, signature)
+            else:
+                self.manager.object_manager.request_call_field(
+                    receiver, self, role_id, field_id, args1, signature=signature
+                )
 
     @abc.abstractmethod
     def net_create(self) -> None:
@@ -276,7 +330,7 @@ class NetworkObject(MessengerNode["NetworkObjectManager", "NetworkManager"], abc
         """
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class ForeignNetworkObject(NetworkObject):
     """
     ForeignNetworkObject represents a network object type that is not
@@ -1,21 +1,25 @@
 __all__ = ["NetworkObjectManager"]
 
 import dataclasses
+import time
+from collections import deque
 from typing import TYPE_CHECKING, Any
 
 from magicnet.core import errors
 from magicnet.core.connection import ConnectionHandle
-from magicnet.core.net_globals import MNMathTargets
+from magicnet.core.net_globals import MessagePriority, MNEvents, MNMathTargets
 from magicnet.core.net_message import NetMessage
 from magicnet.netobjects.network_object import NetworkObject, ObjectState
 from magicnet.protocol.protocol_globals import StandardMessageTypes
 from magicnet.util.messenger import MessengerNode, StandardEvents
+from magicnet.util.typechecking.field_signature import FieldSignature
 
 if TYPE_CHECKING:
     from magicnet.core.network_manager import NetworkManager
 
 
 ParameterDefinition = list[tuple[int, int, list[Any]]]
+DirtyField = tuple[NetworkObject, list[Any] | tuple[Any, ...], FieldSignature | None]
 
 
 @dataclasses.dataclass
@@ -27,6 +31,18 @@ class NetworkObjectManager(MessengerNode["NetworkManager", "NetworkManager"]):
     but not yet acknowledged by the remote authority.
     """
     oid_allocator: int = dataclasses.field(init=False, default=0)
+    dirty_fields: dict[int, dict[tuple[int, int], DirtyField]] = dataclasses.field(init=False, default_factory=dict)
+    """The latest values of the coalesced fields by oid and (role, field), see NetworkObject.coalesce_updates"""
+    dirty_flush_scheduled: bool = dataclasses.field(init=False, default=False)
+    field_sent_at: dict[int, dict[tuple[int, int], float]] = dataclasses.field(init=False, default_factory=dict)
+    """When the rate limited fields were last sent, by oid and (role, field)"""
+    throttled_fields: dict[int, dict[tuple[int, int], deque[list[Any] | tuple[Any, ...]]]] = dataclasses.field(
+        init=False, default_factory=dict
+    )
+    """The values of the rate limited fields waiting to be sent, by oid and (role, field)"""
+
+    def __post_init__(self):
+        self.listen(MNEvents.BEFORE_FLUSH, self.flush_dirty_fields)
 
     def make_oid(self) -> int:
         self.oid_allocator += 1
@@ -44,6 +60,7 @@ class NetworkObjectManager(MessengerNode["NetworkManager", "NetworkManager"]):
         obj: NetworkObject,
         fields: ParameterDefinition,
         handle: ConnectionHandle | None = None,
+        priority: MessagePriority = MessagePriority.NORMAL,
     ):
         msg1 = NetMessage(
             StandardMessageTypes.GENERATE_OBJECT,
@@ -57,6 +74,31 @@ class NetworkObjectManager(MessengerNode["NetworkManager", "NetworkManager"]):
         for msg in [msg1, *field_messages, msg2]:
             if handle is not None:
                 msg.destination = handle
+            msg.priority = priority
+            msg.ordering_key = obj.oid
+            self.manager.send_message(msg)
+
+    def send_network_objects_generate(
+        self,
+        objects: list[NetworkObject],
+        handle: ConnectionHandle | None = None,
+        priority: MessagePriority = MessagePriority.NORMAL,
+    ):
+        """
+        Same as send_network_object_generate() for many objects,
+        but uses one GENERATE_OBJECTS message per object_batch_size objects.
+        """
+        size = self.manager.object_batch_size
+        for start in range(0, len(objects), size):
+            chunk = objects[start : start + size]
+            entries = [(obj.oid, obj.otype, obj.owner, obj.zone, obj.get_loaded_params()) for obj in chunk]
+            msg = NetMessage(
+                StandardMessageTypes.GENERATE_OBJECTS,
+                (entries,),
+                destination=handle,
+                priority=priority,
+                ordering_keys=tuple(obj.oid for obj in chunk),
+            )
             self.manager.send_message(msg)
 
     def get_visible_objects(self, handle: ConnectionHandle) -> list[NetworkObject]:
@@ -83,6 +125,10 @@ class NetworkObjectManager(MessengerNode["NetworkManager", "NetworkManager"]):
         obj.object_state = ObjectState.INVALID
         obj.net_delete()
         obj.destroy()
+        obj.release_field_data()
+        self.dirty_fields.pop(obj.oid, None)
+        self.field_sent_at.pop(obj.oid, None)
+        self.throttled_fields.pop(obj.oid, None)
         self.net_objects.pop(obj.oid, None)
 
     def request_delete_object(self, obj_id: int):
@@ -103,10 +149,63 @@ class NetworkObjectManager(MessengerNode["NetworkManager", "NetworkManager"]):
             )
             return
 
-        msg = NetMessage(StandardMessageTypes.DESTROY_OBJECT, (obj.oid,))
+        # The object is gone by the time a queued message is routed, so its zone is kept for the routers
+        msg = NetMessage(
+            StandardMessageTypes.DESTROY_OBJECT, (obj.oid,), ordering_key=obj.oid, routing_data=(obj.zone,)
+        )
         self.manager.send_message(msg)
         self.destroy_network_object(obj_id)
 
+    def request_delete_objects(self, obj_ids: list[int]):
+        """
+        Same as NetworkObject.request_delete() for many objects (i.e. when a zone is unloaded).
+        With authority the objects are deleted right away, otherwise
+        the authority is asked to do it with REQUEST_DELETE_OBJECTS.
+        """
+        if self.manager.client_repository is not None:
+            # We have authority, we can delete anyone's objects
+            objects = [obj for obj_id in obj_ids if (obj := self.net_objects.get(obj_id)) is not None]
+            self.send_objects_deletion(objects)
+            return
+
+        size = self.manager.object_batch_size
+        for start in range(0, len(obj_ids), size):
+            msg = NetMessage(StandardMessageTypes.REQUEST_DELETE_OBJECTS, (obj_ids[start : start + size],))
+            self.manager.send_message(msg)
+
+    def perform_objects_deletion(self, obj_ids: list[int], repo_number: int):
+        """
+        Same as perform_object_deletion() for many objects,
+        but uses one DESTROY_OBJECTS message per object_batch_size objects.
+        """
+        allowed: list[NetworkObject] = []
+        for obj_id in obj_ids:
+            if (obj := self.net_objects.get(obj_id)) is None:
+                continue
+            if obj.owner != repo_number:
+                self.emit(
+                    StandardEvents.WARNING,
+                    f"Ignoring unauthorized delete for object {obj.oid} (by {repo_number})",
+                )
+                continue
+            allowed.append(obj)
+        self.send_objects_deletion(allowed)
+
+    def send_objects_deletion(self, objects: list[NetworkObject]):
+        size = self.manager.object_batch_size
+        for start in range(0, len(objects), size):
+            chunk = objects[start : start + size]
+            oids = [obj.oid for obj in chunk]
+            msg = NetMessage(
+                StandardMessageTypes.DESTROY_OBJECTS,
+                (oids,),
+                ordering_keys=tuple(oids),
+                routing_data=tuple(obj.zone for obj in chunk),
+            )
+            self.manager.send_message(msg)
+        for obj in objects:
+            self.destroy_network_object(obj.oid)
+
     def create_object(self, obj: NetworkObject, owner: int = 0):
         """
         Local objects are created on this client and distributed to others.
@@ -153,12 +252,121 @@ class NetworkObjectManager(MessengerNode["NetworkManager", "NetworkManager"]):
         role: int,
         field: int,
         params: list[Any] | tuple[Any, ...],
+        *,
+        signature: FieldSignature | None = None,
     ):
-        msg = NetMessage(StandardMessageTypes.SET_OBJECT_FIELD, (obj.oid, role, field, params))
+        msg = NetMessage(StandardMessageTypes.SET_OBJECT_FIELD, (obj.oid, role, field, params), ordering_key=obj.oid)
+        if signature is not None:
+            msg.delivery = signature.delivery
+            msg.channel = signature.channel
+            msg.priority = signature.priority
         if receiver is not None:
             msg.destination = receiver
         self.manager.send_message(msg)
 
+    def mark_field_dirty(
+        self,
+        obj: NetworkObject,
+        role: int,
+        field: int,
+        params: list[Any] | tuple[Any, ...],
+        signature: FieldSignature | None,
+    ):
+        """
+        Queues the field to be sent on the next flush, replacing the value
+        queued earlier. The flush happens when the message queue is emptied,
+        or on the next event loop iteration if the messages are not queued.
+        """
+        self.dirty_fields.setdefault(obj.oid, {})[(role, field)] = (obj, params, signature)
+        if self.dirty_flush_scheduled:
+            return
+        if self.manager.transport.queue_active:
+            # BEFORE_FLUSH will be emitted when the queue ends
+            self.manager.transport.request_flush()
+            self.dirty_flush_scheduled = True
+            return
+        self.dirty_flush_scheduled = self.manager.call_later(0, self.flush_dirty_fields)
+        if not self.dirty_flush_scheduled:
+            self.flush_dirty_fields()
+
+    def flush_dirty_fields(self):
+        self.dirty_flush_scheduled = False
+        if not self.dirty_fields:
+            return
+        dirty = self.dirty_fields
+        self.dirty_fields = {}
+        with self.manager.transport.message_queue:
+            # Sorted by the object and the field, so the order does not depend on the order of the calls
+            for oid in sorted(dirty):
+                self.send_dirty_fields(dirty[oid])
+
+    def flush_object_fields(self, obj: NetworkObject):
+        """
+        Sends the coalesced fields of one object right away. Called before any other
+        message of the object is sent, so it is not received before the values set earlier.
+        """
+        if dirty := self.dirty_fields.pop(obj.oid, None):
+            self.send_dirty_fields(dirty)
+
+    def send_dirty_fields(self, dirty: dict[tuple[int, int], DirtyField]):
+        for role, field in sorted(dirty):
+            obj, params, signature = dirty[(role, field)]
+            if obj.object_state == ObjectState.GENERATED:
+                self.broadcast_field(obj, role, field, params, signature)
+
+    def broadcast_field(
+        self,
+        obj: NetworkObject,
+        role: int,
+        field: int,
+        params: list[Any] | tuple[Any, ...],
+        signature: FieldSignature | None,
+    ):
+        """Sends the field to everyone, delaying it if the field has a max_rate and was sent recently"""
+        if signature is None or signature.max_rate is None:
+            self.request_call_field(None, obj, role, field, params, signature=signature)
+            return
+
+        pending = self.throttled_fields.get(obj.oid, {}).get((role, field))
+        if pending is not None:
+            # The queue is bounded, so the oldest value is dropped if it is full
+            pending.append(params)
+            return
+
+        sent_at = self.field_sent_at.setdefault(obj.oid, {})
+        now = time.monotonic()
+        last = sent_at.get((role, field))
+        wait = 0.0 if last is None else last + 1 / signature.max_rate - now
+        if wait > 0 and self.manager.schedule_timer(wait, self.release_throttled_field(obj, role, field, signature)):
+            size = 1 if signature.latest_only else self.manager.max_throttled_values
+            self.throttled_fields.setdefault(obj.oid, {})[(role, field)] = deque([params], maxlen=size)
+            return
+        # Also sent right away if there is no event loop to send it later
+        sent_at[(role, field)] = now
+        self.request_call_field(None, obj, role, field, params, signature=signature)
+
+    def release_throttled_field(self, obj: NetworkObject, role: int, field: int, signature: FieldSignature):
+        assert signature.max_rate is not None
+
+        def callback():
+            per_object = self.throttled_fields.get(obj.oid)
+            pending = per_object.get((role, field)) if per_object else None
+            if per_object is None or pending is None or obj.object_state != ObjectState.GENERATED:
+                # The object was destroyed, along with its throttled fields
+                return
+            self.field_sent_at.setdefault(obj.oid, {})[(role, field)] = time.monotonic()
+            self.request_call_field(None, obj, role, field, pending.popleft(), signature=signature)
+            if pending and self.manager.schedule_timer(1 / signature.max_rate, callback):
+                return
+            del per_object[(role, field)]
+            if not per_object:
+                del self.throttled_fields[obj.oid]
+            # Only happens if the event loop is gone, the rest has to be sent now
+            for params in pending:
+                self.request_call_field(None, obj, role, field, params, signature=signature)
+
+        return callback
+
     def request_visible_objects(self):
         msg = NetMessage(StandardMessageTypes.REQUEST_VISIBLE_OBJECTS)
         self.manager.send_message(msg)
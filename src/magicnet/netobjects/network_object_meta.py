@@ -3,6 +3,7 @@ __all__ = ["NetworkObjectMeta"]
 import abc
 from typing import TYPE_CHECKING, Any, cast
 
+from magicnet.netobjects.column_store import ColumnStore
 from magicnet.netobjects.network_field import NetworkField
 
 if TYPE_CHECKING:
@@ -33,7 +34,14 @@ class NetworkObjectMeta(abc.ABCMeta):
     def __prepare__(cls, name: str, bases: tuple[type, ...], **kwds: object):
         return NetworkFieldCounter()
 
-    def __new__(cls, name: str, bases: tuple[type, ...], classdict: NetworkFieldCounter):
+    def __new__(cls, name: str, bases: tuple[type, ...], classdict: dict[str, Any]):
+        if not isinstance(classdict, NetworkFieldCounter):
+            # The class is created by type(), or recreated by dataclass(slots=True)
+            counter = NetworkFieldCounter()
+            for key, value in classdict.items():
+                counter[key] = value
+            classdict = counter
+
         for field in classdict.field_data:
             # Raises if something is wrong
             field.check_validity(name)
@@ -41,4 +49,6 @@ class NetworkObjectMeta(abc.ABCMeta):
         result = cast(type["NetworkObject"], type.__new__(cls, name, bases, dict(classdict)))
         result.field_data = classdict.field_data
         result.foreign_field_data = {}
+        # Each class has a store of its own, even if the flag is inherited
+        result.column_store = ColumnStore() if getattr(result, "columnar_storage", False) else None
         return result
@@ -2,7 +2,7 @@ __all__ = ["message_processors"]
 
 from typing import Final
 
-from magicnet.protocol.processors import data, handshake, network_objects
+from magicnet.protocol.processors import data, handshake, heartbeat, network_objects
 from magicnet.protocol.protocol_globals import StandardMessageTypes
 
 message_processors: Final = {
@@ -18,4 +18,9 @@ message_processors: Final = {
     StandardMessageTypes.REQUEST_DELETE_OBJECT: network_objects.MsgDeleteObject,
     StandardMessageTypes.DESTROY_OBJECT: network_objects.MsgDestroyObject,
     StandardMessageTypes.REQUEST_VISIBLE_OBJECTS: network_objects.MsgRequestVisible,
+    StandardMessageTypes.PING: heartbeat.MsgPing,
+    StandardMessageTypes.PONG: heartbeat.MsgPong,
+    StandardMessageTypes.GENERATE_OBJECTS: network_objects.MsgGenerateObjects,
+    StandardMessageTypes.DESTROY_OBJECTS: network_objects.MsgDestroyObjects,
+    StandardMessageTypes.REQUEST_DELETE_OBJECTS: network_objects.MsgDeleteObjects,
 }
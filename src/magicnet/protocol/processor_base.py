@@ -28,7 +28,7 @@ class MessageProcessor(MessengerNode["DatagramProcessor", "NetworkManager"], Gen
 
     @property
     def manager(self) -> "NetworkManager":
-        return self.parent.parent
+        return self.root
 
     @abc.abstractmethod
     def invoke(self, message: NetMessage[Unpack[tuple[Any, ...]]]):
@@ -0,0 +1,38 @@
+__all__ = []
+
+from typing import final
+
+from magicnet.core.heartbeat import timestamp_us
+from magicnet.core.net_globals import MessagePriority
+from magicnet.core.net_message import NetMessage
+from magicnet.protocol import network_types
+from magicnet.protocol.processor_base import MessageProcessor
+from magicnet.protocol.protocol_globals import StandardMessageTypes
+
+
+@final
+class MsgPing(MessageProcessor[int]):
+    arg_type = tuple[network_types.uint64]
+
+    def invoke(self, message: NetMessage[int]):
+        assert message.sent_from
+        reply = NetMessage(
+            StandardMessageTypes.PONG,
+            message.parameters,
+            destination=message.sent_from,
+            priority=MessagePriority.HIGH,
+        )
+        self.manager.send_message(reply)
+
+
+@final
+class MsgPong(MessageProcessor[int]):
+    arg_type = tuple[network_types.uint64]
+
+    def invoke(self, message: NetMessage[int]):
+        assert message.sent_from
+        sample = timestamp_us() - message.parameters[0]
+        if sample < 0:
+            # Nobody sends PING with a timestamp from the future
+            return
+        message.sent_from.add_rtt_sample(sample / 1e6)
@@ -2,8 +2,11 @@ __all__ = []
 
 from typing import Any, cast, final
 
+from typing_extensions import Unpack
+
+from magicnet.core.net_globals import MessagePriority
 from magicnet.core.net_message import NetMessage
-from magicnet.netobjects.network_object import ObjectState
+from magicnet.netobjects.network_object import NetworkObject, ObjectState
 from magicnet.protocol import network_types
 from magicnet.protocol.processor_base import MessageProcessor
 from magicnet.protocol.protocol_globals import StandardDCReasons
@@ -53,6 +56,47 @@ class MsgCreateObject(MessageProcessor[int, int, int, int, list[tuple[int, int,
         self.manager.object_manager.initialize_object(obj.oid)
 
 
+def generate_object(
+    processor: MessageProcessor[Unpack[tuple[Any, ...]]],
+    message: NetMessage[Unpack[tuple[Any, ...]]],
+    object_id: int,
+    object_type: int,
+    owner_id: int,
+    zone_id: int,
+) -> NetworkObject | None:
+    """Creates the object described by a generation message, returns None if it cannot be created"""
+    assert message.sent_from
+    manager = processor.manager
+    success, repo_number = message.sent_from.get_shared_parameter("rp", uint32)
+    if success and repo_number == object_id >> 32:
+        # This means the request was sent from the same handle that handles
+        # this response. It is therefore, a partial object!
+        # We do a special handling here.
+        object_id_base = object_id % (1 << 32)
+        obj = manager.object_manager.partial_objects.pop(object_id_base, None)
+        if not obj or obj.object_state != ObjectState.CREATE_REQUESTED:
+            processor.emit(
+                StandardEvents.WARNING,
+                f"Ignoring bad partial generation for object {object_id}",
+            )
+            return None
+        obj.object_state = ObjectState.GENERATING
+        obj.set_parameters(object_id, owner_id, zone_id)
+        manager.object_manager.add_network_object(obj)
+        return obj
+
+    ctor = manager.object_registry.get_constructor(object_type)
+    if ctor is None:
+        message.disconnect_sender(StandardDCReasons.INVALID_OBJECT_TYPE, f"Unknown object: {object_id}")
+        return None
+
+    obj = ctor(controller=manager)
+    obj.object_state = ObjectState.GENERATING
+    obj.set_parameters(object_id, owner_id, zone_id)
+    manager.object_manager.add_network_object(obj)
+    return obj
+
+
 @final
 class MsgGenerateObject(MessageProcessor[int, int, int, int]):
     arg_type = tuple[
@@ -63,35 +107,38 @@ class MsgGenerateObject(MessageProcessor[int, int, int, int]):
     ]
 
     def invoke(self, message: NetMessage[int, int, int, int]):
-        assert message.sent_from
-        object_id, object_type, owner_id, zone_id = message.parameters
-        success, repo_number = message.sent_from.get_shared_parameter("rp", uint32)
-        if success and repo_number == object_id >> 32:
-            # This means the request was sent from the same handle that handles
-            # this response. It is therefore, a partial object!
-            # We do a special handling here.
-            object_id_base = object_id % (1 << 32)
-            obj = self.manager.object_manager.partial_objects.pop(object_id_base, None)
-            if not obj or obj.object_state != ObjectState.CREATE_REQUESTED:
-                self.emit(
-                    StandardEvents.WARNING,
-                    f"Ignoring bad partial generation for object {object_id}",
-                )
-            else:
-                obj.object_state = ObjectState.GENERATING
-                obj.set_parameters(object_id, owner_id, zone_id)
-                self.manager.object_manager.add_network_object(obj)
-            return
+        generate_object(self, message, *message.parameters)
 
-        ctor = self.manager.object_registry.get_constructor(object_type)
-        if ctor is None:
-            message.disconnect_sender(StandardDCReasons.INVALID_OBJECT_TYPE, f"Unknown object: {object_id}")
-            return
 
-        obj = ctor(controller=self.manager)
-        obj.object_state = ObjectState.GENERATING
-        obj.set_parameters(object_id, owner_id, zone_id)
-        self.manager.object_manager.add_network_object(obj)
+GeneratedObject = tuple[int, int, int, int, list[tuple[int, int, list[Any]]]]
+
+
+@final
+class MsgGenerateObjects(MessageProcessor[list[GeneratedObject]]):
+    arg_type = tuple[
+        list[
+            tuple[
+                network_types.uint64,  # object ID (with the repository)
+                network_types.uint16,  # object type index
+                network_types.uint32,  # object owner's repository
+                network_types.uint32,  # object zone (unused by default)
+                list[tuple[network_types.uint8, network_types.uint8, list[network_types.hashable]]],
+                # object's parameters
+            ]
+        ]
+    ]
+
+    def invoke(self, message: NetMessage[list[GeneratedObject]]):
+        assert message.sent_from
+        object_manager = self.manager.object_manager
+        for object_id, object_type, owner_id, zone_id, params in message.parameters[0]:
+            obj = generate_object(self, message, object_id, object_type, owner_id, zone_id)
+            if message.sent_from.destroyed:
+                # The sender was disconnected, the rest of the objects are not trusted either
+                return
+            if obj is not None:
+                obj.load_params(message.sent_from, params)
+                object_manager.initialize_object(obj.oid)
 
 
 @final
@@ -138,6 +185,19 @@ class MsgDeleteObject(MessageProcessor[int]):
         self.manager.object_manager.perform_object_deletion(obj_id, repo_number)
 
 
+@final
+class MsgDeleteObjects(MessageProcessor[list[int]]):
+    arg_type = tuple[list[network_types.uint64]]
+
+    def invoke(self, message: NetMessage[list[int]]):
+        assert message.sent_from
+        success, repo_number = message.sent_from.get_shared_parameter("rp", uint32, disconnect=True)
+        if not success or repo_number is None:
+            return
+
+        self.manager.object_manager.perform_objects_deletion(message.parameters[0], repo_number)
+
+
 @final
 class MsgDestroyObject(MessageProcessor[int]):
     arg_type = tuple[network_types.uint64]
@@ -147,6 +207,15 @@ class MsgDestroyObject(MessageProcessor[int]):
         self.manager.object_manager.destroy_network_object(obj_id)
 
 
+@final
+class MsgDestroyObjects(MessageProcessor[list[int]]):
+    arg_type = tuple[list[network_types.uint64]]
+
+    def invoke(self, message: NetMessage[list[int]]):
+        for obj_id in message.parameters[0]:
+            self.manager.object_manager.destroy_network_object(obj_id)
+
+
 @final
 class MsgRequestVisible(MessageProcessor[()]):
     arg_type = tuple[()]
@@ -154,6 +223,6 @@ class MsgRequestVisible(MessageProcessor[()]):
     def invoke(self, message: NetMessage[()]):
         assert message.sent_from
         all_objects = self.manager.object_manager.get_visible_objects(message.sent_from)
-        for obj in all_objects:
-            params = obj.get_loaded_params()
-            self.manager.object_manager.send_network_object_generate(obj, params, message.sent_from)
+        self.manager.object_manager.send_network_objects_generate(
+            all_objects, message.sent_from, priority=MessagePriority.BULK
+        )
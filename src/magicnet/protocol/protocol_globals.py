@@ -115,13 +115,54 @@ class StandardMessageTypes(IntEnum):
     This method is called at some point after the client connects to the server.
     For each object that the client should see, the server must reply
     with the standard generate procedure
-    (GENERATE_OBJECT, zero or more SET_OBJECT_FIELD, then OBJECT_GENERATE_DONE).
+    (GENERATE_OBJECTS, or GENERATE_OBJECT, zero or more SET_OBJECT_FIELD, then OBJECT_GENERATE_DONE).
     It is expected that the client unloads the object they do not see
     before this is called, if the infrastructure requires multiple calls to this.
 
     Parameters: []
     """
 
+    PING = auto()
+    """
+    Sent periodically to every activated handle if the NetworkManager
+    has a heartbeat_interval. The other side must reply with PONG
+    carrying the same timestamp, which is used to measure the round trip time.
+
+    Parameters: [uint64 timestamp_us]
+    """
+
+    PONG = auto()
+    """
+    Reply to PING, the timestamp is copied from it.
+
+    Parameters: [uint64 timestamp_us]
+    """
+
+    GENERATE_OBJECTS = auto()
+    """
+    Same as GENERATE_OBJECT followed by SET_OBJECT_FIELD and OBJECT_GENERATE_DONE,
+    but for many objects at once, each with its initial parameters.
+    Used to reply to REQUEST_VISIBLE_OBJECTS.
+
+    Parameters: [list[tuple[uint64 oid, uint16 type, uint32 owner, uint32 zone,
+                            list[tuple[uint8, uint8, hashable]] params]]]
+    """
+
+    DESTROY_OBJECTS = auto()
+    """
+    Same as DESTROY_OBJECT, but for many objects at once.
+
+    Parameters: [list[uint64] oids]
+    """
+
+    REQUEST_DELETE_OBJECTS = auto()
+    """
+    Same as REQUEST_DELETE_OBJECT, but for many objects at once.
+    The authority replies with DESTROY_OBJECTS.
+
+    Parameters: [list[uint64] oids]
+    """
+
 
 class StandardDCReasons(IntEnum):
     HELLO_MULTIPLE = auto()
@@ -136,6 +177,12 @@ class StandardDCReasons(IntEnum):
     """One of the invariants enforced by MagicNetworking is not fulfilled"""
     INVALID_OBJECT_TYPE = auto()
     """The client asked to create a network object with a non-existent type"""
+    RATE_LIMITED = auto()
+    """The client sent more messages than its rate limit allows"""
+    SLOW_CONSUMER = auto()
+    """The client did not read the data sent to it fast enough"""
+    IDLE_TIMEOUT = auto()
+    """Nothing was received from the client for longer than the idle timeout"""
 
 
-mn_proto_version = 3
+mn_proto_version = 5
@@ -1,20 +1,30 @@
 __all__ = ["MessengerNode", "StandardEvents"]
 
-import contextlib
 import dataclasses
+import functools
 import itertools
-from collections.abc import Callable, Iterator
+from collections.abc import Callable, Collection, Iterator, Mapping
 from enum import Enum, auto
-from typing import Any, Generic, TypeVar, cast
-from uuid import UUID, uuid4
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Generic, TypeVar, cast
+from uuid import UUID
 
 from typing_extensions import Self
 
+from magicnet.util.slots import LazyUUID, WeakrefSlot
+
+if TYPE_CHECKING:
+    from magicnet.util.profiling import ListenerProfiler
+
 MNodeT = TypeVar("MNodeT", bound="MessengerNode[Any, Any]")
 MParentT = TypeVar("MParentT", bound="MessengerNode[Any, Any]")
 MRootT = TypeVar("MRootT", bound="MessengerNode[Any, Any]")
 T = TypeVar("T")
 
+node_ids = itertools.count(1)
+"""Process-unique identifiers of the nodes, which are much cheaper than UUIDs"""
+NO_CHILDREN: Mapping[Any, Any] = MappingProxyType({})
+
 
 class StandardEvents(Enum):
     DEBUG = auto()
@@ -28,28 +38,48 @@ class StandardEvents(Enum):
 
 @dataclasses.dataclass
 class CallbackSettings:
-    owner: UUID
+    owner: int
     callback: Callable[..., Any]
     priority: int = 0
+    wants_context: bool = False
+    owner_class: type | None = None
 
 
 @dataclasses.dataclass
 class PriorityDict:
-    listeners: dict[int, dict[UUID, CallbackSettings]] = dataclasses.field(default_factory=dict)
-    priorities: dict[UUID, int] = dataclasses.field(default_factory=dict)
+    listeners: dict[int, dict[int, CallbackSettings]] = dataclasses.field(default_factory=dict)
+    priorities: dict[int, int] = dataclasses.field(default_factory=dict)
+    callbacks: tuple[Callable[..., Any], ...] = ()
+    """
+    Callbacks of the enabled owners in the order of priority, rebuilt by the Listener
+    on the first dispatch after the callbacks or the disabled owners change,
+    so dispatching does not check either.
+    """
+    wants_context: bool = False
+    """Whether any of those callbacks reads Listener.current_event"""
+    stale: bool = True
+    """Whether callbacks has to be rebuilt before the next dispatch"""
 
     def __sort_listeners(self):
         self.listeners = {key: value for key, value in sorted(self.listeners.items())}
 
-    def add(self, owner: UUID, callback: Callable[..., Any], *, priority: int = 0):
+    def add(
+        self,
+        owner: int,
+        callback: Callable[..., Any],
+        *,
+        priority: int = 0,
+        wants_context: bool = False,
+        owner_class: type | None = None,
+    ):
         self.remove(owner)
         if priority not in self.listeners:
             self.listeners[priority] = {}
             self.__sort_listeners()
-        self.listeners[priority][owner] = CallbackSettings(owner, callback, priority)
+        self.listeners[priority][owner] = CallbackSettings(owner, callback, priority, wants_context, owner_class)
         self.priorities[owner] = priority
 
-    def remove(self, owner: UUID):
+    def remove(self, owner: int):
         if owner not in self.priorities:
             return
         prio = self.priorities.pop(owner)
@@ -58,6 +88,17 @@ class PriorityDict:
     def get_callbacks(self) -> Iterator[CallbackSettings]:
         return itertools.chain.from_iterable(per_prio.values() for per_prio in self.listeners.values())
 
+    def rebuild(
+        self, disabled_owners: Collection[int], wrap: Callable[[CallbackSettings], Callable[..., Any]] | None = None
+    ):
+        enabled = [item for item in self.get_callbacks() if item.owner not in disabled_owners]
+        if wrap is None:
+            self.callbacks = tuple(item.callback for item in enabled)
+        else:
+            self.callbacks = tuple(wrap(item) for item in enabled)
+        self.wants_context = any(item.wants_context for item in enabled)
+        self.stale = False
+
 
 @dataclasses.dataclass
 class EventContext:
@@ -69,49 +110,57 @@ class EventContext:
 
 @dataclasses.dataclass
 class Listener:
-    disabled_uuids: set[UUID] = dataclasses.field(default_factory=set)
+    disabled_owners: set[int] = dataclasses.field(default_factory=set)
     events: dict[Any, PriorityDict] = dataclasses.field(default_factory=dict)
-    event_owners: dict[UUID, set[object]] = dataclasses.field(default_factory=dict)
+    event_owners: dict[int, set[object]] = dataclasses.field(default_factory=dict)
     math_targets: dict[Any, PriorityDict] = dataclasses.field(default_factory=dict)
-    math_owners: dict[UUID, set[object]] = dataclasses.field(default_factory=dict)
+    math_owners: dict[int, set[object]] = dataclasses.field(default_factory=dict)
     contexts: list[EventContext] = dataclasses.field(default_factory=list)
+    profiler: "ListenerProfiler | None" = None
+    """If set, every callback is timed by it, see set_profiler()"""
 
-    @staticmethod
     def __add_to_dicts(
+        self,
         base_dict: dict[Any, PriorityDict],
-        owner_dict: dict[UUID, set[object]],
-        owner: UUID,
+        owner_dict: dict[int, set[object]],
+        owner: int,
         event: object,
         callback: Callable[..., Any],
         *,
         priority: int = 0,
+        wants_context: bool = False,
+        owner_class: type | None = None,
     ):
         if event not in base_dict:
             base_dict[event] = PriorityDict()
-        base_dict[event].add(owner, callback, priority=priority)
+        base_dict[event].add(owner, callback, priority=priority, wants_context=wants_context, owner_class=owner_class)
+        base_dict[event].stale = True
 
         if owner not in owner_dict:
             owner_dict[owner] = set()
         owner_dict[owner].add(event)
 
-    @staticmethod
     def __cleanup(
+        self,
         base_dict: dict[Any, PriorityDict],
-        owner_dict: dict[UUID, set[object]],
-        owner: UUID,
+        owner_dict: dict[int, set[object]],
+        owner: int,
     ):
         events = owner_dict.pop(owner, None)
         if events:
             for event in events:
                 base_dict[event].remove(owner)
+                base_dict[event].stale = True
 
     def listen(
         self,
-        owner: UUID,
+        owner: int,
         event: object,
         callback: Callable[..., Any],
         *,
         priority: int = 0,
+        wants_context: bool = False,
+        owner_class: type | None = None,
     ):
         self.__add_to_dicts(
             self.events,
@@ -120,18 +169,17 @@ class Listener:
             event,
             callback,
             priority=priority,
+            wants_context=wants_context,
+            owner_class=owner_class,
         )
 
-    @contextlib.contextmanager
-    def set_context(self, context: EventContext):
-        try:
-            self.contexts.append(context)
-            yield
-        finally:
-            self.contexts.pop()
-
     @property
     def current_event(self) -> EventContext | None:
+        """
+        The event being emitted, only set while the callbacks of an event are called
+        if at least one of them was registered with wants_context=True.
+        Callbacks that read it have to be registered with wants_context=True.
+        """
         return self.contexts[-1] if self.contexts else None
 
     def emit(
@@ -141,22 +189,37 @@ class Listener:
         *args: object,
         **kwargs: object,
     ):
-        if event not in self.events:
+        """
+        Calls the callbacks listening to the event when emit() is called,
+        the listeners added, removed or disabled by those callbacks
+        are taken into account on the next emit.
+        """
+        callbacks = self.events.get(event)
+        if callbacks is None:
+            return
+        if callbacks.stale:
+            self.__rebuild(callbacks, event)
+        if not callbacks.wants_context:
+            for callback in callbacks.callbacks:
+                callback(*args, **kwargs)
             return
 
-        with self.set_context(EventContext(sender, event, args, kwargs)):
-            for item in self.events[event].get_callbacks():
-                if item.owner in self.disabled_uuids:
-                    continue
-                item.callback(*args, **kwargs)
+        # The context is only created if one of the callbacks asked for it
+        self.contexts.append(EventContext(sender, event, args, kwargs))
+        try:
+            for callback in callbacks.callbacks:
+                callback(*args, **kwargs)
+        finally:
+            self.contexts.pop()
 
     def add_math(
         self,
-        owner: UUID,
+        owner: int,
         event: object,
         callback: Callable[..., Any],
         *,
         priority: int = 0,
+        owner_class: type | None = None,
     ):
         self.__add_to_dicts(
             self.math_targets,
@@ -165,29 +228,61 @@ class Listener:
             event,
             callback,
             priority=priority,
+            owner_class=owner_class,
         )
 
     def calculate(self, event: object, value: T, *args: object, **kwargs: object) -> T:
-        if event not in self.math_targets:
+        callbacks = self.math_targets.get(event)
+        if callbacks is None:
             return value
-        for item in self.math_targets[event].get_callbacks():
-            if item.owner in self.disabled_uuids:
-                continue
-            value = item.callback(value, *args, **kwargs)
+        if callbacks.stale:
+            self.__rebuild(callbacks, event)
+        for callback in callbacks.callbacks:
+            value = callback(value, *args, **kwargs)
         return value
 
-    def ignore_all(self, owner: UUID):
+    def ignore_all(self, owner: int):
         self.__cleanup(self.events, self.event_owners, owner)
 
-    def enable(self, owner: UUID):
-        self.disabled_uuids.remove(owner)
-
-    def disable(self, owner: UUID):
-        self.disabled_uuids.add(owner)
-
-
-@dataclasses.dataclass(kw_only=True, repr=False)
-class MessengerNode(Generic[MParentT, MRootT]):
+    def __rebuild(self, callbacks: PriorityDict, event: object):
+        if self.profiler is None:
+            callbacks.rebuild(self.disabled_owners)
+        else:
+            callbacks.rebuild(self.disabled_owners, functools.partial(self.profiler.wrap, event))
+
+    def set_profiler(self, profiler: "ListenerProfiler | None"):
+        """
+        Starts timing every event and math target callback with the profiler,
+        or stops it if the profiler is None. The callbacks are wrapped
+        while the profiler is set, so this costs nothing otherwise.
+        """
+        self.profiler = profiler
+        for base_dict in (self.events, self.math_targets):
+            for callbacks in base_dict.values():
+                callbacks.stale = True
+
+    def __invalidate_owned(self, owner: int):
+        for base_dict, owner_dict in ((self.events, self.event_owners), (self.math_targets, self.math_owners)):
+            for event in owner_dict.get(owner, ()):
+                base_dict[event].stale = True
+
+    def enable(self, owner: int):
+        self.disabled_owners.remove(owner)
+        self.__invalidate_owned(owner)
+
+    def disable(self, owner: int):
+        self.disabled_owners.add(owner)
+        self.__invalidate_owned(owner)
+
+
+def check_child_name(name: object):
+    # Integers would collide with the node IDs of the unnamed children
+    if isinstance(name, int):
+        raise TypeError(f"Child names cannot be integers: {name!r}")
+
+
+@dataclasses.dataclass(kw_only=True, repr=False, slots=True)
+class MessengerNode(WeakrefSlot, Generic[MParentT, MRootT]):
     """
     MessengerNode is a base class for tree-based messaging.
     To use it, first a root node must be created (by calling `create_root`).
@@ -195,17 +290,45 @@ class MessengerNode(Generic[MParentT, MRootT]):
     (through either `create_child` or setting their `parent` value).
     Nodes can be attached recursively as well. After a tree is created,
     calls to listen(), emit(), add_math
+
+    The nodes are identified by node_id, which is unique within the process.
+    The children dict is only created once the first child is added,
+    as most nodes (i.e. network objects) never have any.
+    Unnamed children are stored under their node_id, so the names have to be strings.
     """
 
-    uuid: UUID = dataclasses.field(default_factory=uuid4)
-    children: dict[str | UUID, "MessengerNode[Any, MRootT]"] = dataclasses.field(default_factory=dict, repr=False)
+    node_id: int = dataclasses.field(default_factory=node_ids.__next__)
     name: Any = None
+    _children: "dict[str | int, MessengerNode[Any, MRootT]] | None" = dataclasses.field(
+        repr=False, default=None, compare=False
+    )
+    uuid: UUID = dataclasses.field(repr=False, default=None, compare=False)  # pyright: ignore[reportAssignmentType]
+    """
+    A globally unique identifier of the node, created on first access unless passed to the constructor.
+    Only needed when the node has to be told apart from the nodes
+    of other processes, node_id should be used otherwise.
+    """
     _parent: "MParentT | None" = dataclasses.field(repr=False, default=None)
     _listener: Listener | None = dataclasses.field(repr=False, default=None)
+    _root_cache: "MRootT | None" = dataclasses.field(repr=False, default=None, compare=False)
+    _listener_cache: Listener | None = dataclasses.field(repr=False, default=None, compare=False)
+    """
+    The root and listener are looked up on every message, so they are cached.
+    The caches are dropped for the subtree of a node that is attached or detached,
+    the rest of the tree keeps them.
+    """
+
+    @property
+    def children(self) -> "Mapping[str | int, MessengerNode[Any, MRootT]]":
+        """
+        Read-only view of the children by their bound_name,
+        they are changed with add_child(), remove_child() and create_child().
+        """
+        return self._children if self._children is not None else NO_CHILDREN
 
     @property
     def bound_name(self):
-        return self.name if self.name is not None else self.uuid
+        return self.name if self.name is not None else self.node_id
 
     @property
     def parent(self) -> "MParentT":
@@ -218,24 +341,56 @@ class MessengerNode(Generic[MParentT, MRootT]):
             self._parent.remove_child(self.bound_name)
         new_parent.add_child(self)
 
-    def remove_child(self, name: str | UUID):
-        child = self.children.pop(name, None)
+    def remove_child(self, name: str | int):
+        if self._children is None:
+            return
+        child = self._children.pop(name, None)
         if child:
             self.emit(StandardEvents.CHILD_REMOVED, parent=self, child=child)
             child._parent = None
+            child.invalidate_cache()
 
     def add_child(self, child: "MessengerNode[Self, MRootT]"):
+        check_child_name(child.name)
         if child.bound_name in self.children:
             self.emit(
                 StandardEvents.WARNING,
-                f"Child already exists: {self.uuid=} {child.bound_name=}",
+                f"Child already exists: {self.node_id=} {child.bound_name=}",
             )
             self.remove_child(child.name)
-        self.children[child.bound_name] = child
+        if self._children is None:
+            self._children = {}
+        self._children[child.bound_name] = child
         child._parent = self
+        child.invalidate_cache()
         self.emit(StandardEvents.CHILD_ADDED, parent=self, child=child)
 
-    def create_child(self, ctor: type[MNodeT], name: str | UUID | None = None, /, **kwargs: object) -> MNodeT:
+    def bind_parent(self, new_parent: "MParentT"):
+        """
+        Points the node to the parent without adding it to the children of the parent.
+        No events are emitted and the caches of the other nodes stay valid,
+        which makes this much cheaper than setting the parent. The node can still
+        listen and emit, but it is not reached by destroy(), enable(), disable()
+        or invalidate_cache() called on its ancestors, so whoever binds it
+        has to track it separately.
+        This is meant for large amounts of short-lived nodes, i.e. network objects.
+        """
+        self._parent = new_parent
+        self._root_cache = new_parent.root
+        self._listener_cache = new_parent.listener
+
+    def invalidate_cache(self):
+        """Drops the cached root and listener of the node and all of its descendants"""
+        stack: list[MessengerNode[Any, Any]] = [self]
+        while stack:
+            node = stack.pop()
+            node._root_cache = None
+            node._listener_cache = None
+            if node._children:
+                stack.extend(node._children.values())
+
+    def create_child(self, ctor: type[MNodeT], name: str | None = None, /, **kwargs: object) -> MNodeT:
+        check_child_name(name)
         if name is not None and name in self.children:
             current_child = self.children[name]
             if type(current_child) is not ctor:
@@ -251,27 +406,40 @@ class MessengerNode(Generic[MParentT, MRootT]):
     def create_root(cls, **kwargs: object):
         return cls(_listener=Listener(), **kwargs)  # pyright: ignore[reportArgumentType]
 
+    def __resolve_root(self):
+        node: MessengerNode[Any, Any] = self
+        while node._parent is not None:
+            node = node._parent
+        self._root_cache = cast(MRootT, node)
+        self._listener_cache = node._listener
+
     @property
     def root(self) -> "MRootT":
-        if self._parent is None:
-            return cast(MRootT, self)
-        return self.parent.root
+        if self._root_cache is None:
+            self.__resolve_root()
+        return cast(MRootT, self._root_cache)
 
     @property
     def listener(self) -> Listener:
-        root = self.root
-        if root is self:
-            assert self._listener is not None
-            return self._listener
-        return root.listener
+        if self._root_cache is None:
+            self.__resolve_root()
+        assert self._listener_cache is not None
+        return self._listener_cache
 
     def destroy(self):
-        self.listener.ignore_all(self.uuid)
+        self.listener.ignore_all(self.node_id)
         for child in self.children.values():
             child.destroy()
 
-    def listen(self, event: object, callback: Callable[..., Any], *, priority: int = 0):
-        self.listener.listen(self.uuid, event, callback, priority=priority)
+    def listen(self, event: object, callback: Callable[..., Any], *, priority: int = 0, wants_context: bool = False):
+        """
+        Calls the callback whenever the event is emitted. If wants_context is set,
+        the callback can read the sender and the parameters of the event
+        from listener.current_event, which is not available otherwise.
+        """
+        self.listener.listen(
+            self.node_id, event, callback, priority=priority, wants_context=wants_context, owner_class=type(self)
+        )
 
     def emit(self, event: object, *args: object, **kwargs: object):
         if not self.listener:
@@ -279,19 +447,22 @@ class MessengerNode(Generic[MParentT, MRootT]):
         self.listener.emit(self, event, *args, **kwargs)
 
     def add_math_target(self, event: object, callback: Callable[..., Any], *, priority: int = 0):
-        self.listener.add_math(self.uuid, event, callback, priority=priority)
+        self.listener.add_math(self.node_id, event, callback, priority=priority, owner_class=type(self))
 
     def calculate(self, event: object, value: T, *args: object, **kwargs: object) -> T:
         return self.listener.calculate(event, value, *args, **kwargs)
 
     def enable(self, *, recursive: bool = True):
-        self.listener.enable(self.uuid)
+        self.listener.enable(self.node_id)
         if recursive:
             for child in self.children.values():
                 child.enable(recursive=recursive)
 
     def disable(self, *, recursive: bool = True):
-        self.listener.disable(self.uuid)
+        self.listener.disable(self.node_id)
         if recursive:
             for child in self.children.values():
                 child.disable(recursive=recursive)
+
+
+LazyUUID.install(MessengerNode)
@@ -0,0 +1,90 @@
+__all__ = ["ListenerProfiler", "CallbackStats"]
+
+import dataclasses
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from magicnet.util.messenger import CallbackSettings, StandardEvents
+
+if TYPE_CHECKING:
+    from magicnet.util.messenger import MessengerNode
+
+ProfileKey = tuple[object, str, str]
+"""The event or math target, the class of the node that registered the callback, and the callback"""
+
+
+@dataclasses.dataclass
+class CallbackStats:
+    calls: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+
+def describe_callback(callback: Callable[..., Any]) -> str:
+    # functools.partial does not have a name of its own
+    callback = getattr(callback, "func", callback)
+    return getattr(callback, "__qualname__", repr(callback))
+
+
+@dataclasses.dataclass
+class ListenerProfiler:
+    """
+    ListenerProfiler records how many times each event and math target callback
+    was called, and how much wall time it took (including the callbacks
+    of the events it emitted itself). Install it with::
+
+        profiler = ListenerProfiler(reporter=manager, warn_threshold=0.005)
+        manager.listener.set_profiler(profiler)
+
+    If warn_threshold is set, a callback running longer than it (in seconds)
+    makes the reporter node emit a warning.
+    """
+
+    reporter: "MessengerNode[Any, Any] | None" = None
+    warn_threshold: float | None = None
+    stats: dict[ProfileKey, CallbackStats] = dataclasses.field(default_factory=dict)
+    reporting: bool = False
+
+    def wrap(self, event: object, settings: CallbackSettings) -> Callable[..., Any]:
+        owner_class = settings.owner_class.__name__ if settings.owner_class is not None else "?"
+        key = (event, owner_class, describe_callback(settings.callback))
+        stats = self.stats.setdefault(key, CallbackStats())
+        callback = settings.callback
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return callback(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                stats.calls += 1
+                stats.total_time += elapsed
+                stats.max_time = max(stats.max_time, elapsed)
+                if self.warn_threshold is not None and elapsed > self.warn_threshold:
+                    self.report(key, elapsed)
+
+        return timed
+
+    def report(self, key: ProfileKey, elapsed: float):
+        # The listeners of the warning are profiled as well, and may be slow too
+        if self.reporter is None or self.reporting:
+            return
+        self.reporting = True
+        try:
+            event, owner_class, callback = key
+            self.reporter.emit(
+                StandardEvents.WARNING, f"{owner_class}.{callback} took {elapsed * 1000:.2f} ms on {event}"
+            )
+        finally:
+            self.reporting = False
+
+    def snapshot(self) -> dict[ProfileKey, CallbackStats]:
+        """Returns a copy of the statistics of the callbacks that were called at least once"""
+        return {key: dataclasses.replace(stats) for key, stats in self.stats.items() if stats.calls}
+
+    def reset(self):
+        for stats in self.stats.values():
+            stats.calls = 0
+            stats.total_time = 0.0
+            stats.max_time = 0.0
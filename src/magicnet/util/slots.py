@@ -0,0 +1,42 @@
+__all__ = ["LazyUUID", "WeakrefSlot"]
+
+from typing import Any
+from uuid import UUID, uuid4
+
+
+class WeakrefSlot:
+    """
+    Base class that keeps the instances of slots dataclasses weakly referenceable.
+    dataclass(weakref_slot=True) does the same, but needs Python 3.11.
+    """
+
+    __slots__ = ("__weakref__",)
+
+
+class LazyUUID:
+    """
+    Replaces the uuid slot of a slots dataclass, so that uuid= can still be passed
+    to the constructor, but a UUID is only created when it is first read.
+    Installed with LazyUUID.install(cls) right after the class is created.
+    """
+
+    __slots__ = ("slot",)
+
+    def __init__(self, slot: Any):
+        self.slot = slot
+
+    @classmethod
+    def install(cls, owner: type) -> None:
+        setattr(owner, "uuid", cls(owner.__dict__["uuid"]))
+
+    def __get__(self, obj: object, owner: type | None = None) -> Any:
+        if obj is None:
+            return self
+        value = self.slot.__get__(obj, owner)
+        if value is None:
+            value = uuid4()
+            self.slot.__set__(obj, value)
+        return value
+
+    def __set__(self, obj: object, value: UUID | None) -> None:
+        self.slot.__set__(obj, value)
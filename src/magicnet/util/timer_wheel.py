@@ -0,0 +1,115 @@
+__all__ = ["TimerWheel", "WheelTimer"]
+
+import math
+from collections.abc import Callable
+
+
+class WheelTimer:
+    """A timer scheduled on a TimerWheel, can be cancelled with cancel()"""
+
+    __slots__ = ("wheel", "callback", "slot", "rounds", "active")
+
+    def __init__(self, wheel: "TimerWheel", callback: Callable[[], object], slot: int, rounds: int):
+        self.wheel = wheel
+        self.callback = callback
+        self.slot = slot
+        self.rounds = rounds
+        self.active = True
+
+    def cancel(self) -> None:
+        if self.active:
+            self.active = False
+            self.wheel.remove(self)
+
+
+class TimerWheel:
+    """
+    TimerWheel is a hashed timing wheel: a ring of slots, each one
+    covering resolution seconds, which holds the timers due in that slot
+    in any of the future rotations. Scheduling and cancelling a timer is O(1),
+    and advancing the wheel only looks at the slots that were passed.
+    This is much cheaper than a heap when there are a lot of timers
+    (i.e. a few per handle), at the cost of the timers firing up to
+    resolution seconds late.
+
+    The wheel does not have a clock of its own, advance() has to be called
+    with the current time, see NetworkManager.schedule_timer().
+    next_delay() tells when the nearest timer is due, so the wheel
+    does not have to be advanced on every tick.
+    """
+
+    def __init__(self, now: float, resolution: float = 0.01, slot_count: int = 512):
+        self.resolution = resolution
+        self.slots: list[dict[WheelTimer, None]] = [{} for _ in range(slot_count)]
+        self.tick = 0
+        self.started = now
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def schedule(self, delay: float, callback: Callable[[], object], *, now: float) -> WheelTimer:
+        deadline = math.ceil((now + delay - self.started) / self.resolution)
+        # Timers always fire on a later tick than the current one, even with a zero delay
+        ticks = max(deadline - self.tick, 1)
+        target = self.tick + ticks
+        slot = target % len(self.slots)
+        timer = WheelTimer(self, callback, slot, (ticks - 1) // len(self.slots))
+        self.slots[slot][timer] = None
+        self.size += 1
+        return timer
+
+    def remove(self, timer: WheelTimer) -> None:
+        slot = self.slots[timer.slot]
+        if timer in slot:
+            del slot[timer]
+            self.size -= 1
+
+    def advance(self, now: float) -> int:
+        """Runs all timers that are due by now, returns how many were run"""
+        target = int((now - self.started) / self.resolution)
+        fired = 0
+        while self.tick < target and self.size:
+            self.tick += 1
+            slot = self.slots[self.tick % len(self.slots)]
+            due: list[WheelTimer] = []
+            for timer in slot:
+                if timer.rounds:
+                    timer.rounds -= 1
+                else:
+                    due.append(timer)
+            for timer in due:
+                del slot[timer]
+            self.size -= len(due)
+            # Run after the slot is updated, as the callbacks may schedule or cancel timers
+            for timer in due:
+                if timer.active:
+                    timer.active = False
+                    timer.callback()
+                    fired += 1
+        self.tick = max(self.tick, target)
+        return fired
+
+    def next_tick(self) -> int | None:
+        """The tick of the nearest due timer, None if there are no timers"""
+        if not self.size:
+            return None
+        count = len(self.slots)
+        best: int | None = None
+        for offset in range(1, count + 1):
+            if best is not None and offset >= best:
+                # Every slot further away is due later
+                break
+            slot = self.slots[(self.tick + offset) % count]
+            if slot:
+                due = offset + min(timer.rounds for timer in slot) * count
+                best = due if best is None else min(best, due)
+        assert best is not None
+        return self.tick + best
+
+    def next_delay(self, now: float) -> float:
+        """Delay until the nearest timer is due, or until the next tick if there are no timers"""
+        tick = self.next_tick()
+        if tick is None:
+            tick = self.tick + 1
+        return max(tick * self.resolution + self.started - now, 0.0)
@@ -8,6 +8,8 @@ from enum import IntFlag, auto
 from typing import Any, Union
 
 from magicnet.core import errors
+from magicnet.core.net_globals import DeliveryMode, MessagePriority
+from magicnet.core.net_message import channel_range
 from magicnet.protocol import network_types
 from magicnet.util.typechecking.dataclass_converter import convert_object
 from magicnet.util.typechecking.magicnet_typechecker import check_type
@@ -95,6 +97,11 @@ class FieldSignature:
     signature: list[SignatureItem] = None
     name: str = None
     flags: SignatureFlags = SignatureFlags(0)
+    delivery: DeliveryMode = DeliveryMode.RELIABLE_ORDERED
+    channel: int = 0
+    priority: MessagePriority = MessagePriority.NORMAL
+    max_rate: float | None = None
+    latest_only: bool = False
 
     def __repr__(self):
         return f"{self.name}{self.signature}"
@@ -110,6 +117,17 @@ class FieldSignature:
     def set_name(self, name: str):
         self.name = name
 
+    def set_delivery(self, delivery: int, channel: int, priority: int = MessagePriority.NORMAL):
+        if channel not in channel_range:
+            raise errors.InvalidChannel(channel)
+        self.delivery = DeliveryMode(delivery)
+        self.channel = channel
+        self.priority = MessagePriority(priority)
+
+    def set_rate(self, max_rate: float | None, *, latest_only: bool = False):
+        self.max_rate = max_rate or None
+        self.latest_only = latest_only
+
     def validate_arguments(self, args: list[Any], *, on_call_site: bool = False):
         parameters: list[Any] = []
         try:
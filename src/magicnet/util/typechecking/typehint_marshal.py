@@ -5,6 +5,7 @@ import inspect
 from typing import Annotated, Any, ForwardRef, Union, cast, get_args, get_origin
 
 from magicnet.core import errors
+from magicnet.core.net_globals import DeliveryMode, MessagePriority
 from magicnet.protocol import network_types
 from magicnet.util.typechecking.field_signature import FieldSignature, SignatureItem
 from magicnet.util.typechecking.magicnet_typechecker import check_type
@@ -164,6 +165,12 @@ class TypehintMarshal:
         fs = FieldSignature()
         fs.set_name(marshal["n"])
         fs.set_from_list(items, marshal["a"])
+        fs.set_delivery(
+            marshal.get("d", DeliveryMode.RELIABLE_ORDERED),
+            marshal.get("c", 0),
+            marshal.get("p", MessagePriority.NORMAL),
+        )
+        fs.set_rate(marshal.get("r", 0) / 1000, latest_only=bool(marshal.get("l", 0)))
         return fs
 
     def signature_to_marshal(self, signature: FieldSignature) -> network_types.hashable:
@@ -171,6 +178,12 @@ class TypehintMarshal:
             "f": [self.item_to_marshal(x) for x in signature.signature],
             "n": signature.name,
             "a": int(signature.flags),
+            "d": int(signature.delivery),
+            "c": signature.channel,
+            "p": int(signature.priority),
+            # The rate is stored in milli-Hz, as floats are not hashable network types
+            "r": round(signature.max_rate * 1000) if signature.max_rate else 0,
+            "l": int(signature.latest_only),
         }
 
 
@@ -1,6 +1,7 @@
 import json
 from typing import Any
 
+from magicnet.core.net_globals import DeliveryMode, MessagePriority
 from magicnet.netobjects.network_field import NetworkField
 from magicnet.protocol import network_types
 from magicnet.util.typechecking.field_signature import SignatureFlags
@@ -81,3 +82,31 @@ def test_annotated():
     unjsonned = json.loads(jsonned)
     signature = typehint_marshal.marshal_to_signature(unjsonned)
     assert signature.flags == SignatureFlags(0)
+
+
+def test_delivery_mode():
+    @NetworkField(
+        delivery=DeliveryMode.UNRELIABLE_SEQUENCED,
+        channel=3,
+        priority=MessagePriority.HIGH,
+    )
+    def some_field(x: network_types.int16):
+        pass
+
+    marshalled = typehint_marshal.signature_to_marshal(some_field)
+    signature = typehint_marshal.marshal_to_signature(
+        json.loads(json.dumps(marshalled))
+    )
+    assert signature.delivery == DeliveryMode.UNRELIABLE_SEQUENCED
+    assert signature.channel == 3
+    assert signature.priority == MessagePriority.HIGH
+
+    @NetworkField
+    def other_field():
+        pass
+
+    marshalled = typehint_marshal.signature_to_marshal(other_field)
+    signature = typehint_marshal.marshal_to_signature(
+        json.loads(json.dumps(marshalled))
+    )
+    assert signature.delivery == DeliveryMode.RELIABLE_ORDERED
@@ -1,4 +1,5 @@
 import dataclasses
+import weakref
 
 from magicnet.netobjects.network_object import NetworkObject, ObjectState
 from net_objects.net_tester_netobj import (
@@ -39,6 +40,29 @@ def test_basics():
     assert cl_object.oid not in tester.server.net_objects
 
 
+def test_slots_object():
+    @dataclasses.dataclass(slots=True)
+    class TestNetObject(NetworkObject):
+        network_name = "test_obj"
+        object_role = 0
+
+        value: int = 0
+
+        def net_create(self) -> None:
+            self.value = 1
+
+    tester = SymmetricNetworkObjectTester.create_and_start(TestNetObject)
+    srv_object = TestNetObject(tester.server)
+    srv_object.request_generate()
+    tester.server.transport.empty_queue()
+    cl_object = tester.client.net_objects[srv_object.oid]
+    assert cl_object.value == srv_object.value == 1
+    assert not hasattr(cl_object, "__dict__")
+    assert not hasattr(tester.server.get_handle("client"), "__dict__")
+    assert weakref.ref(cl_object)() is cl_object
+    assert weakref.ref(tester.server.get_handle("client"))() is not None
+
+
 def test_asymmetric():
     @dataclasses.dataclass
     class TestNetObject(NetworkObject):
@@ -80,3 +104,34 @@ def test_asymmetric():
     assert cl_object.object_state == ObjectState.INVALID
     assert cl_object.oid not in tester.client.net_objects
     assert cl_object.oid not in tester.server.net_objects
+
+
+def test_objects_bypass_tree():
+    @dataclasses.dataclass
+    class TestNetObject(NetworkObject):
+        network_name = "test_obj"
+        object_role = 0
+
+        def net_create(self) -> None:
+            self.listen("ping", self.on_ping)
+
+        def net_delete(self) -> None:
+            pass
+
+        def on_ping(self, pings: list[int]) -> None:
+            pings.append(self.oid)
+
+    tester = SymmetricNetworkObjectTester.create_and_start(TestNetObject)
+    srv_object = TestNetObject(tester.server)
+    srv_object.request_generate()
+    tester.server.transport.empty_queue()
+    object_manager = tester.server.object_manager
+    assert srv_object.manager is tester.server
+    assert not object_manager.children
+
+    pings = []
+    tester.server.emit("ping", pings)
+    assert pings == [srv_object.oid]
+    srv_object.request_delete()
+    tester.server.emit("ping", pings)
+    assert pings == [srv_object.oid]
@@ -0,0 +1,107 @@
+import dataclasses
+
+from magicnet.batteries.middlewares.zone_routing import ZoneBasedRouter
+from magicnet.core.net_globals import MNEvents
+from magicnet.netobjects.network_field import NetworkField
+from magicnet.netobjects.network_object import NetworkObject
+from magicnet.protocol.protocol_globals import StandardMessageTypes
+from magicnet.util.messenger import MessengerNode
+from net_objects.net_tester_netobj import FlexibleNetworkObjectTester
+
+
+class ZoneTester(FlexibleNetworkObjectTester):
+    server_middlewares = [*FlexibleNetworkObjectTester.middlewares, ZoneBasedRouter]
+
+
+@dataclasses.dataclass
+class BulkObject(NetworkObject):
+    network_name = "bulk_obj"
+    object_role = 0
+
+    value: int = 0
+    created: bool = False
+
+    @NetworkField
+    def set_value(self, value: int):
+        self.value = value
+
+    def net_create(self) -> None:
+        self.created = True
+
+    def net_delete(self) -> None:
+        pass
+
+
+def test_bulk_generate_and_destroy():
+    tester = ZoneTester.create_and_start(BulkObject, BulkObject)
+    tester.server.object_batch_size = 2
+    objects = []
+    for i in range(5):
+        obj = BulkObject(tester.server)
+        obj.send_message("set_value", [i])
+        obj.request_generate(zone=1 if i < 3 else 2)
+        objects.append(obj)
+
+    client = tester.make_client()
+    client.get_handle("server").set_shared_parameter("vz", [1])
+    received = []
+    # The manager itself already listens to this event
+    recorder = client.create_child(MessengerNode, "recorder")
+    recorder.listen(
+        MNEvents.DATAGRAM_RECEIVED,
+        lambda messages: received.extend(msg.message_type for msg in messages),
+    )
+    client.object_manager.request_visible_objects()
+    assert received == [StandardMessageTypes.GENERATE_OBJECTS] * 2
+    for i, obj in enumerate(objects[:3]):
+        cl_object = client.net_objects[obj.oid]
+        assert cl_object.value == i and cl_object.created
+    assert all(obj.oid not in client.net_objects for obj in objects[3:])
+
+    received.clear()
+    oids = [obj.oid for obj in objects]
+    tester.server.object_manager.perform_objects_deletion(oids, objects[0].owner)
+    # The objects of the invisible zone are filtered out of the messages
+    assert received == [StandardMessageTypes.DESTROY_OBJECTS] * 2
+    assert not client.net_objects and not tester.server.net_objects
+
+
+def test_bulk_destroy_queued():
+    tester = ZoneTester.create_and_start(BulkObject, BulkObject)
+    client = tester.make_client()
+    client.get_handle("server").set_shared_parameter("vz", [1])
+    objects = []
+    for zone in (1, 1, 2):
+        obj = BulkObject(tester.server)
+        obj.request_generate(zone=zone)
+        objects.append(obj)
+    assert len(client.net_objects) == 2
+
+    # The objects are destroyed before the queued messages are routed
+    with tester.server.transport.message_queue:
+        tester.server.object_manager.request_delete_objects([obj.oid for obj in objects])
+        assert not tester.server.net_objects
+    assert not client.net_objects
+
+
+def test_bulk_delete_request():
+    tester = ZoneTester.create_and_start(BulkObject, BulkObject)
+    tester.server.object_batch_size = 2
+    client = tester.make_client()
+    client.get_handle("server").set_shared_parameter("vz", [1])
+    objects = []
+    for _ in range(3):
+        obj = BulkObject(client)
+        obj.request_generate(zone=1)
+        objects.append(obj)
+    assert len(client.net_objects) == len(tester.server.net_objects) == 3
+
+    received = []
+    recorder = client.create_child(MessengerNode, "recorder")
+    recorder.listen(
+        MNEvents.DATAGRAM_RECEIVED,
+        lambda messages: received.extend(msg.message_type for msg in messages),
+    )
+    client.object_manager.request_delete_objects([obj.oid for obj in objects])
+    assert received == [StandardMessageTypes.DESTROY_OBJECTS] * 2
+    assert not client.net_objects and not tester.server.net_objects
@@ -0,0 +1,63 @@
+import dataclasses
+
+from magicnet.netobjects.network_field import NetworkField
+from magicnet.netobjects.network_object import NetworkObject
+from magicnet.protocol import network_types
+from net_objects.net_tester_netobj import SymmetricNetworkObjectTester
+
+
+@dataclasses.dataclass
+class CoalescedObject(NetworkObject):
+    network_name = "coalesced_obj"
+    object_role = 0
+    coalesce_updates = True
+
+    values: list[int] = dataclasses.field(default_factory=list)
+    log: list[tuple[str, int]] = dataclasses.field(default_factory=list)
+
+    @NetworkField
+    def set_value(self, value: network_types.uint16):
+        self.values.append(value)
+        self.log.append(("value", value))
+
+    @NetworkField(ram_persist=False)
+    def play_event(self, value: network_types.uint16):
+        self.log.append(("event", value))
+
+    def net_create(self) -> None:
+        pass
+
+    def net_delete(self) -> None:
+        pass
+
+
+def test_coalesced_updates():
+    tester = SymmetricNetworkObjectTester.create_and_start(CoalescedObject)
+    first = CoalescedObject(tester.server)
+    second = CoalescedObject(tester.server)
+    first.request_generate()
+    second.request_generate()
+    cl_first = tester.client.net_objects[first.oid]
+    cl_second = tester.client.net_objects[second.oid]
+
+    with tester.server.transport.message_queue:
+        for i in range(10):
+            second.send_message("set_value", [i])
+            first.send_message("set_value", [i + 100])
+        assert not cl_first.values
+    assert cl_first.values == [109]
+    assert cl_second.values == [9]
+
+    # Other fields of the object are not received before the values set earlier
+    with tester.server.transport.message_queue:
+        first.send_message("set_value", [1])
+        first.send_message("set_value", [2])
+        first.send_message("play_event", [7])
+        first.send_message("set_value", [3])
+        second.send_message("set_value", [4])
+    assert cl_first.log[1:] == [("value", 2), ("event", 7), ("value", 3)]
+    assert cl_second.values == [9, 4]
+
+    # Without a queue or an event loop, the values are sent right away
+    first.send_message("set_value", [5])
+    assert cl_first.values == [109, 2, 3, 5]
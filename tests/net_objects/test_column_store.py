@@ -0,0 +1,70 @@
+import dataclasses
+
+from magicnet.netobjects.column_store import NumericColumn, ObjectColumn
+from magicnet.netobjects.network_field import NetworkField
+from magicnet.netobjects.network_object import NetworkObject
+from magicnet.protocol import network_types
+from net_objects.net_tester_netobj import SymmetricNetworkObjectTester
+
+
+@dataclasses.dataclass
+class ColumnarObject(NetworkObject):
+    network_name = "columnar_obj"
+    object_role = 0
+    columnar_storage = True
+
+    position: tuple[int, int] = (0, 0)
+    label: str = ""
+
+    @NetworkField
+    def set_position(self, x: network_types.int32, y: network_types.int32):
+        self.position = (x, y)
+
+    @NetworkField
+    def set_label(self, label: network_types.s64):
+        self.label = label
+
+    def net_create(self) -> None:
+        pass
+
+    def net_delete(self) -> None:
+        pass
+
+
+def test_columnar_storage():
+    tester = SymmetricNetworkObjectTester.create_and_start(ColumnarObject)
+    store = ColumnarObject.column_store
+    assert store is not None and NetworkObject.column_store is None
+
+    srv_object = ColumnarObject(tester.server)
+    srv_object.send_message("set_label", ["first"])
+    srv_object.send_message("set_position", [3, -4])
+    srv_object.request_generate()
+    assert srv_object.loaded_params is None
+    assert isinstance(store.columns[(0, 0)], NumericColumn)
+    assert isinstance(store.columns[(0, 1)], ObjectColumn)
+
+    cl_object = tester.client.net_objects.get(srv_object.oid)
+    assert cl_object.position == (3, -4) and cl_object.label == "first"
+    # The fields come in the order the columns were created
+    assert cl_object.get_loaded_params() == [(0, 1, ["first"]), (0, 0, [3, -4])]
+
+    # Values not fitting the column are kept as is
+    cl_object.persist_field_data(0, 0, [1, 2**40])
+    assert cl_object.get_loaded_params()[1] == (0, 0, [1, 2**40])
+
+    srv_object.request_delete()
+    assert srv_object.column_slot == cl_object.column_slot == -1
+    assert len(store.free_slots) == store.slot_count == 2
+
+
+def test_numeric_column_keeps_types():
+    column = NumericColumn(["d", "q"])
+    column.set(0, [1.5, 2])
+    assert column.present[0] and column.get(0) == [1.5, 2]
+
+    # An int passed to a float field or a bool passed to an int field is not converted
+    column.set(1, [3, 4])
+    column.set(2, [0.5, True])
+    assert not column.present[1] and not column.present[2]
+    assert type(column.get(1)[0]) is int and column.get(2)[1] is True
@@ -0,0 +1,87 @@
+import dataclasses
+
+from magicnet.netobjects.network_field import NetworkField
+from magicnet.netobjects.network_object import NetworkObject
+from magicnet.protocol import network_types
+from magicnet.util.typechecking.typehint_marshal import typehint_marshal
+from net_objects.net_tester_netobj import SymmetricNetworkObjectTester
+
+
+@dataclasses.dataclass
+class RateLimitedObject(NetworkObject):
+    network_name = "rate_limited_obj"
+    object_role = 0
+
+    positions: list[int] = dataclasses.field(default_factory=list)
+    chat: list[int] = dataclasses.field(default_factory=list)
+
+    @NetworkField(max_rate=10, latest_only=True)
+    def set_position(self, value: network_types.uint16):
+        self.positions.append(value)
+
+    @NetworkField(max_rate=10)
+    def say(self, value: network_types.uint16):
+        self.chat.append(value)
+
+    def net_create(self) -> None:
+        pass
+
+    def net_delete(self) -> None:
+        pass
+
+
+def test_field_rates():
+    tester = SymmetricNetworkObjectTester.create_and_start(RateLimitedObject)
+    timers = []
+    # There is no event loop here, so the timers are run by hand
+    tester.server.schedule_timer = (
+        lambda delay, callback: timers.append(callback) or True
+    )
+    srv_object = RateLimitedObject(tester.server)
+    srv_object.request_generate()
+    cl_object = tester.client.net_objects[srv_object.oid]
+
+    for i in range(5):
+        srv_object.send_message("set_position", [i])
+        srv_object.send_message("say", [i])
+    # The first call goes out right away, the rest waits for the timer
+    assert cl_object.positions == [0] and cl_object.chat == [0]
+    assert len(timers) == 2
+
+    while timers:
+        timers.pop(0)()
+    assert cl_object.positions == [0, 4]
+    assert cl_object.chat == [0, 1, 2, 3, 4]
+
+
+def test_field_rate_sustained():
+    tester = SymmetricNetworkObjectTester.create_and_start(RateLimitedObject)
+    tester.server.max_throttled_values = 4
+    timers = []
+    tester.server.schedule_timer = (
+        lambda delay, callback: timers.append(callback) or True
+    )
+    srv_object = RateLimitedObject(tester.server)
+    srv_object.request_generate()
+    cl_object = tester.client.net_objects[srv_object.oid]
+    pending = tester.server.object_manager.throttled_fields
+
+    # Five calls per timer tick, the queue would grow forever if it was not bounded
+    for i in range(100):
+        for j in range(5):
+            srv_object.send_message("say", [i * 5 + j])
+        assert len(pending[srv_object.oid][(0, 1)]) <= 4
+        timers.pop(0)()
+    while timers:
+        timers.pop(0)()
+    assert len(cl_object.chat) < 500
+    assert cl_object.chat[-4:] == [496, 497, 498, 499]
+    assert srv_object.oid not in pending
+
+
+def test_field_rate_marshal():
+    signature = RateLimitedObject.field_data[0]
+    restored = typehint_marshal.marshal_to_signature(
+        typehint_marshal.signature_to_marshal(signature)
+    )
+    assert restored.max_rate == 10 and restored.latest_only
@@ -5,7 +5,7 @@ from unittest.mock import MagicMock
 from magicnet.core.net_globals import MNEvents
 from magicnet.core.net_message import NetMessage
 from magicnet.core.network_manager import NetworkManager
-from magicnet.protocol.protocol_globals import StandardMessageTypes
+from magicnet.protocol.protocol_globals import StandardMessageTypes, mn_proto_version
 from magicnet.util.messenger import StandardEvents
 from net_tester_generic import TwoNodeNetworkTester
 
@@ -15,7 +15,7 @@ class HackedNetworkManager(NetworkManager):
     def send_message(self, message: NetMessage):
         if (
             message.message_type == StandardMessageTypes.HELLO
-            and message.parameters[0] == 3
+            and message.parameters[0] == mn_proto_version
         ):
             # don't do a proper handshake
             return
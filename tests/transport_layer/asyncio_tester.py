@@ -0,0 +1,165 @@
+import asyncio
+import dataclasses
+import functools
+import time
+
+from magicnet.batteries.asyncio_network_manager import AsyncIONetworkManager
+from magicnet.batteries.encoders import MsgpackEncoder
+from magicnet.batteries.middlewares.message_validation import MessageValidatorMiddleware
+from magicnet.batteries.transport_managers import EverywhereTransportManager
+from magicnet.batteries.transports.socket_asyncio import AsyncIOSocketTransport
+from magicnet.core.net_globals import MNEvents
+from magicnet.core.net_message import NetMessage
+from magicnet.core.network_manager import NetworkManager
+from magicnet.core.transport_manager import TransportParameters
+from magicnet.protocol import network_types
+from magicnet.protocol.processor_base import MessageProcessor
+
+MSG_ECHO = 64
+MSG_ECHO_REPLY = 65
+MSG_BLOB = 66
+
+
+class MsgEcho(MessageProcessor):
+    arg_type = tuple[network_types.uint32]
+
+    def invoke(self, message: NetMessage):
+        self.manager.root.received.append(message.parameters[0])
+        reply = NetMessage(
+            MSG_ECHO_REPLY, message.parameters, destination=message.sent_from
+        )
+        self.manager.send_message(reply)
+
+
+class MsgEchoReply(MessageProcessor):
+    arg_type = tuple[network_types.uint32]
+
+    def invoke(self, message: NetMessage):
+        self.manager.root.received.append(message.parameters[0])
+
+
+class MsgBlob(MessageProcessor):
+    arg_type = tuple[bytes]
+
+    def invoke(self, message: NetMessage):
+        self.manager.root.received.append(len(message.parameters[0]))
+
+
+@dataclasses.dataclass(kw_only=True)
+class RecordingNetworkManager(AsyncIONetworkManager):
+    received: list[int] = dataclasses.field(default_factory=list)
+
+
+async def wait_until(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Condition was not reached in time")
+        await asyncio.sleep(0.001)
+
+
+@dataclasses.dataclass
+class AsyncIONetworkTester:
+    """
+    Runs a server and a client AsyncIONetworkManager on the same event loop.
+    The managers never call run_forever(), instead the test runs a scenario
+    coroutine through run().
+    """
+
+    transport_cls = AsyncIOSocketTransport
+    middlewares = [MessageValidatorMiddleware]
+    encoder = MsgpackEncoder()
+    extras = {MSG_ECHO: MsgEcho, MSG_ECHO_REPLY: MsgEchoReply, MSG_BLOB: MsgBlob}
+
+    loop: asyncio.AbstractEventLoop
+    server: RecordingNetworkManager
+    client: RecordingNetworkManager
+    options: dict = dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def transport(cls):
+        params = TransportParameters(
+            cls.encoder, cls.transport_cls, None, cls.middlewares
+        )
+        return {"client": {"server": params}}
+
+    @classmethod
+    def create(cls, **kwargs):
+        def raise_err(name, msg):
+            raise RuntimeError(f"{name} disconnected: {msg}")
+
+        loop = asyncio.new_event_loop()
+        common = dict(
+            transport_type=EverywhereTransportManager,
+            extras=cls.extras,
+            loop=loop,
+            add_signal_handlers=False,
+            **kwargs,
+        )
+        server = RecordingNetworkManager.create_root(
+            transport_params=("server", cls.transport()),
+            motd="An example asyncio host",
+            **common,
+        )
+        client = RecordingNetworkManager.create_root(
+            transport_params=("client", cls.transport()), **common
+        )
+        server.listen(MNEvents.DISCONNECT, functools.partial(raise_err, "server"))
+        client.listen(MNEvents.DISCONNECT, functools.partial(raise_err, "client"))
+        return cls(loop, server, client, common)
+
+    @property
+    def server_transport(self):
+        return self.server.transport.transports["client"]
+
+    @property
+    def client_transport(self):
+        return self.client.transport.transports["server"]
+
+    def server_args(self) -> tuple:
+        return "127.0.0.1", 0
+
+    async def client_args(self) -> tuple:
+        await wait_until(lambda: self.server_transport.servers)
+        return "127.0.0.1", self.server_transport.servers[0].sockets[0].getsockname()[1]
+
+    async def add_client(self):
+        client = RecordingNetworkManager.create_root(
+            transport_params=("client", self.transport()), **self.options
+        )
+        NetworkManager.open_connection(client, server=await self.client_args())
+        await wait_until(
+            lambda: client.get_handle("server")
+            and client.get_handle("server").activated
+        )
+        return client
+
+    def close_servers(self):
+        for server in self.server_transport.servers:
+            server.close()
+
+    async def connect(self):
+        # The blocking wrappers of AsyncIONetworkManager would run the loop forever
+        NetworkManager.open_server(self.server, client=self.server_args())
+        NetworkManager.open_connection(self.client, server=await self.client_args())
+        await wait_until(
+            lambda: self.server.get_handle("client")
+            and self.client.get_handle("server")
+        )
+        await wait_until(lambda: self.server.get_handle("client").activated)
+
+    def run(self, scenario):
+        async def wrapper():
+            await self.connect()
+            try:
+                await scenario()
+            finally:
+                self.server.transport.shutdown_connections()
+                self.client.transport.shutdown_connections()
+                self.close_servers()
+                await asyncio.sleep(0.01)
+
+        try:
+            self.loop.run_until_complete(wrapper())
+        finally:
+            self.loop.close()
@@ -0,0 +1,47 @@
+import dataclasses
+
+from magicnet.batteries.middlewares.message_validation import MessageValidatorMiddleware
+from magicnet.core.net_globals import MNEvents
+from magicnet.core.net_message import NetMessage
+from magicnet.core.transport_handler import TransportMiddleware
+from transport_layer.asyncio_tester import MSG_ECHO, AsyncIONetworkTester, wait_until
+
+
+@dataclasses.dataclass
+class OddFilterMiddleware(TransportMiddleware):
+    batches: list[int] = dataclasses.field(default_factory=list)
+
+    def __post_init__(self):
+        self.listen(MNEvents.BEFORE_LAUNCH, self.do_before_launch)
+
+    def do_before_launch(self):
+        self.add_batch_message_operator(None, self.filter_odd)
+
+    def filter_odd(self, messages, handle):
+        echoes = [m for m in messages if m.message_type == MSG_ECHO]
+        if echoes:
+            self.batches.append(len(echoes))
+        return [
+            m for m in messages if m.message_type != MSG_ECHO or m.parameters[0] % 2
+        ]
+
+
+class BatchTester(AsyncIONetworkTester):
+    # The validator is adapted to the batch operators, and runs before the filter
+    middlewares = [OddFilterMiddleware, MessageValidatorMiddleware]
+
+
+def test_batch_operator():
+    tester = BatchTester.create()
+
+    async def scenario():
+        with tester.client.transport.message_queue:
+            for i in range(10):
+                tester.client.send_message(NetMessage(MSG_ECHO, (i,)))
+        await wait_until(lambda: len(tester.client.received) == 5)
+        assert tester.server.received == [1, 3, 5, 7, 9]
+        children = tester.server_transport.children.values()
+        middleware = next(c for c in children if isinstance(c, OddFilterMiddleware))
+        assert middleware.batches == [10]
+
+    tester.run(scenario)
@@ -0,0 +1,50 @@
+import asyncio
+
+from magicnet.core.net_globals import MNEvents
+from transport_layer.asyncio_tester import AsyncIONetworkTester, wait_until
+
+
+def test_heartbeat_rtt():
+    tester = AsyncIONetworkTester.create(heartbeat_interval=0.01)
+
+    async def scenario():
+        server_handle = tester.server.get_handle("client")
+        client_handle = tester.client.get_handle("server")
+        await wait_until(lambda: server_handle.rtt and client_handle.rtt)
+        assert 0 < server_handle.rtt < 1
+        assert server_handle.rtt_jitter >= 0
+
+    tester.run(scenario)
+
+
+def test_heartbeat_idle_timeout():
+    tester = AsyncIONetworkTester.create(heartbeat_interval=0.01, idle_timeout=0.1)
+    destroyed = []
+    tester.server.listen(MNEvents.HANDLES_DESTROYED, destroyed.extend)
+
+    async def scenario():
+        server_handle = tester.server.get_handle("client")
+        # The client keeps answering the pings, but the server no longer sees them
+        server_handle.connection_data.transport.pause_reading()
+        await wait_until(lambda: server_handle.destroyed)
+        assert destroyed == [server_handle]
+
+    tester.run(scenario)
+
+
+def test_heartbeat_idle_before_handshake():
+    tester = AsyncIONetworkTester.create(heartbeat_interval=0.01, idle_timeout=0.1)
+    destroyed = []
+    tester.server.listen(MNEvents.HANDLES_DESTROYED, destroyed.extend)
+
+    async def scenario():
+        # Connects, but never sends HELLO
+        _, writer = await asyncio.open_connection(*await tester.client_args())
+        transport = tester.server_transport
+        await wait_until(lambda: len(transport.connections) == 2)
+        silent = next(h for h in transport.connections.values() if not h.activated)
+        await wait_until(lambda: silent.destroyed)
+        assert destroyed == [silent]
+        writer.close()
+
+    tester.run(scenario)
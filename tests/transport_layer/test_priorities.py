@@ -0,0 +1,71 @@
+from magicnet.batteries.transports.socket_asyncio import AsyncIOSocketTransport
+from magicnet.core.net_globals import MessagePriority
+from magicnet.core.net_message import NetMessage
+from transport_layer.asyncio_tester import (
+    MSG_ECHO_REPLY,
+    AsyncIONetworkTester,
+    wait_until,
+)
+
+
+def send_batch(manager, messages):
+    with manager.transport.message_queue:
+        for value, priority, key in messages:
+            message = NetMessage(MSG_ECHO_REPLY, (value,), priority=priority)
+            message.ordering_key = key
+            manager.send_message(message)
+
+
+def test_priority_order():
+    tester = AsyncIONetworkTester.create()
+
+    async def scenario():
+        bulk = [(i, MessagePriority.BULK, None) for i in range(10)]
+        high = [(i, MessagePriority.HIGH, None) for i in range(100, 105)]
+        normal = [(i, MessagePriority.NORMAL, None) for i in range(200, 205)]
+        send_batch(tester.client, bulk + normal + high)
+        await wait_until(lambda: len(tester.server.received) == 20)
+        assert tester.server.received == [x[0] for x in high + normal + bulk]
+
+    tester.run(scenario)
+
+
+def test_priority_ordering_key():
+    tester = AsyncIONetworkTester.create()
+
+    async def scenario():
+        send_batch(
+            tester.client,
+            [
+                (1, MessagePriority.BULK, "a"),
+                (2, MessagePriority.BULK, "b"),
+                (3, MessagePriority.HIGH, "a"),
+                (4, MessagePriority.HIGH, "c"),
+            ],
+        )
+        await wait_until(lambda: len(tester.server.received) == 4)
+        # 3 cannot overtake 1, as they share the key
+        assert tester.server.received == [4, 1, 2, 3]
+
+    tester.run(scenario)
+
+
+def test_flush_budget():
+    class BudgetTransport(AsyncIOSocketTransport):
+        flush_budget = 10
+
+    class BudgetTester(AsyncIONetworkTester):
+        transport_cls = BudgetTransport
+
+    tester = BudgetTester.create()
+
+    async def scenario():
+        bulk = [(i, MessagePriority.BULK, None) for i in range(25)]
+        high = [(i, MessagePriority.HIGH, None) for i in range(100, 105)]
+        send_batch(tester.client, bulk + high)
+        await wait_until(lambda: len(tester.server.received) == 30)
+        received = tester.server.received
+        assert received[:5] == list(range(100, 105))
+        assert received[5:] == list(range(25))
+
+    tester.run(scenario)
@@ -0,0 +1,65 @@
+from magicnet.batteries.middlewares.message_validation import MessageValidatorMiddleware
+from magicnet.batteries.middlewares.rate_limiting import (
+    RateLimit,
+    RateLimitAction,
+    RateLimitMiddleware,
+)
+from magicnet.core.net_message import NetMessage
+from transport_layer.asyncio_tester import MSG_ECHO, AsyncIONetworkTester, wait_until
+
+
+def create_tester(limit: RateLimit):
+    class Limiter(RateLimitMiddleware):
+        limits = {MSG_ECHO: limit}
+
+    class LimitedTester(AsyncIONetworkTester):
+        middlewares = [Limiter, MessageValidatorMiddleware]
+
+    return LimitedTester.create()
+
+
+def send_echoes(manager, count: int):
+    with manager.transport.message_queue:
+        for i in range(count):
+            manager.send_message(NetMessage(MSG_ECHO, (i,)))
+
+
+def test_rate_limit_drop():
+    tester = create_tester(RateLimit(rate=0.001, burst=3))
+
+    async def scenario():
+        send_echoes(tester.client, 10)
+        await wait_until(lambda: len(tester.client.received) == 3)
+        assert tester.server.received == [0, 1, 2]
+
+    tester.run(scenario)
+
+
+def test_rate_limit_defer():
+    tester = create_tester(RateLimit(rate=200, burst=2, action=RateLimitAction.DEFER))
+
+    async def scenario():
+        send_echoes(tester.client, 8)
+        await wait_until(lambda: len(tester.server.received) == 2)
+        assert tester.server.received == [0, 1]
+        await wait_until(lambda: len(tester.server.received) == 8)
+        assert tester.server.received == list(range(8))
+
+    tester.run(scenario)
+
+
+def test_rate_limit_disconnect():
+    tester = create_tester(
+        RateLimit(rate=0.001, burst=2, action=RateLimitAction.DISCONNECT)
+    )
+
+    async def scenario():
+        children = tester.server_transport.children.values()
+        limiter = next(c for c in children if isinstance(c, RateLimitMiddleware))
+        send_echoes(tester.client, 5)
+        await wait_until(lambda: tester.server.get_handle("client") is None)
+        assert tester.server.received == [0, 1]
+        # The slot will be reused by the next handle
+        assert not limiter.slots and limiter.free_slots == [0]
+
+    tester.run(scenario)
@@ -0,0 +1,75 @@
+import pytest
+
+from magicnet.batteries.encoders import MsgpackEncoder
+from magicnet.batteries.transport_managers import Route, RoutingTableTransportManager
+from magicnet.batteries.transports.single_app import SingleAppTransport
+from magicnet.core import errors
+from magicnet.core.connection import ConnectionHandle
+from magicnet.core.net_message import NetMessage
+from magicnet.core.network_manager import NetworkManager
+from magicnet.core.transport_manager import TransportParameters
+
+MSG_CHAT = 64
+MSG_PERSIST = 65
+MSG_AUDIT = 66
+MSG_OTHER = 67
+
+params = TransportParameters(MsgpackEncoder(), SingleAppTransport)
+matrix = {"server": {"client": params, "database": params}}
+
+
+class ServerTransportManager(RoutingTableTransportManager):
+    routing_table = [
+        Route([MSG_CHAT], ["client"]),
+        Route([MSG_PERSIST, MSG_CHAT], ["database"]),
+        Route([MSG_AUDIT], ["database"], predicate=lambda data: data == "audit"),
+    ]
+
+
+def create_server(transport_type):
+    return NetworkManager.create_root(
+        transport_type=transport_type, transport_params=("server", matrix)
+    )
+
+
+def test_routing_table():
+    transport = create_server(ServerTransportManager).transport
+    resolve = transport.resolve_destination
+    assert resolve(NetMessage(MSG_CHAT)) == {"client", "database"}
+    assert resolve(NetMessage(MSG_PERSIST)) == {"database"}
+    assert resolve(NetMessage(MSG_AUDIT, routing_data="audit")) == {"database"}
+    assert resolve(NetMessage(MSG_AUDIT, routing_data="other")) == set()
+    assert set(resolve(NetMessage(MSG_OTHER))) == {"client", "database"}
+
+    # Explicit destinations skip the table
+    handle = ConnectionHandle(transport.transports["client"], None)
+    message = NetMessage(MSG_PERSIST, destination=handle)
+    assert list(resolve(message)) == ["client"]
+
+
+def test_routing_table_default_roles():
+    class ClientOnlyTransportManager(ServerTransportManager):
+        default_roles = ["client"]
+
+    transport = create_server(ClientOnlyTransportManager).transport
+    assert transport.resolve_destination(NetMessage(MSG_OTHER)) == {"client"}
+
+
+def test_routing_table_unknown_role():
+    class BrokenTransportManager(RoutingTableTransportManager):
+        routing_table = [Route([MSG_CHAT], ["nonexistent"])]
+
+    with pytest.raises(errors.UnknownRole):
+        create_server(BrokenTransportManager)
+
+
+def test_routing_table_direct_construction():
+    manager = create_server(ServerTransportManager)
+    transport = ServerTransportManager(
+        role="server", transports=dict(manager.transport.transports), _parent=manager
+    )
+    assert transport.resolve_destination(NetMessage(MSG_PERSIST)) == {"database"}
+    assert set(transport.resolve_destination(NetMessage(MSG_OTHER))) == {
+        "client",
+        "database",
+    }
@@ -0,0 +1,94 @@
+import socket
+
+from magicnet.batteries.transports.shared_memory import (
+    SharedMemoryTransport,
+    SharedRing,
+)
+from magicnet.core.net_message import NetMessage
+from transport_layer.asyncio_tester import (
+    MSG_BLOB,
+    MSG_ECHO,
+    AsyncIONetworkTester,
+    wait_until,
+)
+
+
+def make_tester(tmp_path, transport):
+    class SharedMemoryTester(AsyncIONetworkTester):
+        transport_cls = transport
+
+        def server_args(self) -> tuple:
+            return (str(tmp_path / "magicnet.sock"),)
+
+        async def client_args(self) -> tuple:
+            await wait_until(lambda: self.server_transport.servers)
+            return self.server_args()
+
+    return SharedMemoryTester.create()
+
+
+def test_ring_wraparound():
+    ring = SharedRing.create(64)
+    try:
+        received = []
+        for i in range(100):
+            assert ring.write(bytes([i]) * (i % 20))
+            records, tail = ring.read()
+            received.extend(bytes(record) for record in records)
+            for record in records:
+                record.release()
+            ring.consume(tail)
+        assert received == [bytes([i]) * (i % 20) for i in range(100)]
+    finally:
+        ring.close()
+
+
+def test_ring_full():
+    ring = SharedRing.create(64)
+    try:
+        assert ring.write(b"x" * 20)
+        assert ring.write(b"x" * 20)
+        assert not ring.write(b"x" * 20)
+        records, tail = ring.read()
+        assert [len(record) for record in records] == [20, 20]
+        for record in records:
+            record.release()
+        ring.consume(tail)
+        assert ring.write(b"x" * 20)
+    finally:
+        ring.close()
+
+
+def test_shared_memory_roundtrip(tmp_path):
+    # A socket left behind by a server that was killed
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(tmp_path / "magicnet.sock"))
+    stale.close()
+    tester = make_tester(tmp_path, SharedMemoryTransport)
+
+    async def scenario():
+        for i in range(1000):
+            tester.client.send_message(NetMessage(MSG_ECHO, (i,)))
+        await wait_until(lambda: len(tester.client.received) == 1000)
+        assert tester.server.received == list(range(1000))
+        assert tester.client.received == list(range(1000))
+
+    tester.run(scenario)
+    assert not (tmp_path / "magicnet.sock").exists()
+
+
+def test_shared_memory_full_ring(tmp_path):
+    class SmallRingTransport(SharedMemoryTransport):
+        max_datagram_size = 1 << 10
+        ring_size = 1 << 12
+
+    tester = make_tester(tmp_path, SmallRingTransport)
+
+    async def scenario():
+        # Much more than the ring can hold at once
+        for i in range(200):
+            tester.client.transport.send(NetMessage(MSG_BLOB, (b"x" * 500,)))
+        await wait_until(lambda: len(tester.server.received) == 200)
+        assert tester.server.received == [500] * 200
+
+    tester.run(scenario)
@@ -0,0 +1,399 @@
+import asyncio
+import socket
+
+from magicnet.batteries.transports.framing import FRAME_HEADER_SIZE, MAX_BUFFER_SIZE
+from magicnet.batteries.transports.socket_asyncio import (
+    AsyncIOSocketTransport,
+    AsyncIOUnixSocketTransport,
+)
+from magicnet.core.net_globals import DeliveryMode, MNEvents, SlowConsumerPolicy
+from magicnet.core.net_message import NetMessage
+from magicnet.core.transport_manager import FlushPolicy
+from transport_layer.asyncio_tester import (
+    MSG_BLOB,
+    MSG_ECHO,
+    AsyncIONetworkTester,
+    wait_until,
+)
+
+
+def test_tcp_roundtrip():
+    tester = AsyncIONetworkTester.create()
+
+    async def scenario():
+        for i in range(1000):
+            tester.client.send_message(NetMessage(MSG_ECHO, (i,)))
+        await wait_until(lambda: len(tester.client.received) == 1000)
+        assert tester.server.received == list(range(1000))
+        assert tester.client.received == list(range(1000))
+
+    tester.run(scenario)
+
+
+def test_tcp_batched_frames():
+    tester = AsyncIONetworkTester.create()
+    sent = []
+
+    def split_frames(original):
+        def wrapper():
+            frames = original()
+            sent.append(len(frames))
+            return frames
+
+        return wrapper
+
+    async def scenario():
+        protocol = tester.server.get_handle("client").connection_data
+        protocol.split_frames = split_frames(protocol.split_frames)
+        # Each message is a separate frame, and those are split across many reads
+        for i in range(20000):
+            tester.client.transport.send(NetMessage(MSG_ECHO, (i,)))
+        await wait_until(lambda: len(tester.client.received) == 20000)
+        assert tester.server.received == list(range(20000))
+        # Frames that arrived in the same read were processed as a batch
+        assert len(sent) < 20000
+
+    tester.run(scenario)
+
+
+def test_tcp_receive_buffer_grows():
+    tester = AsyncIONetworkTester.create()
+
+    async def scenario():
+        protocol = tester.server.get_handle("client").connection_data
+        assert len(protocol.buffer) == AsyncIOSocketTransport.receive_buffer_size
+        for i in range(100):
+            tester.client.send_message(NetMessage(MSG_ECHO, (i,)))
+        await wait_until(lambda: len(tester.client.received) == 100)
+        # Small frames are read without growing the buffer
+        assert len(protocol.buffer) == AsyncIOSocketTransport.receive_buffer_size
+        for size in (10000, 60000, 20000):
+            tester.client.send_message(NetMessage(MSG_BLOB, (b"x" * size,)))
+        await wait_until(lambda: len(tester.server.received) == 103)
+        assert tester.server.received[100:] == [10000, 60000, 20000]
+        assert 60000 < len(protocol.buffer) <= MAX_BUFFER_SIZE
+
+    tester.run(scenario)
+
+
+def test_tcp_coalesced_writes():
+    tester = AsyncIONetworkTester.create()
+    calls = []
+
+    async def scenario():
+        protocol = tester.client.get_handle("server").connection_data
+        original = protocol.transport.write
+
+        def write(data):
+            calls.append(len(data))
+            original(data)
+
+        protocol.transport.write = write
+        for i in range(100):
+            tester.client.transport.send(NetMessage(MSG_ECHO, (i,)))
+        await wait_until(lambda: len(tester.client.received) == 100)
+        # 100 datagrams, each is a header and a body, all in a single write
+        assert len(calls) == 1
+        assert calls[0] > 100 * FRAME_HEADER_SIZE
+
+    tester.run(scenario)
+
+
+def test_tcp_backpressure():
+    class SmallBufferTransport(AsyncIOSocketTransport):
+        write_high_water = 1 << 14
+        write_low_water = 1 << 12
+
+    class BackpressureTester(AsyncIONetworkTester):
+        transport_cls = SmallBufferTransport
+
+    tester = BackpressureTester.create()
+    events = []
+    tester.client.listen(
+        MNEvents.HANDLE_WRITE_PAUSED, lambda h: events.append("paused")
+    )
+    tester.client.listen(
+        MNEvents.HANDLE_WRITE_RESUMED, lambda h: events.append("resumed")
+    )
+
+    async def scenario():
+        handle = tester.client.get_handle("server")
+        server_protocol = tester.server.get_handle("client").connection_data
+        server_protocol.transport.pause_reading()
+        blob = b"x" * 60000
+        # Enough data to fill both kernel socket buffers
+        for _ in range(200):
+            tester.client.send_message(NetMessage(MSG_BLOB, (blob,)))
+        await wait_until(lambda: handle.write_paused)
+        server_protocol.transport.resume_reading()
+        await wait_until(lambda: len(tester.server.received) == 200, timeout=20)
+        await wait_until(lambda: not handle.write_paused)
+        assert events[0] == "paused" and events[-1] == "resumed"
+
+    tester.run(scenario)
+
+
+def test_unix_roundtrip(tmp_path):
+    path = tmp_path / "magicnet.sock"
+    # A socket left behind by a server that was killed
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+
+    class UnixTester(AsyncIONetworkTester):
+        transport_cls = AsyncIOUnixSocketTransport
+
+        def server_args(self) -> tuple:
+            return (str(path),)
+
+        async def client_args(self) -> tuple:
+            await wait_until(lambda: self.server_transport.servers)
+            return self.server_args()
+
+    tester = UnixTester.create()
+
+    async def scenario():
+        for i in range(1000):
+            tester.client.send_message(NetMessage(MSG_ECHO, (i,)))
+        await wait_until(lambda: len(tester.client.received) == 1000)
+        assert tester.server.received == list(range(1000))
+        assert tester.client.received == list(range(1000))
+
+    tester.run(scenario)
+    assert not path.exists()
+
+
+def count_datagrams(transport):
+    sent = []
+    original = transport.send
+
+    def send(handle, datagram):
+        sent.append(len(datagram))
+        original(handle, datagram)
+
+    transport.send = send
+    return sent
+
+
+def test_flush_policy_delay():
+    tester = AsyncIONetworkTester.create(flush_policy=FlushPolicy(max_delay=0.01))
+
+    async def scenario():
+        sent = count_datagrams(tester.client_transport)
+        for i in range(100):
+            tester.client.send_message(NetMessage(MSG_ECHO, (i,)))
+        # Nothing is delivered until the delay passes
+        assert not sent
+        await wait_until(lambda: len(tester.client.received) == 100)
+        assert len(sent) == 1
+        assert tester.server.received == list(range(100))
+
+    tester.run(scenario)
+
+
+def test_flush_policy_batch_size():
+    tester = AsyncIONetworkTester.create(
+        flush_policy=FlushPolicy(max_delay=10, max_batch=10)
+    )
+
+    async def scenario():
+        sent = count_datagrams(tester.client_transport)
+        for i in range(105):
+            tester.client.send_message(NetMessage(MSG_ECHO, (i,)))
+        assert len(sent) == 10
+        tester.client.transport.flush()
+        assert len(sent) == 11
+        await wait_until(lambda: len(tester.client.received) == 105)
+
+    tester.run(scenario)
+
+
+def test_flush_policy_stale_timer():
+    tester = AsyncIONetworkTester.create(
+        flush_policy=FlushPolicy(max_delay=0.1, max_batch=10)
+    )
+
+    async def scenario():
+        sent = count_datagrams(tester.client_transport)
+        # The batch is full before its timer runs out
+        for i in range(10):
+            tester.client.send_message(NetMessage(MSG_ECHO, (i,)))
+        assert len(sent) == 1
+        await asyncio.sleep(0.06)
+        tester.client.send_message(NetMessage(MSG_ECHO, (10,)))
+        # The timer of the first batch does not flush the second one
+        await asyncio.sleep(0.06)
+        assert len(sent) == 1
+        await wait_until(lambda: len(sent) == 2)
+        await wait_until(lambda: len(tester.client.received) == 11)
+
+    tester.run(scenario)
+
+
+def test_flush_empty_queue():
+    tester = AsyncIONetworkTester.create(
+        flush_policy=FlushPolicy(max_delay=0.05)
+    )
+    flushes = []
+    tester.client.listen(MNEvents.BEFORE_FLUSH, lambda: flushes.append(1))
+
+    async def scenario():
+        transport = tester.client.transport
+        flushes.clear()
+        generation = transport.flush_generation
+        # Nothing is queued, so nothing happens
+        with transport.message_queue:
+            pass
+        transport.flush()
+        assert not flushes and transport.flush_generation == generation
+        tester.client.send_message(NetMessage(MSG_ECHO, (1,)))
+        transport.flush()
+        assert flushes == [1] and transport.flush_generation == generation + 1
+        await wait_until(lambda: tester.client.received == [1])
+
+    tester.run(scenario)
+
+
+def test_mass_disconnect():
+    tester = AsyncIONetworkTester.create()
+    batches = []
+    tester.server.listen(
+        MNEvents.HANDLES_DESTROYED, lambda handles: batches.append(len(handles))
+    )
+
+    async def scenario():
+        clients = [await tester.add_client() for _ in range(20)]
+        server_transport = tester.server_transport
+        await wait_until(lambda: len(server_transport.connections) == 21)
+        for client in clients:
+            client.get_handle("server").connection_data.transport.abort()
+        await wait_until(lambda: sum(batches) == 20)
+        # Connections lost in the same loop iteration are torn down together
+        assert len(batches) < 20
+
+        for _ in range(5):
+            await tester.add_client()
+        await wait_until(lambda: len(server_transport.connections) == 6)
+        handle = next(iter(server_transport.connections.values()))
+        server_transport.destroy_handle(handle)
+        assert batches[-1] == 1 and handle.destroyed
+        server_transport.shutdown()
+        assert batches[-1] == 5
+        assert not server_transport.connections
+
+    tester.run(scenario)
+
+
+def create_capped_tester(policy: SlowConsumerPolicy, max_held: int = 4096):
+    class CappedTransport(AsyncIOSocketTransport):
+        max_outbound_bytes = 1 << 20
+        slow_consumer_policy = policy
+        max_held_messages = max_held
+        # The cap should be reached before the asyncio flow control kicks in
+        write_high_water = 1 << 24
+
+    class CappedTester(AsyncIONetworkTester):
+        transport_cls = CappedTransport
+
+    return CappedTester.create()
+
+
+def send_blobs(tester, count: int, delivery=DeliveryMode.RELIABLE_ORDERED):
+    handle = tester.server.get_handle("client")
+    for _ in range(count):
+        message = NetMessage(MSG_BLOB, (b"x" * 60000,), destination=handle)
+        message.delivery = delivery
+        tester.server.send_message(message)
+
+
+def test_slow_consumer_disconnect():
+    tester = create_capped_tester(SlowConsumerPolicy.DISCONNECT)
+
+    async def scenario():
+        handle = tester.server.get_handle("client")
+        tester.client.get_handle("server").connection_data.transport.pause_reading()
+        send_blobs(tester, 30)
+        assert handle.destroyed
+        assert tester.server.get_handle("client") is None
+
+    tester.run(scenario)
+
+
+def test_slow_consumer_drop_coalescible():
+    tester = create_capped_tester(SlowConsumerPolicy.DROP_COALESCIBLE)
+
+    async def scenario():
+        handle = tester.server.get_handle("client")
+        client_protocol = tester.client.get_handle("server").connection_data
+        client_protocol.transport.pause_reading()
+        send_blobs(tester, 20)
+        send_blobs(tester, 5, DeliveryMode.UNRELIABLE)
+        send_blobs(tester, 1)
+        metrics = tester.server_transport.get_outbound_metrics()
+        assert metrics[handle.handle_id] == handle.queued_bytes > 1 << 20
+        client_protocol.transport.resume_reading()
+        await wait_until(lambda: len(tester.client.received) == 21)
+        await wait_until(lambda: handle.queued_bytes == 0)
+        await asyncio.sleep(0.05)
+        assert len(tester.client.received) == 21
+
+    tester.run(scenario)
+
+
+def test_slow_consumer_pause():
+    tester = create_capped_tester(SlowConsumerPolicy.PAUSE_PRODUCER)
+    events = []
+    tester.server.listen(
+        MNEvents.HANDLE_WRITE_PAUSED, lambda h: events.append("paused")
+    )
+    tester.server.listen(
+        MNEvents.HANDLE_WRITE_RESUMED, lambda h: events.append("resumed")
+    )
+
+    async def scenario():
+        handle = tester.server.get_handle("client")
+        client_protocol = tester.client.get_handle("server").connection_data
+        client_protocol.transport.pause_reading()
+        send_blobs(tester, 20)
+        assert handle.write_paused
+        # The messages above the cap are held by the transport
+        held = tester.server_transport.deferred_messages[handle.handle_id]
+        assert len(held) == 2
+        assert handle.queued_bytes < (1 << 20) + 70000
+        client_protocol.transport.resume_reading()
+        await wait_until(lambda: not handle.write_paused)
+        await wait_until(lambda: len(tester.client.received) == 20)
+        assert events == ["paused", "resumed"]
+
+    tester.run(scenario)
+
+
+def test_slow_consumer_pause_limit():
+    tester = create_capped_tester(SlowConsumerPolicy.PAUSE_PRODUCER, max_held=5)
+
+    async def scenario():
+        handle = tester.server.get_handle("client")
+        tester.client.get_handle("server").connection_data.transport.pause_reading()
+        send_blobs(tester, 20)
+        assert handle.write_paused and not handle.destroyed
+        send_blobs(tester, 10)
+        assert handle.destroyed
+
+    tester.run(scenario)
+
+
+def test_slow_consumer_pause_flow_control():
+    tester = create_capped_tester(SlowConsumerPolicy.PAUSE_PRODUCER)
+
+    async def scenario():
+        handle = tester.server.get_handle("client")
+        protocol = handle.connection_data
+        tester.client.get_handle("server").connection_data.transport.pause_reading()
+        send_blobs(tester, 20)
+        # The socket draining does not resume the handle paused by the policy
+        protocol.pause_writing()
+        protocol.resume_writing()
+        assert handle.write_paused
+        assert tester.server_transport.deferred_messages[handle.handle_id]
+
+    tester.run(scenario)
@@ -0,0 +1,147 @@
+import dataclasses
+import time
+
+from magicnet.batteries.encoders import MsgpackEncoder
+from magicnet.batteries.middlewares.message_validation import MessageValidatorMiddleware
+from magicnet.batteries.selector_network_manager import SelectorNetworkManager
+from magicnet.batteries.transport_managers import EverywhereTransportManager
+from magicnet.batteries.transports.socket_selector import SelectorSocketTransport
+from magicnet.core.net_message import NetMessage
+from magicnet.core.transport_manager import FlushPolicy, TransportParameters
+from transport_layer.asyncio_tester import (
+    MSG_BLOB,
+    MSG_ECHO,
+    MSG_ECHO_REPLY,
+    MsgBlob,
+    MsgEcho,
+    MsgEchoReply,
+)
+
+
+@dataclasses.dataclass(kw_only=True)
+class RecordingSelectorManager(SelectorNetworkManager):
+    received: list[int] = dataclasses.field(default_factory=list)
+
+
+def create_pair(transport_cls=SelectorSocketTransport, **kwargs):
+    params = TransportParameters(
+        MsgpackEncoder(), transport_cls, None, [MessageValidatorMiddleware]
+    )
+    common = dict(
+        transport_type=EverywhereTransportManager,
+        extras={MSG_ECHO: MsgEcho, MSG_ECHO_REPLY: MsgEchoReply, MSG_BLOB: MsgBlob},
+        **kwargs,
+    )
+    server = RecordingSelectorManager.create_root(
+        transport_params=("server", {"client": {"server": params}}), **common
+    )
+    client = RecordingSelectorManager.create_root(
+        transport_params=("client", {"client": {"server": params}}), **common
+    )
+    server.open_server(client=("127.0.0.1", 0))
+    port = server.transport.transports["client"].servers[0].getsockname()[1]
+    client.open_connection(server=("127.0.0.1", port))
+    poll_until(
+        [server, client],
+        lambda: server.get_handle("client") and server.get_handle("client").activated,
+    )
+    return server, client
+
+
+def poll_until(managers, predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Condition was not reached in time")
+        for manager in managers:
+            manager.poll(0.001)
+
+
+def close_pair(server, client):
+    client.transport.shutdown_connections()
+    server.transport.shutdown_connections()
+    server.transport.transports["client"].close_servers()
+
+
+def test_selector_roundtrip():
+    server, client = create_pair()
+    try:
+        for i in range(1000):
+            client.send_message(NetMessage(MSG_ECHO, (i,)))
+        poll_until([server, client], lambda: len(client.received) == 1000)
+        assert server.received == list(range(1000))
+        assert client.received == list(range(1000))
+    finally:
+        close_pair(server, client)
+
+
+def test_selector_batched_writes():
+    server, client = create_pair()
+    sent = []
+    connection = client.get_handle("server").connection_data
+    sock = connection.sock
+    try:
+        original = sock.send
+
+        class RecordingSocket:
+            def send(self, data):
+                sent.append(len(data))
+                return original(data)
+
+            def __getattr__(self, item):
+                return getattr(sock, item)
+
+        connection.sock = RecordingSocket()
+        with client.transport.message_queue:
+            for i in range(100):
+                client.transport.send(NetMessage(MSG_ECHO, (i,)))
+        # Nothing is written until the end of the poll
+        assert not sent
+        poll_until([server, client], lambda: len(client.received) == 100)
+        assert len(sent) == 1
+    finally:
+        # The selector only knows the real socket
+        connection.sock = sock
+        close_pair(server, client)
+
+
+def test_selector_partial_writes():
+    class SmallBufferTransport(SelectorSocketTransport):
+        write_high_water = 1 << 14
+        write_low_water = 1 << 12
+
+    server, client = create_pair(SmallBufferTransport)
+    try:
+        handle = client.get_handle("server")
+        for i in range(200):
+            client.transport.send(NetMessage(MSG_BLOB, (b"x" * 30000,)))
+        assert handle.write_paused
+        poll_until([server, client], lambda: len(server.received) == 200)
+        assert not handle.write_paused
+        assert server.received == [30000] * 200
+    finally:
+        close_pair(server, client)
+
+
+def test_selector_flush_policy():
+    server, client = create_pair(flush_policy=FlushPolicy())
+    try:
+        connection = client.get_handle("server").connection_data
+        for i in range(10):
+            client.send_message(NetMessage(MSG_ECHO, (i,)))
+        assert not connection.outbound
+        # The queue is delivered by the timer at the next poll
+        poll_until([server, client], lambda: len(client.received) == 10)
+        assert server.received == list(range(10))
+    finally:
+        close_pair(server, client)
+
+
+def test_selector_shutdown():
+    server, client = create_pair()
+    listening = server.transport.transports["client"].servers[0]
+    connection = server.get_handle("client").connection_data
+    client.shutdown()
+    server.shutdown()
+    assert listening.fileno() == -1 and connection.sock.fileno() == -1
+    assert server.selector.get_map() is None and client.selector.get_map() is None
@@ -0,0 +1,92 @@
+import time
+
+from magicnet.util.timer_wheel import TimerWheel
+from transport_layer.asyncio_tester import AsyncIONetworkTester, wait_until
+
+
+def test_timer_wheel_order():
+    wheel = TimerWheel(0.0, resolution=0.01, slot_count=8)
+    fired = []
+    for delay in (0.5, 0.05, 0.2, 0.0, 0.08):
+        wheel.schedule(delay, lambda delay=delay: fired.append(delay), now=0.0)
+    assert len(wheel) == 5
+    # Zero delay still waits for the next tick
+    assert wheel.advance(0.0) == 0
+    wheel.advance(0.1)
+    assert fired == [0.0, 0.05, 0.08]
+    # 0.2 and 0.5 are several rotations away, but share the slots with the others
+    wheel.advance(0.3)
+    assert fired == [0.0, 0.05, 0.08, 0.2]
+    wheel.advance(1.0)
+    assert fired == [0.0, 0.05, 0.08, 0.2, 0.5]
+    assert len(wheel) == 0
+
+
+def test_timer_wheel_cancel():
+    wheel = TimerWheel(0.0, resolution=0.01, slot_count=8)
+    fired = []
+    first = wheel.schedule(0.05, lambda: fired.append(1), now=0.0)
+    # A callback can cancel a timer due in the same tick
+    wheel.schedule(0.05, lambda: second.cancel(), now=0.0)
+    second = wheel.schedule(0.05, lambda: fired.append(2), now=0.0)
+    first.cancel()
+    assert len(wheel) == 2
+    wheel.advance(0.1)
+    assert fired == []
+    assert len(wheel) == 0
+
+
+def test_timer_wheel_next_tick():
+    wheel = TimerWheel(0.0, resolution=0.01, slot_count=8)
+    assert wheel.next_tick() is None
+    far = wheel.schedule(0.5, lambda: None, now=0.0)
+    # Several rotations away, the wheel does not have to be advanced before that
+    assert wheel.next_tick() == 50
+    assert abs(wheel.next_delay(0.0) - 0.5) < 1e-9
+    wheel.schedule(0.05, lambda: None, now=0.0)
+    assert wheel.next_tick() == 5
+    wheel.advance(0.06)
+    far.cancel()
+    assert wheel.next_tick() is None
+
+
+def test_manager_timers():
+    tester = AsyncIONetworkTester.create()
+    fired = []
+
+    async def scenario():
+        start = time.monotonic()
+        for i in range(1000):
+            tester.server.schedule_timer(0.02 + i % 3 * 0.01, lambda: fired.append(i))
+        cancelled = tester.server.schedule_timer(0.02, lambda: fired.append(-1))
+        cancelled.cancel()
+        await wait_until(lambda: len(fired) == 1000)
+        assert time.monotonic() - start >= 0.04
+        assert -1 not in fired
+        assert not tester.server.timer_wheel
+
+    tester.run(scenario)
+
+
+def test_manager_timer_wakeups():
+    tester = AsyncIONetworkTester.create()
+    fired = []
+    wakeups = []
+
+    async def scenario():
+        original = tester.server.run_timer_wheel
+
+        def run_timer_wheel(generation):
+            wakeups.append(generation)
+            original(generation)
+
+        tester.server.run_timer_wheel = run_timer_wheel
+        tester.server.schedule_timer(0.3, lambda: fired.append("late"))
+        # A nearer timer scheduled later still fires on time
+        tester.server.schedule_timer(0.05, lambda: fired.append("early"))
+        await wait_until(lambda: len(fired) == 2)
+        assert fired == ["early", "late"]
+        # Not once per 10ms tick
+        assert len(wakeups) < 10
+
+    tester.run(scenario)
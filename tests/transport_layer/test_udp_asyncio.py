@@ -0,0 +1,196 @@
+import asyncio
+
+import pytest
+
+from magicnet.batteries.transports.udp_asyncio import (
+    PACKET_HEADER,
+    AsyncIOUDPTransport,
+    PacketKind,
+)
+from magicnet.core import errors
+from magicnet.core.net_globals import DeliveryMode
+from magicnet.core.net_message import NetMessage
+from magicnet.util.typechecking.field_signature import FieldSignature
+from transport_layer.asyncio_tester import (
+    MSG_BLOB,
+    MSG_ECHO,
+    MSG_ECHO_REPLY,
+    AsyncIONetworkTester,
+    wait_until,
+)
+
+
+class LossyDatagramTransport:
+    """Drops every drop_every-th packet, and delays every delay_every-th one"""
+
+    def __init__(self, transport, loop, drop_every=5, delay_every=7):
+        self.transport = transport
+        self.loop = loop
+        self.drop_every = drop_every
+        self.delay_every = delay_every
+        self.count = 0
+
+    def sendto(self, data, addr=None):
+        self.count += 1
+        if self.count % self.drop_every == 0:
+            return
+        if self.count % self.delay_every == 0:
+            self.loop.call_later(0.02, self.transport.sendto, data, addr)
+            return
+        self.transport.sendto(data, addr)
+
+    def __getattr__(self, item):
+        return getattr(self.transport, item)
+
+
+class LossyUDPTransport(AsyncIOUDPTransport):
+    retransmit_timeout = 0.02
+
+    def wrap_endpoint_transport(self, transport):
+        return LossyDatagramTransport(transport, self.manager.loop)
+
+
+class UDPTester(AsyncIONetworkTester):
+    transport_cls = LossyUDPTransport
+
+    async def client_args(self) -> tuple:
+        await wait_until(lambda: self.server_transport.endpoints)
+        endpoint = self.server_transport.endpoints[0]
+        return "127.0.0.1", endpoint.transport.get_extra_info("sockname")[1]
+
+    def close_servers(self):
+        for endpoint in self.server_transport.endpoints:
+            endpoint.transport.close()
+
+
+class ChannelDroppingTransport:
+    """Drops the next data packet sent on drop_channel, once it is set"""
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.drop_channel = None
+
+    def sendto(self, data, addr=None):
+        kind, _, _, channel, _ = PACKET_HEADER.unpack_from(data)
+        if kind == PacketKind.DATA and channel == self.drop_channel:
+            self.drop_channel = None
+            return
+        self.transport.sendto(data, addr)
+
+    def __getattr__(self, item):
+        return getattr(self.transport, item)
+
+
+class ChannelDroppingUDPTransport(AsyncIOUDPTransport):
+    retransmit_timeout = 0.5
+
+    def wrap_endpoint_transport(self, transport):
+        return ChannelDroppingTransport(transport)
+
+
+class ChannelDroppingTester(UDPTester):
+    transport_cls = ChannelDroppingUDPTransport
+
+
+def test_udp_reliable_over_lossy_link():
+    tester = UDPTester.create()
+
+    async def scenario():
+        for i in range(500):
+            tester.client.send_message(NetMessage(MSG_ECHO, (i,)))
+            if i % 10 == 0:
+                await asyncio.sleep(0)
+        await wait_until(lambda: len(tester.client.received) == 500)
+        assert tester.server.received == list(range(500))
+        assert tester.client.received == list(range(500))
+
+    tester.run(scenario)
+
+
+def test_udp_fragmented_message():
+    tester = UDPTester.create()
+
+    async def scenario():
+        tester.client.send_message(NetMessage(MSG_BLOB, (b"x" * 20000,)))
+        tester.client.send_message(NetMessage(MSG_BLOB, (b"y" * 10,)))
+        await wait_until(lambda: len(tester.server.received) == 2)
+        assert tester.server.received == [20000, 10]
+
+    tester.run(scenario)
+
+
+def test_udp_sequenced_drops_stale():
+    tester = UDPTester.create()
+
+    async def scenario():
+        for i in range(200):
+            message = NetMessage(
+                MSG_ECHO_REPLY,
+                (i,),
+                delivery=DeliveryMode.UNRELIABLE_SEQUENCED,
+                channel=1,
+            )
+            tester.client.send_message(message)
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.1)
+        received = tester.server.received
+        # Some packets were lost or arrived late, the rest is strictly increasing
+        assert 0 < len(received) < 200
+        assert received == sorted(set(received))
+
+    tester.run(scenario)
+
+
+def test_udp_channels_are_independent():
+    tester = ChannelDroppingTester.create()
+
+    async def scenario():
+        tester.client_transport.endpoints[0].transport.drop_channel = 0
+        for i in range(2):
+            tester.client.send_message(NetMessage(MSG_ECHO_REPLY, (i,)))
+        for i in range(10):
+            tester.client.send_message(
+                NetMessage(MSG_ECHO_REPLY, (1000 + i,), channel=1)
+            )
+        # The lost packet holds back channel 0 until it is retransmitted
+        await wait_until(lambda: len(tester.server.received) == 10)
+        assert tester.server.received == list(range(1000, 1010))
+        await wait_until(lambda: len(tester.server.received) == 12)
+        assert tester.server.received[10:] == [0, 1]
+
+    tester.run(scenario)
+
+
+def test_udp_channel_range():
+    with pytest.raises(errors.InvalidChannel):
+        FieldSignature().set_delivery(DeliveryMode.UNRELIABLE, 256)
+
+    tester = UDPTester.create()
+
+    async def scenario():
+        with pytest.raises(errors.InvalidChannel):
+            tester.client.send_message(NetMessage(MSG_ECHO, (1,), channel=256))
+        message = NetMessage(MSG_ECHO, (1,))
+        message.channel = -1
+        with pytest.raises(errors.InvalidChannel):
+            tester.client.send_message(message)
+
+    tester.run(scenario)
+
+
+def test_udp_unlimited_empty_payload():
+    class UnlimitedUDPTransport(AsyncIOUDPTransport):
+        max_datagram_size = None
+
+    class UnlimitedTester(UDPTester):
+        transport_cls = UnlimitedUDPTransport
+
+    tester = UnlimitedTester.create()
+
+    async def scenario():
+        peer = tester.client.get_handle("server").connection_data
+        sent = len(peer.unacked)
+        peer.send_data(DeliveryMode.RELIABLE_ORDERED, 0, b"")
+        assert len(peer.unacked) == sent + 1
+
+    tester.run(scenario)
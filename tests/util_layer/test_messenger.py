@@ -0,0 +1,115 @@
+import weakref
+from uuid import uuid4
+
+import pytest
+
+from magicnet.util.messenger import MessengerNode
+
+
+def test_node_identity():
+    root = MessengerNode.create_root()
+    first = root.create_child(MessengerNode)
+    second = root.create_child(MessengerNode)
+    assert first.node_id != second.node_id
+    assert root.children == {first.node_id: first, second.node_id: second}
+    # Leaves do not allocate a children dict
+    assert first._children is None
+    assert first.uuid == first.uuid != second.uuid
+    given = uuid4()
+    assert MessengerNode(uuid=given).uuid == given
+    assert weakref.ref(first)() is first
+
+    root.remove_child(first.node_id)
+    assert list(root.children) == [second.node_id]
+    assert not hasattr(first, "__dict__")
+
+
+def test_integer_child_names():
+    root = MessengerNode.create_root()
+    unnamed = root.create_child(MessengerNode)
+    # Would be stored under the same key as the unnamed child
+    with pytest.raises(TypeError):
+        root.create_child(MessengerNode, unnamed.node_id)
+    assert root.children == {unnamed.node_id: unnamed}
+
+
+def test_cache_invalidated_per_subtree():
+    first_root = MessengerNode.create_root()
+    second_root = MessengerNode.create_root()
+    branch = first_root.create_child(MessengerNode, "branch")
+    leaf = branch.create_child(MessengerNode, "leaf")
+    other = first_root.create_child(MessengerNode, "other")
+    assert leaf.root is first_root and other.root is first_root
+
+    branch.parent = second_root
+    # The moved subtree resolves its root again, the rest keeps the cache
+    assert branch._root_cache is None and leaf._root_cache is None
+    assert other._root_cache is first_root
+    assert leaf.root is second_root
+    assert leaf.listener is second_root.listener
+
+    second_root.remove_child("branch")
+    assert leaf.root is branch
+
+
+def test_event_context_only_when_asked():
+    root = MessengerNode.create_root()
+    plain = root.create_child(MessengerNode, "plain")
+    curious = root.create_child(MessengerNode, "curious")
+    seen = []
+    plain.listen("plain", lambda: seen.append(root.listener.current_event))
+    plain.listen("shared", lambda value: seen.append(root.listener.current_event))
+    curious.listen("shared", lambda value: None, wants_context=True)
+
+    root.emit("plain")
+    assert seen == [None]
+    plain.emit("shared", 5)
+    context = seen[-1]
+    assert context.sender is plain
+    assert context.event == "shared" and context.args == (5,)
+    assert root.listener.current_event is None
+
+
+def test_listeners_changed_during_emit():
+    root = MessengerNode.create_root()
+    first = root.create_child(MessengerNode, "first")
+    second = root.create_child(MessengerNode, "second")
+    calls = []
+
+    def disable_second():
+        calls.append("first")
+        second.disable()
+
+    first.listen("event", disable_second, priority=0)
+    second.listen("event", lambda: calls.append("second"), priority=1)
+    # The callbacks are taken when emit() is called
+    root.emit("event")
+    assert calls == ["first", "second"]
+    root.emit("event")
+    assert calls == ["first", "second", "first"]
+
+    second.enable()
+    first.listen("event", lambda: second.destroy(), priority=0)
+    # Removed during the emit, so it is only called once more
+    root.emit("event")
+    root.emit("event")
+    assert calls == ["first", "second", "first", "second"]
+
+
+def test_callbacks_rebuilt_on_emit():
+    root = MessengerNode.create_root()
+    node = root.create_child(MessengerNode, "node")
+    calls = []
+    for i in range(100):
+        root.create_child(MessengerNode, f"node{i}").listen("event", lambda i=i: calls.append(i))
+    callbacks = root.listener.events["event"]
+    # Registering the listeners does not build the callback tuple
+    assert callbacks.stale and callbacks.callbacks == ()
+    node.emit("event")
+    assert calls == list(range(100))
+    assert not callbacks.stale
+
+    root.children["node0"].disable()
+    assert callbacks.stale
+    node.emit("event")
+    assert calls[100:] == list(range(1, 100))
@@ -0,0 +1,51 @@
+from magicnet.core.net_globals import MNEvents, MNMathTargets
+from magicnet.core.net_message import NetMessage
+from magicnet.util.messenger import StandardEvents
+from magicnet.util.profiling import ListenerProfiler
+from transport_layer.asyncio_tester import MSG_ECHO, AsyncIONetworkTester, wait_until
+
+
+def test_listener_profiler():
+    tester = AsyncIONetworkTester.create()
+    profiler = ListenerProfiler()
+
+    async def scenario():
+        tester.server.listener.set_profiler(profiler)
+        for i in range(10):
+            tester.client.send_message(NetMessage(MSG_ECHO, (i,)))
+        await wait_until(lambda: len(tester.client.received) == 10)
+
+        stats = profiler.snapshot()
+        key = (
+            MNEvents.DATAGRAM_RECEIVED,
+            "RecordingNetworkManager",
+            "NetworkManager.process_datagram",
+        )
+        assert stats[key].calls == 10
+        assert 0 < stats[key].max_time <= stats[key].total_time
+        validator = [k for k in stats if k[0] == MNMathTargets.MSG_RECV_BATCH]
+        assert [k[1] for k in validator] == ["MessageValidatorMiddleware"]
+
+        profiler.reset()
+        assert not profiler.snapshot()
+        tester.server.listener.set_profiler(None)
+        tester.client.send_message(NetMessage(MSG_ECHO, (10,)))
+        await wait_until(lambda: len(tester.client.received) == 11)
+        assert not profiler.snapshot()
+
+    tester.run(scenario)
+
+
+def test_listener_profiler_threshold():
+    tester = AsyncIONetworkTester.create()
+    warnings = []
+    tester.server.listen(StandardEvents.WARNING, warnings.append)
+
+    async def scenario():
+        profiler = ListenerProfiler(reporter=tester.server, warn_threshold=0)
+        tester.server.listener.set_profiler(profiler)
+        tester.client.send_message(NetMessage(MSG_ECHO, (1,)))
+        await wait_until(lambda: len(tester.client.received) == 1)
+        assert any("process_datagram" in warning for warning in warnings)
+
+    tester.run(scenario)